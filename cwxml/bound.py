@@ -1,6 +1,11 @@
+import itertools
 from abc import ABC as AbstractClass, abstractmethod
 from collections import defaultdict
-from mathutils import Vector
+from enum import IntEnum
+from operator import itemgetter
+from typing import Iterable, Iterator, Optional
+import numpy as np
+from numpy.typing import NDArray
 from xml.etree import ElementTree as ET
 from .element import (
     AttributeProperty,
@@ -10,8 +15,11 @@ from .element import (
     ListProperty,
     MatrixProperty,
     ValueProperty,
-    VectorProperty
+    VectorProperty,
+    XmlEventStream,
+    XmlWriter,
 )
+from ..tools.npformat import FloatFormat, iter_columns_str
 
 
 class YBN:
@@ -105,47 +113,61 @@ class BoundCloth(BoundChild):
     type = "Cloth"
 
 
-class VerticesProperty(ElementProperty):
-    value_types = (list)
+class ValueRowsProperty(ElementProperty, AbstractClass):
+    """Rows of comma-separated values, one row per line, stored as a ``(N, num_columns)`` array."""
+    __slots__ = ()
+    value_types = (np.ndarray)
 
-    def __init__(self, tag_name: str = "Vertices", value=None):
-        super().__init__(tag_name, value or [])
+    num_columns: int = None
+    dtype: np.dtype = None
+    float_format: FloatFormat = FloatFormat.SHORTEST
 
-    @staticmethod
-    def from_xml(element: ET.Element):
-        new = VerticesProperty(element.tag, [])
-        text = element.text.strip().split("\n")
-        if len(text) > 0:
-            for line in text:
-                coords = line.strip().split(",")
-                if not len(coords) == 3:
-                    return VerticesProperty.read_value_error(element)
+    def __init__(self, tag_name: str, value: Optional[NDArray] = None):
+        super().__init__(tag_name, None)
+        self.value = value if value is not None else np.empty((0, self.num_columns), dtype=self.dtype)
+
+    @classmethod
+    def from_xml(cls, element: ET.Element):
+        new = cls(element.tag)
+        if element.text:
+            # Commas and new lines both separate values, tokenize the whole text in a single pass
+            values = np.fromstring(element.text.replace(",", " "), dtype=np.float64, sep=" ")
+            if values.size % cls.num_columns != 0:
+                return cls.read_value_error(element)
 
-                new.value.append(
-                    Vector((float(coords[0]), float(coords[1]), float(coords[2]))))
+            new.value = values.astype(cls.dtype).reshape((-1, cls.num_columns))
 
         return new
 
     def to_xml(self):
+        if len(self.value) == 0:
+            return None
+
         element = ET.Element(self.tag_name)
-        text = ["\n"]
+        element.text = "".join(self._iter_text())
+        return element
 
-        if not self.value:
+    def write_to(self, writer: XmlWriter, level: int = 0):
+        if len(self.value) == 0:
             return
 
-        for vertex in self.value:
-            if not isinstance(vertex, Vector):
-                raise TypeError(
-                    f"VerticesProperty can only contain Vector objects, not '{type(self.value)}'!")
-            for index, component in enumerate(vertex):
-                text.append(str(component))
-                if index < len(vertex) - 1:
-                    text.append(", ")
-            text.append("\n")
+        writer.write_text_element(self.tag_name, self._iter_text(), level)
 
-        element.text = "".join(text)
+    def _iter_text(self) -> Iterator[str]:
+        values = np.asarray(self.value, dtype=self.dtype).reshape((-1, self.num_columns))
+        yield "\n"
+        yield from iter_columns_str(values.T, [", "] * (self.num_columns - 1), self.float_format)
+        yield "\n"
 
-        return element
+
+class VerticesProperty(ValueRowsProperty):
+    """Vertex positions as an ``(N, 3)`` float32 array."""
+    __slots__ = ()
+    num_columns = 3
+    dtype = np.float32
+
+    def __init__(self, tag_name: str = "Vertices", value: Optional[NDArray[np.float32]] = None):
+        super().__init__(tag_name, value)
 
 
 class BoundGeometry(BoundChild):
@@ -161,7 +183,7 @@ class BoundGeometry(BoundChild):
         self.vertices = VerticesProperty("Vertices")
         # self.vertices_shrunk = VerticesProperty("VerticesShrunk") # not in official CW, for debugging with custom CW
         self.vertex_colors = VertexColorProperty("VertexColours")
-        self.polygons = Polygons()
+        self.polygons = PolygonsProperty()
 
 
 class BoundGeometryBVH(BoundGeometry):
@@ -206,6 +228,46 @@ class BoundList(ListProperty):
 
         return new
 
+    @classmethod
+    def from_xml_stream(cls, stream: XmlEventStream, element: ET.Element):
+        new = cls()
+
+        for child in stream.iter_children(element):
+            bound_type = child.get("type")
+            if bound_type is None:
+                continue
+
+            if bound_type == "None":
+                new.value.append(None)
+                continue
+
+            bound_class = BoundList.get_bound_class(bound_type)
+            if bound_class is not None:
+                new.value.append(bound_class.from_xml_stream(stream, child))
+
+        return new
+
+    @staticmethod
+    def get_bound_class(bound_type: str):
+        if bound_type == "Box":
+            return BoundBox
+        elif bound_type == "Sphere":
+            return BoundSphere
+        elif bound_type == "Capsule":
+            return BoundCapsule
+        elif bound_type == "Cylinder":
+            return BoundCylinder
+        elif bound_type == "Disc":
+            return BoundDisc
+        elif bound_type == "Cloth":
+            return BoundCloth
+        elif bound_type == "Geometry":
+            return BoundGeometry
+        elif bound_type == "GeometryBVH":
+            return BoundGeometryBVH
+
+        return None
+
     def create_element_for_none_item(self) -> ET.Element:
         return ET.Element(self.item_tag_name, attrib={"type": "None"})
 
@@ -229,120 +291,226 @@ class MaterialsList(ListProperty):
     tag_name = "Materials"
 
 
-class VertexColorProperty(ElementProperty):
-    value_types = (list[tuple[int, int, int, int]])
-
-    def __init__(self, tag_name: str = "VertexColours", value=None):
-        super().__init__(tag_name, value or [])
-
-    @staticmethod
-    def from_xml(element: ET.Element):
-        new = VertexColorProperty(element.tag, [])
-        text = element.text.strip().split("\n")
-        if len(text) > 0:
-            for line in text:
-                colors = line.strip().split(",")
-                if len(colors) != 4:
-                    return VertexColorProperty.read_value_error(element)
-
-                new.value.append((int(colors[0]), int(colors[1]), int(colors[2]), int(colors[3])))
-
-        return new
+class VertexColorProperty(ValueRowsProperty):
+    """Vertex colors as an ``(N, 4)`` uint8 array."""
+    __slots__ = ()
+    num_columns = 4
+    dtype = np.uint8
+
+    def __init__(self, tag_name: str = "VertexColours", value: Optional[NDArray[np.uint8]] = None):
+        super().__init__(tag_name, value)
+
+
+class PolygonType(IntEnum):
+    TRIANGLE = 0
+    BOX = 1
+    SPHERE = 2
+    CAPSULE = 3
+    CYLINDER = 4
+
+
+# Columns of the polygon tables of each type: field name, XML attribute, type and the value used when the attribute
+# is missing
+POLYGON_FIELDS: dict[PolygonType, tuple[tuple[str, str, type, str], ...]] = {
+    PolygonType.TRIANGLE: (
+        ("material_index", "m", np.uint32, "0"),
+        ("v1", "v1", np.uint32, "0"),
+        ("v2", "v2", np.uint32, "0"),
+        ("v3", "v3", np.uint32, "0"),
+        ("f1", "f1", np.int32, "0"),
+        ("f2", "f2", np.int32, "0"),
+        ("f3", "f3", np.int32, "0"),
+    ),
+    PolygonType.BOX: (
+        ("material_index", "m", np.uint32, "0"),
+        ("v1", "v1", np.uint32, "0"),
+        ("v2", "v2", np.uint32, "1"),
+        ("v3", "v3", np.uint32, "2"),
+        ("v4", "v4", np.uint32, "3"),
+    ),
+    PolygonType.SPHERE: (
+        ("material_index", "m", np.uint32, "0"),
+        ("v", "v", np.uint32, "0"),
+        ("radius", "radius", np.float32, "0"),
+    ),
+    PolygonType.CAPSULE: (
+        ("material_index", "m", np.uint32, "0"),
+        ("v1", "v1", np.uint32, "0"),
+        ("v2", "v2", np.uint32, "1"),
+        ("radius", "radius", np.float32, "0"),
+    ),
+    PolygonType.CYLINDER: (
+        ("material_index", "m", np.uint32, "0"),
+        ("v1", "v1", np.uint32, "0"),
+        ("v2", "v2", np.uint32, "1"),
+        ("radius", "radius", np.float32, "0"),
+    ),
+}
+POLYGON_DTYPES: dict[PolygonType, np.dtype] = {
+    poly_type: np.dtype([(name, dtype) for name, _, dtype, _ in fields]) for poly_type, fields in POLYGON_FIELDS.items()
+}
+POLYGON_TAG_NAMES: dict[PolygonType, str] = {
+    PolygonType.TRIANGLE: "Triangle",
+    PolygonType.BOX: "Box",
+    PolygonType.SPHERE: "Sphere",
+    PolygonType.CAPSULE: "Capsule",
+    PolygonType.CYLINDER: "Cylinder",
+}
+POLYGON_TYPE_BY_TAG_NAME: dict[str, PolygonType] = {tag: poly_type for poly_type, tag in POLYGON_TAG_NAMES.items()}
+
+
+class BoundPolygons:
+    """Polygons of a bound geometry stored column-wise, without an object per polygon. Each polygon type has its own
+    table, a structured array with the fields of ``POLYGON_DTYPES``, and ``types`` has the type of every polygon in
+    file order."""
+
+    __slots__ = ("types", "tables")
+
+    def __init__(self, types: Optional[NDArray[np.uint8]] = None, tables: Optional[dict[PolygonType, NDArray]] = None):
+        self.types = types if types is not None else np.empty(0, dtype=np.uint8)
+        self.tables = tables if tables is not None else {
+            poly_type: np.empty(0, dtype=dtype) for poly_type, dtype in POLYGON_DTYPES.items()
+        }
+
+    @classmethod
+    def concatenate(cls, runs: Iterable[tuple[PolygonType, NDArray]]) -> "BoundPolygons":
+        """Create the polygons from consecutive runs of polygons of the same type, given as tables."""
+        runs = list(runs)
+        types = np.concatenate(
+            [np.empty(0, dtype=np.uint8)] +
+            [np.full(len(polys), poly_type, dtype=np.uint8) for poly_type, polys in runs]
+        )
+        tables = {
+            poly_type: np.concatenate(
+                [np.empty(0, dtype=dtype)] + [polys for run_type, polys in runs if run_type == poly_type]
+            )
+            for poly_type, dtype in POLYGON_DTYPES.items()
+        }
+        return cls(types, tables)
 
-    def to_xml(self):
-        element = ET.Element(self.tag_name)
-        element.text = "\n"
-
-        if len(self.value) == 0:
-            return None
-
-        for color in self.value:
-            for index, component in enumerate(color):
-                element.text += str(int(component))
-                if index < len(color) - 1:
-                    element.text += ", "
-            element.text += "\n"
-
-        return element
-
-
-class Polygon(ElementTree, AbstractClass):
-    def __init__(self):
-        super().__init__()
-        self.material_index = AttributeProperty("m", 0)
-
-
-class Polygons(ListProperty):
-    list_type = Polygon
-    tag_name = "Polygons"
+    @property
+    def triangles(self) -> NDArray:
+        return self.tables[PolygonType.TRIANGLE]
 
-    @staticmethod
-    def from_xml(element: ET.Element):
-        new = Polygons()
+    @property
+    def boxes(self) -> NDArray:
+        return self.tables[PolygonType.BOX]
 
-        for child in element.iter():
-            if child.tag == "Box":
-                new.value.append(PolyBox.from_xml(child))
-            elif child.tag == "Sphere":
-                new.value.append(PolySphere.from_xml(child))
-            elif child.tag == "Capsule":
-                new.value.append(PolyCapsule.from_xml(child))
-            elif child.tag == "Cylinder":
-                new.value.append(PolyCylinder.from_xml(child))
-            elif child.tag == "Triangle":
-                new.value.append(PolyTriangle.from_xml(child))
+    @property
+    def spheres(self) -> NDArray:
+        return self.tables[PolygonType.SPHERE]
 
-        return new
+    @property
+    def capsules(self) -> NDArray:
+        return self.tables[PolygonType.CAPSULE]
 
+    @property
+    def cylinders(self) -> NDArray:
+        return self.tables[PolygonType.CYLINDER]
 
-class PolyTriangle(Polygon):
-    tag_name = "Triangle"
-
-    def __init__(self):
-        super().__init__()
-        self.v1 = AttributeProperty("v1", 0)
-        self.v2 = AttributeProperty("v2", 0)
-        self.v3 = AttributeProperty("v3", 0)
-        self.f1 = AttributeProperty("f1", 0)
-        self.f2 = AttributeProperty("f2", 0)
-        self.f3 = AttributeProperty("f3", 0)
+    def __len__(self) -> int:
+        return len(self.types)
 
+    def iter_runs(self) -> Iterator[tuple[PolygonType, NDArray]]:
+        """Iterate the consecutive runs of polygons of the same type, in file order, as slices of their tables."""
+        if len(self.types) == 0:
+            return
 
-class PolySphere(Polygon):
-    tag_name = "Sphere"
+        run_bounds = [0, *(np.flatnonzero(np.diff(self.types)) + 1).tolist(), len(self.types)]
+        table_offsets = dict.fromkeys(PolygonType, 0)
+        for start, end in zip(run_bounds[:-1], run_bounds[1:]):
+            poly_type = PolygonType(self.types[start])
+            offset = table_offsets[poly_type]
+            table_offsets[poly_type] = offset + end - start
+            yield poly_type, self.tables[poly_type][offset:offset + end - start]
 
-    def __init__(self):
-        super().__init__()
-        self.v = AttributeProperty("v", 0)
-        self.radius = AttributeProperty("radius", 0)
 
+class PolygonsProperty(ElementProperty):
+    """Bound polygons as a ``BoundPolygons``, read directly from the XML attributes."""
+    __slots__ = ()
+    value_types = (BoundPolygons)
 
-class PolyCapsule(Polygon):
-    tag_name = "Capsule"
+    def __init__(self, tag_name: str = "Polygons", value: Optional[BoundPolygons] = None):
+        super().__init__(tag_name, value if value is not None else BoundPolygons())
 
-    def __init__(self):
-        super().__init__()
-        self.v1 = AttributeProperty("v1", 0)
-        self.v2 = AttributeProperty("v2", 1)
-        self.radius = AttributeProperty("radius", 0)
+    @classmethod
+    def from_xml(cls, element: ET.Element):
+        return cls(element.tag, cls._read_polygons(element))
 
+    @classmethod
+    def from_xml_stream(cls, stream: XmlEventStream, element: ET.Element):
+        # The attributes are already available when each polygon starts, no need to build the subtree
+        return cls(element.tag, cls._read_polygons(stream.iter_children(element)))
 
-class PolyBox(Polygon):
-    tag_name = "Box"
+    @staticmethod
+    def _read_polygons(children: Iterable[ET.Element]) -> BoundPolygons:
+        rows_by_type = {poly_type: [] for poly_type in PolygonType}
+        get_rows = {
+            poly_type: itemgetter(*(attr for _, attr, _, _ in fields)) for poly_type, fields in POLYGON_FIELDS.items()
+        }
+        types = []
+        for child in children:
+            poly_type = POLYGON_TYPE_BY_TAG_NAME.get(child.tag, None)
+            if poly_type is None:
+                continue
+
+            types.append(poly_type)
+            attrib = child.attrib
+            try:
+                rows_by_type[poly_type].append(get_rows[poly_type](attrib))
+            except KeyError:
+                fields = POLYGON_FIELDS[poly_type]
+                rows_by_type[poly_type].append(tuple(attrib.get(attr, default) for _, attr, _, default in fields))
+
+        tables = {poly_type: _polygon_rows_to_table(poly_type, rows) for poly_type, rows in rows_by_type.items()}
+        return BoundPolygons(np.array(types, dtype=np.uint8), tables)
 
-    def __init__(self):
-        super().__init__()
-        self.v1 = AttributeProperty("v1", 0)
-        self.v2 = AttributeProperty("v2", 1)
-        self.v3 = AttributeProperty("v3", 2)
-        self.v4 = AttributeProperty("v4", 3)
+    def to_xml(self):
+        if len(self.value) == 0:
+            return None
 
+        return ET.fromstring(f"<{self.tag_name}>{''.join(self._iter_text(''))}</{self.tag_name}>")
 
-class PolyCylinder(Polygon):
-    tag_name = "Cylinder"
+    def write_to(self, writer: XmlWriter, level: int = 0):
+        if len(self.value) == 0:
+            return
 
-    def __init__(self):
-        super().__init__()
-        self.v1 = AttributeProperty("v1", 0)
-        self.v2 = AttributeProperty("v2", 1)
-        self.radius = AttributeProperty("radius", 0)
+        writer.write(f"<{self.tag_name}>")
+        for chunk in self._iter_text(writer.newline(level + 1)):
+            writer.write(chunk)
+        writer.write(f"{writer.newline(level)}</{self.tag_name}>")
+        if level == 0:
+            writer.write("\n")
+
+    def _iter_text(self, newline: str) -> Iterator[str]:
+        """Iterate the text of the polygon elements, each one preceded by ``newline``. The attributes of a whole run
+        of polygons are formatted at once, as columns with the rest of the element text as separators."""
+        for poly_type, polys in self.value.iter_runs():
+            fields = POLYGON_FIELDS[poly_type]
+            line_start = f"{newline}<{POLYGON_TAG_NAMES[poly_type]} {fields[0][1]}=\""
+            line_end = "\" />"
+            separators = [f"\" {attr}=\"" for _, attr, _, _ in fields[1:]]
+            columns = [polys[name] for name, _, _, _ in fields]
+
+            yield line_start
+            for chunk in iter_columns_str(columns, separators, FloatFormat.SHORTEST):
+                yield chunk.replace("\n", line_end + line_start)
+            yield line_end
+
+
+def _polygon_rows_to_table(poly_type: PolygonType, rows: list[tuple[str, ...]]) -> NDArray:
+    """Convert the attribute strings of polygons of ``poly_type`` to a table, parsing all of them at once."""
+    fields = POLYGON_FIELDS[poly_type]
+    table = np.empty(len(rows), dtype=POLYGON_DTYPES[poly_type])
+    if not rows:
+        return table
+
+    values = np.fromstring(" ".join(itertools.chain.from_iterable(rows)), dtype=np.float64, sep=" ")
+    if len(values) != len(rows) * len(fields):
+        raise ValueError(f"Invalid attributes in '<{POLYGON_TAG_NAMES[poly_type]} />' polygons!")
+
+    values = values.reshape((len(rows), len(fields)))
+    for column, (name, _, _, _) in enumerate(fields):
+        table[name] = values[:, column]
+
+    return table
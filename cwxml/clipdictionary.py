@@ -1,7 +1,9 @@
 # from .element import *
 from abc import ABC as AbstractClass, abstractmethod
 from enum import Enum
-from mathutils import Vector
+from typing import Optional
+import numpy as np
+from numpy.typing import NDArray
 from .element import (
     ElementTree,
     ElementProperty,
@@ -10,11 +12,12 @@ from .element import (
     TextProperty,
     ValueProperty,
     VectorProperty,
-    Vector4Property
+    Vector4Property,
+    XmlEventStream,
 )
+from ..tools.npformat import FloatFormat, columns_to_str
 from xml.etree import ElementTree as ET
 from inspect import isclass
-from math import sqrt
 
 
 class YCD:
@@ -33,6 +36,7 @@ class YCD:
 class ItemTypeList(ListProperty, AbstractClass):
     class Item(ElementTree, AbstractClass):
         tag_name = "Item"
+        __slots__ = ()
 
         @property
         @abstractmethod
@@ -42,20 +46,37 @@ class ItemTypeList(ListProperty, AbstractClass):
     list_type = Item
 
     @classmethod
-    def from_xml(cls, element: ET.Element):
-        new = cls()
+    def get_item_types(cls) -> dict[str, type]:
         type_map = {}
         for key, item_class in vars(cls).items():
             if isclass(item_class) and issubclass(item_class, ItemTypeList.Item) and key == item_class.__name__:
                 type_map[item_class.type] = item_class
+        return type_map
+
+    @classmethod
+    def from_xml(cls, element: ET.Element):
+        new = cls()
+        type_map = cls.get_item_types()
         for child in element:
-            type_elem = child.find("Type")
-            if type_elem is not None:
-                type = type_elem.get("value")
-                if type in type_map:
-                    new.value.append(type_map[type].from_xml(child))
+            new.append_item_from_xml(type_map, child)
+        return new
+
+    @classmethod
+    def from_xml_stream(cls, stream: XmlEventStream, element: ET.Element):
+        # The item type is only known from its <Type> child, so each item subtree is read whole
+        new = cls()
+        type_map = cls.get_item_types()
+        for child in stream.iter_children(element):
+            new.append_item_from_xml(type_map, stream.build(child))
         return new
 
+    def append_item_from_xml(self, type_map: dict[str, type], child: ET.Element):
+        type_elem = child.find("Type")
+        if type_elem is not None:
+            type = type_elem.get("value")
+            if type in type_map:
+                self.value.append(type_map[type].from_xml(child))
+
 
 class AttributesList(ItemTypeList):
     class Attribute(ItemTypeList.Item, AbstractClass):
@@ -125,79 +146,68 @@ class AttributesList(ItemTypeList):
     tag_name = "Attributes"
 
 
-class ValuesBuffer(ElementProperty):
-    value_types = (list)
+class NumbersBuffer(ElementProperty, AbstractClass):
+    """Flat buffer of numbers as a 1D array, written in rows of ``num_columns`` values."""
+    __slots__ = ()
+    value_types = (np.ndarray, list)
+    num_columns = 10
 
-    def __init__(self):
-        super().__init__(tag_name="Values", value=[])
+    @property
+    @abstractmethod
+    def dtype(self) -> type:
+        raise NotImplementedError
+
+    def __init__(self, tag_name: str, value: Optional[NDArray] = None):
+        super().__init__(tag_name, None)
+        self.value = value if value is not None else np.empty(0, dtype=self.dtype)
 
     @classmethod
     def from_xml(cls, element: ET.Element):
         new = cls()
-        text = element.text.strip().split("\n")
-        if len(text) > 0:
-            for line in text:
-                items = line.strip().split(" ")
-                for item in items:
-                    new.value.append(float(item))
-
+        if element.text:
+            new.value = np.fromstring(element.text, dtype=cls.dtype, sep=" ")
         return new
 
     def to_xml(self):
         element = ET.Element(self.tag_name)
-        columns = 10
-        text = []
-
-        for index, value in enumerate(self.value):
-            text.append(str(value))
-            if index < len(self.value) - 1:
-                text.append(" ")
-            if (index + 1) % columns == 0:
-                text.append("\n")
-
-        element.text = "".join(text)
+        values = np.asarray(self.value, dtype=self.dtype)
+        num_columns = self.num_columns
+        num_full_rows = len(values) // num_columns
+        rows = values[:num_full_rows * num_columns].reshape((num_full_rows, num_columns))
+        text = columns_to_str(rows.T, [" "] * (num_columns - 1), FloatFormat.ROUNDTRIP).replace("\n", " \n")
+        last_row = values[num_full_rows * num_columns:]
+        if len(last_row) > 0:
+            last_row_text = columns_to_str(last_row[:, np.newaxis], [" "] * (len(last_row) - 1), FloatFormat.ROUNDTRIP)
+            text = f"{text} \n{last_row_text}" if text else last_row_text
+        elif text:
+            text += "\n"
+        element.text = text
 
         return element
 
 
-class FramesBuffer(ElementProperty):
-    value_types = (list)
-
-    def __init__(self):
-        super().__init__(tag_name="Frames", value=[])
-
-    @classmethod
-    def from_xml(cls, element: ET.Element):
-        new = cls()
-        text = element.text.strip().split("\n")
-        if len(text) > 0:
-            for line in text:
-                items = line.strip().split(" ")
-                for item in items:
-                    new.value.append(int(item))
-
-        return new
+class ValuesBuffer(NumbersBuffer):
+    __slots__ = ()
+    # Stored as float32 in the game files, written with the shortest text that reads back to the same value
+    dtype = np.float32
 
-    def to_xml(self):
-        element = ET.Element(self.tag_name)
-        columns = 10
-        text = []
+    def __init__(self, value: Optional[NDArray[np.float32]] = None):
+        super().__init__("Values", value)
 
-        for index, value in enumerate(self.value):
-            text.append(str(value))
-            if index < len(self.value) - 1:
-                text.append(" ")
-            if (index + 1) % columns == 0:
-                text.append("\n")
 
-        element.text = "".join(text)
+class FramesBuffer(NumbersBuffer):
+    __slots__ = ()
+    dtype = np.uint32
 
-        return element
+    def __init__(self, value: Optional[NDArray[np.uint32]] = None):
+        super().__init__("Frames", value)
 
 
 class ChannelsList(ItemTypeList):
     class Channel(ItemTypeList.Item, AbstractClass):
         tag_name = "Item"
+        # ``type`` is a class attribute and can't also be a slot, so the <Type> element is stored in ``channel_type``
+        __slots__ = ("channel_type",)
 
         @property
         @abstractmethod
@@ -206,109 +216,115 @@ class ChannelsList(ItemTypeList):
 
         def __init__(self):
             super().__init__()
-            self.type = ValueProperty("Type", "")
+            self.channel_type = ValueProperty("Type", self.type)
 
-        def get_value(self, frame_id, channel_values):
+        def get_values(self, frame_ids: NDArray[np.intp], channel_values: list[NDArray]) -> NDArray:
+            """Get the values of this channel at each of ``frame_ids``, given the values of the previous channels of
+            the sequence data in ``channel_values``."""
             raise NotImplementedError
 
     class StaticQuaternion(Channel):
         type = "StaticQuaternion"
+        __slots__ = ("value",)
 
         def __init__(self):
             super().__init__()
             self.value = QuaternionProperty("Value")
-            self.type = "StaticQuaternion"
 
-        def get_value(self, frame_id, channel_values):
-            return self.value
+        def get_values(self, frame_ids, channel_values):
+            # As W, X, Y, Z
+            return np.tile(np.array(self.value, dtype=np.float64), (len(frame_ids), 1))
 
     class StaticVector3(Channel):
         type = "StaticVector3"
+        __slots__ = ("value",)
 
         def __init__(self):
             super().__init__()
             self.value = VectorProperty("Value")
-            self.type = "StaticVector3"
 
-        def get_value(self, frame_id, channel_values):
-            return self.value
+        def get_values(self, frame_ids, channel_values):
+            return np.tile(np.array(self.value, dtype=np.float64), (len(frame_ids), 1))
 
     class StaticFloat(Channel):
         type = "StaticFloat"
+        __slots__ = ("value",)
 
         def __init__(self):
             super().__init__()
             self.value = ValueProperty("Value", 0.0)
-            self.type = "StaticFloat"
 
-        def get_value(self, frame_id, channel_values):
-            return self.value
+        def get_values(self, frame_ids, channel_values):
+            return np.full(len(frame_ids), self.value, dtype=np.float64)
 
     class RawFloat(Channel):
         type = "RawFloat"
+        __slots__ = ("values",)
 
         def __init__(self):
             super().__init__()
             self.values = ValuesBuffer()
-            self.type = "RawFloat"
 
-        def get_value(self, frame_id, channel_values):
-            return self.values[frame_id % len(self.values)]
+        def get_values(self, frame_ids, channel_values):
+            values = np.asarray(self.values, dtype=np.float64)
+            return values[frame_ids % len(values)]
 
     class QuantizeFloat(Channel):
         type = "QuantizeFloat"
+        __slots__ = ("quantum", "offset", "values")
 
         def __init__(self):
             super().__init__()
             self.quantum = ValueProperty("Quantum", 0.0)
             self.offset = ValueProperty("Offset", 0.0)
             self.values = ValuesBuffer()
-            self.type = "QuantizeFloat"
 
-        def get_value(self, frame_id, channel_values):
-            return self.values[frame_id % len(self.values)]
+        def get_values(self, frame_ids, channel_values):
+            values = np.asarray(self.values, dtype=np.float64)
+            return values[frame_ids % len(values)]
 
     class IndirectQuantizeFloat(QuantizeFloat):
         type = "IndirectQuantizeFloat"
+        __slots__ = ("frames",)
 
         def __init__(self):
             super().__init__()
             self.frames = FramesBuffer()
-            self.type = "IndirectQuantizeFloat"
 
-        def get_value(self, frame_id, channel_values):
-            return self.values[(self.frames[frame_id % len(self.frames)]) % len(self.values)]
+        def get_values(self, frame_ids, channel_values):
+            values = np.asarray(self.values, dtype=np.float64)
+            frames = np.asarray(self.frames, dtype=np.intp)
+            return values[frames[frame_ids % len(frames)] % len(values)]
 
     class LinearFloat(QuantizeFloat):
         type = "LinearFloat"
+        __slots__ = ("numints", "counts")
 
         def __init__(self):
             super().__init__()
             self.numints = ValueProperty("NumInts", 0)
             self.counts = ValueProperty("Counts", 0)
-            self.type = "LinearFloat"
 
     class CachedQuaternion1(Channel):
         type = "CachedQuaternion1"
+        __slots__ = ("quat_index",)
 
         def __init__(self):
             super().__init__()
             self.quat_index = ValueProperty("QuatIndex", 0)
-            self.type = "CachedQuaternion1"
-
-        def get_value(self, frame_id, channel_values):
-            vec_len = Vector(
-                (channel_values[0], channel_values[1], channel_values[2])).length
 
-            return sqrt(max(1.0 - vec_len * vec_len, 0))
+        def get_values(self, frame_ids, channel_values):
+            # The component left out of a unit quaternion, from the other three
+            length_squared = channel_values[0] ** 2 + channel_values[1] ** 2 + channel_values[2] ** 2
+            return np.sqrt(np.maximum(1.0 - length_squared, 0.0))
 
     class CachedQuaternion2(CachedQuaternion1):
         type = "CachedQuaternion2"
+        __slots__ = ()
 
         def __init__(self):
             super().__init__()
             self.quat_index = ValueProperty("QuatIndex", 0)
-            self.type = "CachedQuaternion2"
 
     list_type = Channel
     tag_name = "Channels"
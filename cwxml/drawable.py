@@ -3,8 +3,8 @@ import os
 from mathutils import Matrix
 import numpy as np
 from numpy.typing import NDArray
-from ..tools.utils import np_arr_to_str
-from typing import Optional
+from ..tools.npformat import FloatFormat, iter_columns_str
+from typing import Iterator, Optional
 from abc import ABC as AbstractClass, abstractmethod
 from xml.etree import ElementTree as ET
 from .element import (
@@ -20,7 +20,10 @@ from .element import (
     ValueProperty,
     VectorProperty,
     Vector4Property,
-    MatrixProperty
+    MatrixProperty,
+    TextChunksElement,
+    XmlEventStream,
+    XmlWriter,
 )
 from .bound import (
     BoundBox,
@@ -243,6 +246,10 @@ class BoneIDProperty(ElementProperty):
 
 class Bone(ElementTree):
     tag_name = "Item"
+    __slots__ = (
+        "name", "tag", "index", "parent_index", "sibling_index", "flags", "translation", "rotation", "scale",
+        "transform_unk",
+    )
 
     def __init__(self):
         super().__init__()
@@ -418,12 +425,17 @@ class VertexBuffer(ElementTree):
         "Tangent": ("Tangent", np.float32, 4),
     }
 
+    ATTR_SEP = "   "
+
     tag_name = "VertexBuffer"
 
     def __init__(self):
         super().__init__()
         self.flags = ValueProperty("Flags", 0)
         self.data: Optional[NDArray] = None
+        # How floats are written to XML, set by the exporter. FIXED output is identical to previous versions, SHORTEST
+        # gives smaller files.
+        self.float_format = FloatFormat.FIXED
 
         self.layout = VertexLayoutList()
 
@@ -458,6 +470,15 @@ class VertexBuffer(ElementTree):
 
         return element
 
+    def write_to(self, writer: XmlWriter, level: int = 0):
+        self.layout = self.data.dtype.names
+        children = self.get_xml_children()
+
+        if self.data is not None:
+            children.append(TextChunksElement("Data", self._iter_data_str))
+
+        writer.write_tree(self.tag_name, self.get_xml_attributes(), children, level)
+
     def _load_data_from_str(self, _str: str):
         layout = self.get_element("layout")
         struct_dtype = np.dtype([self.VERT_ATTR_DTYPES[attr_name] for attr_name in layout.value])
@@ -483,43 +504,35 @@ class VertexBuffer(ElementTree):
         else:
             self.data = np.loadtxt(io.StringIO(_str), dtype=struct_dtype)
 
-    def _data_to_str(self):
-        layout = self.get_element("layout")
-        vert_arr = self.data
-
-        if layout.type == "GTAV2":
-            # Add back the 4th float of Normal element required by FVF GTAV2
-            new_struct_dtype = np.dtype([(name, dtype if name != "Normal" else (np.float32, 4))
-                                         for name, (dtype, _) in vert_arr.dtype.fields.items()])
-            new_vert_arr = np.empty_like(vert_arr, dtype=new_struct_dtype)
-            for comp in vert_arr.dtype.fields.keys():
-                if comp == "Normal":
-                    new_vert_arr["Normal"] = np.c_[vert_arr["Normal"], np.zeros(len(vert_arr))]
-                else:
-                    new_vert_arr[comp] = vert_arr[comp]
-
-            vert_arr = new_vert_arr
+    def _data_to_str(self) -> str:
+        return "".join(self._iter_data_str())
 
-        FLOAT_FMT = "%.7f"
-        INT_FMT = "%.0u"
-        ATTR_SEP = "   "
-
-        formats: list[str] = []
+    def _iter_data_str(self) -> Iterator[str]:
+        """Yield the text of the vertex data in chunks of rows."""
+        vert_arr = self.data
+        layout = self.get_element("layout")
 
+        # Format each component of each attribute as a separate column, no need to copy the data to a 2D array
+        columns = []
+        separators = []
         for field_name in vert_arr.dtype.names:
-            attr_dtype = vert_arr.dtype[field_name].base
-            column = vert_arr[field_name]
-
-            attr_fmt = INT_FMT if attr_dtype == np.uint32 else FLOAT_FMT
-            formats.append(" ".join([attr_fmt] * column.shape[1]))
+            attr_arr = vert_arr[field_name]
+            attr_columns = [attr_arr[:, i] for i in range(attr_arr.shape[1])]
+            if field_name == "Normal" and layout.type == "GTAV2":
+                # Add back the 4th float of Normal element required by FVF GTAV2
+                attr_columns.append(np.zeros(len(vert_arr), dtype=attr_arr.dtype))
 
-        fmt = ATTR_SEP.join(formats)
-        vert_arr_2d = np.column_stack([vert_arr[name] for name in vert_arr.dtype.names])
+            if columns:
+                separators.append(self.ATTR_SEP)
+            separators.extend([" "] * (len(attr_columns) - 1))
+            columns.extend(attr_columns)
 
-        return np_arr_to_str(vert_arr_2d, fmt)
+        return iter_columns_str(columns, separators, self.float_format)
 
 
 class IndexBuffer(ElementTree):
+    NUM_COLUMNS = 24
+
     tag_name = "IndexBuffer"
 
     def __init__(self):
@@ -551,24 +564,34 @@ class IndexBuffer(ElementTree):
 
         return element
 
-    def _inds_to_str(self):
+    def write_to(self, writer: XmlWriter, level: int = 0):
+        children = []
+
+        if self.data is not None:
+            children.append(TextChunksElement("Data", self._iter_inds_str))
+
+        writer.write_tree(self.tag_name, [], children, level)
+
+    def _inds_to_str(self) -> str:
+        return "".join(self._iter_inds_str())
+
+    def _iter_inds_str(self) -> Iterator[str]:
+        """Yield the text of the indices in chunks of rows."""
         indices_arr = self.data
 
         num_inds = len(indices_arr)
 
         # Get number of rows that can be split into 24 columns
-        num_divisble_inds = num_inds - (num_inds % 24)
-        num_rows = int(num_divisble_inds / 24)
+        num_divisble_inds = num_inds - (num_inds % self.NUM_COLUMNS)
 
-        indices_arr_2d = indices_arr[:num_divisble_inds].reshape(
-            (num_rows, 24))
+        indices_arr_2d = indices_arr[:num_divisble_inds].reshape((-1, self.NUM_COLUMNS))
+        yield from iter_columns_str(indices_arr_2d.T, [" "] * (self.NUM_COLUMNS - 1))
 
-        index_buffer_str = np_arr_to_str(indices_arr_2d, fmt="%.0u")
         # Add the last row
-        last_row_str = np_arr_to_str(
-            indices_arr[num_divisble_inds:], fmt="%.0u")
-
-        return f"{index_buffer_str}\n{last_row_str}"
+        yield "\n"
+        last_row = indices_arr[num_divisble_inds:]
+        if len(last_row) > 0:
+            yield from iter_columns_str(last_row.reshape((-1, 1)), [" "] * (len(last_row) - 1))
 
 
 class Geometry(ElementTree):
@@ -667,33 +690,51 @@ class Drawable(ElementTree, AbstractClass):
 
         bounds_elem = element.find("Bounds")
         if bounds_elem is not None:
-            bound_type = bounds_elem.get("type")
-            bound = None
-            if bound_type == "Composite":
-                bound = BoundComposite.from_xml(bounds_elem)
-            elif bound_type == "Box":
-                bound = BoundBox.from_xml(bounds_elem)
-            elif bound_type == "Sphere":
-                bound = BoundSphere.from_xml(bounds_elem)
-            elif bound_type == "Capsule":
-                bound = BoundCapsule.from_xml(bounds_elem)
-            elif bound_type == "Cylinder":
-                bound = BoundCylinder.from_xml(bounds_elem)
-            elif bound_type == "Disc":
-                bound = BoundDisc.from_xml(bounds_elem)
-            elif bound_type == "Cloth":
-                bound = BoundCloth.from_xml(bounds_elem)
-            elif bound_type == "Geometry":
-                bound = BoundGeometry.from_xml(bounds_elem)
-            elif bound_type == "GeometryBVH":
-                bound = BoundGeometryBVH.from_xml(bounds_elem)
-
-            if bound:
+            bound_class = Drawable.get_bound_class(bounds_elem.get("type"))
+            if bound_class is not None:
+                bound = bound_class.from_xml(bounds_elem)
                 bound.tag_name = "Bounds"
                 new.bounds = bound
 
         return new
 
+    @classmethod
+    def supports_xml_stream(cls) -> bool:
+        return True
+
+    def read_xml_stream_child(self, stream: XmlEventStream, child: ET.Element):
+        if child.tag != "Bounds" or self.bounds is not None:
+            return
+
+        bound_class = Drawable.get_bound_class(child.get("type"))
+        if bound_class is not None:
+            bound = bound_class.from_xml_stream(stream, child)
+            bound.tag_name = "Bounds"
+            self.bounds = bound
+
+    @staticmethod
+    def get_bound_class(bound_type: str):
+        if bound_type == "Composite":
+            return BoundComposite
+        elif bound_type == "Box":
+            return BoundBox
+        elif bound_type == "Sphere":
+            return BoundSphere
+        elif bound_type == "Capsule":
+            return BoundCapsule
+        elif bound_type == "Cylinder":
+            return BoundCylinder
+        elif bound_type == "Disc":
+            return BoundDisc
+        elif bound_type == "Cloth":
+            return BoundCloth
+        elif bound_type == "Geometry":
+            return BoundGeometry
+        elif bound_type == "GeometryBVH":
+            return BoundGeometryBVH
+
+        return None
+
     def to_xml(self):
         if self.bounds:
             self.bounds.tag_name = "Bounds"
@@ -740,6 +781,18 @@ class DrawableDictionary(MutableSequence, Element):
 
         return new
 
+    @classmethod
+    def from_xml_stream(cls, stream: XmlEventStream, element: ET.Element):
+        new = cls()
+        new.tag_name = "Item"
+
+        for child in stream.iter_children(element):
+            if child.tag == new.tag_name:
+                drawable = Drawable.from_xml_stream(stream, child)
+                new.append(drawable)
+
+        return new
+
     def to_xml(self):
         element = ET.Element(self.tag_name)
         for drawable in self._value:
@@ -2,9 +2,16 @@
 from mathutils import Vector, Quaternion, Matrix
 from abc import abstractmethod, ABC as AbstractClass, abstractclassmethod
 from dataclasses import dataclass
-from typing import Any
+import itertools
+from types import MemberDescriptorType
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
 from xml.etree import ElementTree as ET
 from numpy import float32
+import os
+
+
+# Buffer size of the file written by ``Element.write_xml``
+XML_WRITE_BUFFER_SIZE = 1024 * 1024
 
 
 def indent(elem: ET.Element, level=0):
@@ -53,8 +60,226 @@ def get_str_type(value: str):
     return value
 
 
+class XmlEventStream:
+    """Incremental XML reader built on ``ET.iterparse``. Elements are yielded as soon as they start and each subtree
+    is cleared and detached from its parent once consumed, so only the subtree being read is kept in memory."""
+
+    def __init__(self, source):
+        self._events = ET.iterparse(source, events=("start", "end"))
+        self._last_closed: ET.Element = None
+
+    def read_root(self) -> ET.Element:
+        """Start reading the document. Returns the root element, without children yet."""
+        _, root = next(self._events)
+        return root
+
+    def iter_children(self, parent: ET.Element) -> Iterator[ET.Element]:
+        """Iterate the direct children of ``parent``, which must have just started. Children not fully consumed by the
+        caller (with ``build``, ``skip`` or a nested ``iter_children``) are skipped before reading the next one."""
+        for event, elem in self._events:
+            if event == "end":
+                # Direct children are always consumed up to their own end event, so this is the end of ``parent``
+                self._last_closed = elem
+                return
+
+            yield elem
+
+            if self._last_closed is not elem:
+                self.skip(elem)
+
+            # Child is fully read, drop it from the tree
+            elem.clear()
+            del parent[-1]
+
+    def build(self, elem: ET.Element) -> ET.Element:
+        """Read the whole subtree of ``elem``, which must have just started. Returns ``elem``."""
+        depth = 1
+        for event, e in self._events:
+            if event == "start":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    break
+
+        self._last_closed = elem
+        return elem
+
+    def skip(self, elem: ET.Element):
+        """Read and discard the whole subtree of ``elem``, which must have just started."""
+        self.build(elem).clear()
+
+
+class XmlWriter:
+    """Incremental XML writer. The output is the same as running ``indent`` on the ``ET.Element`` tree and writing it
+    with ``ET.ElementTree.write``, but elements are written as they are visited, without building the tree."""
+
+    INDENT = "  "
+
+    def __init__(self, stream):
+        self._stream_write = stream.write
+        # Text only written once something else is written after it, used to delay start tags and new lines until
+        # it is known whether an element has children
+        self._deferred: list[str] = []
+        self._num_flushes = 0
+
+    def write(self, text: str):
+        if self._deferred:
+            self._stream_write("".join(self._deferred))
+            self._deferred.clear()
+            self._num_flushes += 1
+
+        self._stream_write(text)
+
+    def defer(self, text: str) -> tuple[int, int]:
+        """Queue ``text`` to be written before the next ``write``. Returns a token for ``undefer``."""
+        self._deferred.append(text)
+        return self._num_flushes, len(self._deferred) - 1
+
+    def undefer(self, token: tuple[int, int]) -> bool:
+        """Discard the text deferred with ``token``, and any deferred after it, if it was not written yet. Returns
+        whether it was discarded."""
+        num_flushes, index = token
+        if num_flushes != self._num_flushes:
+            return False
+
+        del self._deferred[index:]
+        return True
+
+    @classmethod
+    def newline(cls, level: int) -> str:
+        return "\n" + level * cls.INDENT
+
+    @staticmethod
+    def start_tag(tag: str, attrib: Iterable[tuple[str, str]]) -> str:
+        """Get the start tag of an element, without the closing ``>``."""
+        # Same escaping as ``ET.ElementTree.write``
+        return f"<{tag}" + "".join(f" {name}=\"{ET._escape_attrib(value)}\"" for name, value in attrib)
+
+    def write_tree(
+        self,
+        tag: str,
+        attrib: Iterable[tuple[str, str]],
+        children: Iterable[Union["Element", ET.Element]],
+        level: int,
+    ):
+        """Write an element with the given children. ``Element`` children write themselves with ``write_to``, so they
+        can be skipped by writing nothing."""
+        start_tag = self.start_tag(tag, attrib)
+        token = self.defer(start_tag + ">")
+        for child in children:
+            child_token = self.defer(self.newline(level + 1))
+            if isinstance(child, ET.Element):
+                self.write_element(child, level + 1)
+            else:
+                child.write_to(self, level + 1)
+            self.undefer(child_token)
+
+        if self.undefer(token):
+            self.write(start_tag + " />")
+        else:
+            self.write(f"{self.newline(level)}</{tag}>")
+            if level == 0:
+                self.write("\n")
+
+    def write_element(self, element: ET.Element, level: int):
+        """Write an ``ET.Element`` tree."""
+        tag = element.tag
+        text = element.text
+        start_tag = self.start_tag(tag, element.items())
+        if len(element):
+            if not text or not text.strip():
+                text = self.newline(level + 1)
+
+            self.write(start_tag + ">" + ET._escape_cdata(text))
+            last_index = len(element) - 1
+            for index, child in enumerate(element):
+                self.write_element(child, level + 1)
+                tail = child.tail
+                if not tail or not tail.strip():
+                    tail = self.newline(level + 1 if index < last_index else level)
+                self.write(ET._escape_cdata(tail))
+
+            self.write(f"</{tag}>")
+            if level == 0:
+                self.write("\n")
+            return
+
+        if text and text.strip() and "\n" in text:
+            # Indent innertext of elements on new lines
+            line_indent = (level + 1) * self.INDENT
+            text = self.newline(level + 1) + text.strip().replace("\n", "\n" + line_indent) + self.newline(level)
+
+        if text:
+            self.write(start_tag + ">" + ET._escape_cdata(text) + f"</{tag}>")
+        else:
+            self.write(start_tag + " />")
+
+    def write_text_element(self, tag: str, text_chunks: Iterable[str], level: int):
+        """Write an element that only has text, given in chunks. Same output as ``write_element`` with the joined
+        text, without joining it."""
+        chunks = iter(text_chunks)
+
+        # Multi-line text is indented, anything else is written as-is
+        head = []
+        for chunk in chunks:
+            head.append(chunk)
+            if "\n" in chunk:
+                break
+        else:
+            element = ET.Element(tag)
+            element.text = "".join(head)
+            self.write_element(element, level)
+            return
+
+        line_indent = self.newline(level + 1)
+        leading_whitespace = []
+        pending_whitespace = ""
+        for chunk in itertools.chain(head, chunks):
+            if leading_whitespace is not None:
+                content = chunk.lstrip()
+                if not content:
+                    leading_whitespace.append(chunk)
+                    continue
+
+                chunk = content
+                leading_whitespace = None
+                self.write(f"<{tag}>" + line_indent)
+
+            # Whitespace at the end could be the end of the whole text, which is stripped
+            content = chunk.rstrip()
+            if not content:
+                pending_whitespace += chunk
+                continue
+
+            self.write(ET._escape_cdata((pending_whitespace + content).replace("\n", line_indent)))
+            pending_whitespace = chunk[len(content):]
+
+        if leading_whitespace is None:
+            self.write(f"{self.newline(level)}</{tag}>")
+        else:
+            # Only whitespace
+            element = ET.Element(tag)
+            element.text = "".join(leading_whitespace)
+            self.write_element(element, level)
+
+
+def get_from_xml_owner(cls: type) -> type:
+    """Get the class in the MRO of ``cls`` that defines the ``from_xml`` used by ``cls``."""
+    return next(c for c in cls.__mro__ if "from_xml" in vars(c))
+
+
+def get_to_xml_owner(cls: type) -> type:
+    """Get the class in the MRO of ``cls`` that defines the ``to_xml`` used by ``cls``."""
+    return next(c for c in cls.__mro__ if "to_xml" in vars(c))
+
+
 class Element(AbstractClass):
     """Abstract XML element to base all other XML elements off of"""
+    # Subclasses without ``__slots__`` still get a ``__dict__``. Lightweight subclasses, that are instantiated once per
+    # XML node, define their own ``__slots__`` instead.
+    __slots__ = ()
+
     @property
     @abstractmethod
     def tag_name(self):
@@ -75,23 +300,269 @@ class Element(AbstractClass):
         """Convert object to ET.Element object"""
         raise NotImplementedError
 
+    @classmethod
+    def from_xml_stream(cls, stream: XmlEventStream, element: ET.Element):
+        """Read element from ``stream``, where ``element`` has just started. By default, reads the whole subtree and
+        converts it with ``from_xml``."""
+        new = cls.from_xml(stream.build(element))
+        element.clear()
+        return new
+
     @classmethod
     def from_xml_file(cls, filepath):
         """Read XML from filepath"""
-        element_tree = ET.ElementTree()
-        element_tree.parse(filepath)
-        return cls.from_xml(element_tree.getroot())
+        stream = XmlEventStream(filepath)
+        return cls.from_xml_stream(stream, stream.read_root())
+
+    def write_to(self, writer: XmlWriter, level: int = 0):
+        """Write object as indented XML to ``writer``. By default, converts it with ``to_xml`` first."""
+        element = self.to_xml()
+        if element is not None:
+            writer.write_element(element, level)
 
     def write_xml(self, filepath):
         """Write object as XML to filepath"""
-        element = self.to_xml()
-        indent(element)
-        elementTree = ET.ElementTree(element)
-        elementTree.write(filepath, encoding="UTF-8", xml_declaration=True)
+        # Same encoding and declaration as ``ET.ElementTree.write``
+        with open(filepath, "w", encoding="UTF-8", errors="xmlcharrefreplace", newline="",
+                  buffering=XML_WRITE_BUFFER_SIZE) as f:
+            try:
+                f.write("<?xml version='1.0' encoding='UTF-8'?>\n")
+                self.write_to(XmlWriter(f))
+            except:
+                # Don't leave a partial file behind
+                f.close()
+                os.remove(filepath)
+                raise
+
+
+# What a value stored in an ElementTree is, as far as XML is concerned. ``isinstance`` checks against the abstract
+# Element classes are slow, so the kind of each type is only computed once and stored in ``PROP_KIND_BY_TYPE``.
+PROP_KIND_OTHER = 0
+PROP_KIND_ELEMENT = 1
+PROP_KIND_ELEMENT_PROPERTY = 2
+PROP_KIND_ATTRIBUTE = 3
+
+ELEMENT_PROP_KINDS = (PROP_KIND_ELEMENT, PROP_KIND_ELEMENT_PROPERTY)
+# Kinds whose ``value`` is returned when accessed as an attribute of an ElementTree
+VALUE_PROP_KINDS = (PROP_KIND_ELEMENT_PROPERTY, PROP_KIND_ATTRIBUTE)
+
+
+class PropKindByType(dict):
+    """Maps types to their ``PROP_KIND_*``, computed the first time each type is looked up."""
+
+    def __missing__(self, value_type: type) -> int:
+        if issubclass(value_type, AttributeProperty):
+            kind = PROP_KIND_ATTRIBUTE
+        elif issubclass(value_type, ElementProperty):
+            kind = PROP_KIND_ELEMENT_PROPERTY
+        elif issubclass(value_type, Element):
+            kind = PROP_KIND_ELEMENT
+        else:
+            kind = PROP_KIND_OTHER
+        self[value_type] = kind
+        return kind
+
+
+PROP_KIND_BY_TYPE = PropKindByType()
+
+
+class SlotNamesByType(dict):
+    """Maps types to the names of all the ``__slots__`` in their MRO, base classes first, computed the first time each
+    type is looked up."""
+
+    def __missing__(self, cls: type) -> tuple[str, ...]:
+        names = tuple(
+            name
+            for base in reversed(cls.__mro__)
+            for name in base.__dict__.get("__slots__", ())
+            if name not in {"__dict__", "__weakref__"}
+        )
+        self[cls] = names
+        return names
+
+
+SLOT_NAMES_BY_TYPE = SlotNamesByType()
+
+
+# Marks a ``ValuePropertyDescriptor`` that doesn't replace a class attribute
+NO_CLASS_DEFAULT = object()
+
+
+class ValuePropertyDescriptor:
+    """Class attribute for a name that stores an ``ElementProperty`` or ``AttributeProperty`` in the instances of an
+    ``ElementTree`` class. Reading the name returns the value of the property. Installed by ``ElementTree.__setattr__``
+    the first time such a property is assigned, so other attributes are resolved by Python without running any
+    Python code. A class attribute with the same name is still returned when accessed through the class."""
+
+    __slots__ = ("name", "slot", "class_default")
+
+    def __init__(self, name: str, slot: Optional[MemberDescriptorType], class_default: Any = NO_CLASS_DEFAULT):
+        self.name = name
+        # Descriptor of the slot storing the property, or ``None`` if it is stored in ``__dict__``
+        self.slot = slot
+        self.class_default = class_default
+
+    def get_raw(self, instance: "ElementTree") -> Any:
+        """Get the object stored in ``instance``, without returning just the value of properties."""
+        if self.slot is not None:
+            return self.slot.__get__(instance)
+
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            if self.class_default is NO_CLASS_DEFAULT:
+                raise AttributeError(self.name) from None
+            return self.class_default
+
+    def __get__(self, instance: Optional["ElementTree"], owner: Optional[type] = None) -> Any:
+        if instance is None:
+            return self if self.class_default is NO_CLASS_DEFAULT else self.class_default
+
+        # Same as ``get_raw``, inlined as this runs for every property read
+        slot = self.slot
+        if slot is not None:
+            obj = slot.__get__(instance)
+        else:
+            try:
+                obj = instance.__dict__[self.name]
+            except KeyError:
+                if self.class_default is NO_CLASS_DEFAULT:
+                    raise AttributeError(self.name) from None
+                obj = self.class_default
+
+        if PROP_KIND_BY_TYPE[type(obj)] in VALUE_PROP_KINDS:
+            return obj.value
+
+        return obj
+
+    def __set__(self, instance: "ElementTree", value: Any):
+        if self.slot is not None:
+            self.slot.__set__(instance, value)
+        else:
+            instance.__dict__[self.name] = value
+
+    def __delete__(self, instance: "ElementTree"):
+        if self.slot is not None:
+            self.slot.__delete__(instance)
+        else:
+            try:
+                del instance.__dict__[self.name]
+            except KeyError:
+                raise AttributeError(self.name) from None
+
+
+class ValuePropertyDescriptorByName(dict):
+    """Maps ``(class, name)`` to the ``ValuePropertyDescriptor`` found for ``name`` in the MRO of the class, or
+    ``None``. Looked up without ``getattr`` because descriptors return the class attribute they replace."""
+
+    def __missing__(self, key: tuple[type, str]) -> Optional[ValuePropertyDescriptor]:
+        cls, name = key
+        descriptor = None
+        for base in cls.__mro__:
+            base_dict = base.__dict__
+            if name in base_dict:
+                attr = base_dict[name]
+                descriptor = attr if type(attr) is ValuePropertyDescriptor else None
+                break
+
+        self[key] = descriptor
+        return descriptor
+
+    def install(self, cls: type, name: str) -> ValuePropertyDescriptor:
+        """Add a descriptor for ``name`` to ``cls``, storing the property in the slot of ``name`` if there is one."""
+        slot = None
+        class_default = NO_CLASS_DEFAULT
+        for base in cls.__mro__:
+            base_dict = base.__dict__
+            if name in base_dict:
+                attr = base_dict[name]
+                if isinstance(attr, MemberDescriptorType):
+                    slot = attr
+                else:
+                    class_default = attr
+                break
+
+        descriptor = ValuePropertyDescriptor(name, slot, class_default)
+        setattr(cls, name, descriptor)
+        # Subclasses of ``cls`` may have cached the lookup
+        self.clear()
+        return descriptor
+
+
+VALUE_PROPERTY_DESCRIPTOR_BY_NAME = ValuePropertyDescriptorByName()
+
+
+def get_raw_attribute(instance: "ElementTree", name: str) -> Any:
+    """Get the object stored as ``name`` in ``instance``, without returning just the value of properties."""
+    descriptor = VALUE_PROPERTY_DESCRIPTOR_BY_NAME[type(instance), name]
+    if descriptor is not None:
+        return descriptor.get_raw(instance)
+
+    return object.__getattribute__(instance, name)
+
+
+class ElementTreeSchema:
+    """Properties of an ``ElementTree`` class, built once from a new instance."""
+
+    __slots__ = ("children", "children_by_tag", "attributes")
+
+    def __init__(self, instance: "ElementTree"):
+        # (property name, tag name, property type) of each child element property
+        self.children: list[tuple[str, str, type]] = []
+        # (property name, property type) of all the properties of each tag, in the order they were defined
+        self.children_by_tag: dict[str, list[tuple[str, type]]] = {}
+        # (property name, attribute name) of each attribute property
+        self.attributes: list[tuple[str, str]] = []
+
+        for prop_name, obj in instance.get_properties().items():
+            kind = PROP_KIND_BY_TYPE[type(obj)]
+            if kind == PROP_KIND_ATTRIBUTE:
+                self.attributes.append((prop_name, obj.name))
+            elif kind != PROP_KIND_OTHER:
+                self.children.append((prop_name, obj.tag_name, type(obj)))
+                self.children_by_tag.setdefault(obj.tag_name, []).append((prop_name, type(obj)))
 
 
 class ElementTree(Element):
-    """XML element that contains children defined by it's properties"""
+    """XML element that contains children defined by it's properties.
+
+    Subclasses instantiated for many XML nodes can define ``__slots__`` with their property names to save memory. The
+    slots must be listed in the same order as they are assigned in ``__init__``, which is the order of the children in
+    the XML.
+    """
+    __slots__ = ()
+
+    def get_properties(self) -> dict[str, Any]:
+        """Get the objects stored in this element by name, in the order they were defined. Properties stored in
+        ``__slots__`` come first, followed by the contents of ``__dict__``."""
+        slot_names = SLOT_NAMES_BY_TYPE[type(self)]
+        if not slot_names:
+            return object.__getattribute__(self, "__dict__")
+
+        props = {}
+        for name in slot_names:
+            try:
+                props[name] = get_raw_attribute(self, name)
+            except AttributeError:
+                # Slot not assigned
+                pass
+
+        try:
+            props.update(object.__getattribute__(self, "__dict__"))
+        except AttributeError:
+            pass
+
+        return props
+
+    @classmethod
+    def get_xml_schema(cls, instance: Optional["ElementTree"] = None) -> ElementTreeSchema:
+        """Get the schema of this class, built from ``instance`` (or a new instance) the first time."""
+        schema = cls.__dict__.get("_xml_schema", None)
+        if schema is None:
+            schema = ElementTreeSchema(instance if instance is not None else cls())
+            cls._xml_schema = schema
+
+        return schema
 
     @classmethod
     def from_xml(cls: Element, element: ET.Element):
@@ -100,66 +571,173 @@ class ElementTree(Element):
         if new.tag_name != element.tag:
             new.tag_name = element.tag
 
-        for prop_name, obj_element in vars(new).items():
-            if isinstance(obj_element, Element):
-                child = element.find(obj_element.tag_name)
-                if child is not None and obj_element.tag_name == child.tag:
-                    # Add element to object if tag is defined in class definition
-                    setattr(new, prop_name, type(obj_element).from_xml(child))
-            elif isinstance(obj_element, AttributeProperty):
+        schema = cls.get_xml_schema(new)
+        props = new.get_properties()
+
+        attrib = element.attrib
+        if attrib:
+            for prop_name, attr_name in schema.attributes:
                 # Add attribute to element if attribute is defined in class definition
-                if obj_element.name in element.attrib:
-                    obj_element.value = element.get(obj_element.name)
+                value = attrib.get(attr_name, None)
+                if value is not None:
+                    props[prop_name].value = value
+
+        if len(element):
+            # Same as ``element.find`` for each property, without searching the children again each time
+            first_child_by_tag = {}
+            for child in element:
+                first_child_by_tag.setdefault(child.tag, child)
+
+            for prop_name, tag_name, prop_type in schema.children:
+                child = first_child_by_tag.get(tag_name, None)
+                if child is not None:
+                    # Add element to object if tag is defined in class definition
+                    value = prop_type.from_xml(child)
+                    if type(value) is prop_type:
+                        object.__setattr__(new, prop_name, value)
+                    else:
+                        setattr(new, prop_name, value)
 
         return new
 
+    @classmethod
+    def from_xml_stream(cls, stream: XmlEventStream, element: ET.Element):
+        if not cls.supports_xml_stream():
+            return super().from_xml_stream(stream, element)
+
+        new = cls()
+        if new.tag_name != element.tag:
+            new.tag_name = element.tag
+
+        schema = cls.get_xml_schema(new)
+        props = new.get_properties()
+
+        attrib = element.attrib
+        if attrib:
+            for prop_name, attr_name in schema.attributes:
+                value = attrib.get(attr_name, None)
+                if value is not None:
+                    props[prop_name].value = value
+
+        props_by_tag = schema.children_by_tag.copy()
+        for child in stream.iter_children(element):
+            # Only the first child with a given tag is read, same as ``element.find`` in ``from_xml``
+            props_of_tag = props_by_tag.pop(child.tag, None)
+            if props_of_tag is None:
+                new.read_xml_stream_child(stream, child)
+                continue
+
+            if len(props_of_tag) == 1:
+                prop_name, prop_type = props_of_tag[0]
+                values = ((prop_name, prop_type, prop_type.from_xml_stream(stream, child)),)
+            else:
+                # Each property with this tag reads its own object from the child, the subtree is needed more than once
+                stream.build(child)
+                values = [(prop_name, prop_type, prop_type.from_xml(child)) for prop_name, prop_type in props_of_tag]
+
+            for prop_name, prop_type, value in values:
+                if type(value) is prop_type:
+                    object.__setattr__(new, prop_name, value)
+                else:
+                    setattr(new, prop_name, value)
+
+        return new
+
+    @classmethod
+    def supports_xml_stream(cls) -> bool:
+        """Whether children can be read one at a time in ``from_xml_stream``. Classes with a custom ``from_xml`` need
+        their whole subtree, unless they override this and read their extra children in ``read_xml_stream_child``."""
+        return get_from_xml_owner(cls) is ElementTree
+
+    def read_xml_stream_child(self, stream: XmlEventStream, child: ET.Element):
+        """Read a child element that doesn't correspond to any property. Ignored by default."""
+        pass
+
+    def write_to(self, writer: XmlWriter, level: int = 0):
+        if get_to_xml_owner(type(self)) is not ElementTree:
+            return super().write_to(writer, level)
+
+        writer.write_tree(self.tag_name, self.get_xml_attributes(), self.get_xml_children(), level)
+
+    def get_xml_attributes(self) -> list[tuple[str, str]]:
+        """Get the XML attributes of this element, as written by ``to_xml``."""
+        attrib = []
+        for child in self.get_properties().values():
+            if PROP_KIND_BY_TYPE[type(child)] == PROP_KIND_ATTRIBUTE:
+                value = child.value
+                if value is not None:
+                    attrib.append((child.name, str(value)))
+
+        return attrib
+
+    def get_xml_children(self) -> list[Element]:
+        """Get the properties written as child elements by ``to_xml``."""
+        return [
+            child for child in self.get_properties().values()
+            if PROP_KIND_BY_TYPE[type(child)] in ELEMENT_PROP_KINDS
+        ]
+
     def to_xml(self):
         """Convert ElementTree to ET.Element object"""
         root = ET.Element(self.tag_name)
-        for child in vars(self).values():
-            if isinstance(child, Element):
-                element = child.to_xml()
-                if element is not None:
-                    root.append(element)
-            elif isinstance(child, AttributeProperty):
+        # Instances can have properties not in the class schema, so go through all of them
+        for child in self.get_properties().values():
+            kind = PROP_KIND_BY_TYPE[type(child)]
+            if kind == PROP_KIND_OTHER:
+                continue
+
+            if kind == PROP_KIND_ATTRIBUTE:
                 value = child.value
                 if value is not None:
                     root.set(child.name, str(value))
+            else:
+                element = child.to_xml()
+                if element is not None:
+                    root.append(element)
 
         return root
 
-    def __getattribute__(self, key: str, onlyValue: bool = True):
-        obj = None
-        # Try and see if key exists
+    def __getattr__(self, key: str):
+        # Key doesn't exist, return None. ElementProperty and AttributeProperty values are returned by their
+        # ValuePropertyDescriptor, everything else is found by the default lookup without calling this.
+        return None
+
+    def __setattr__(self, name: str, value) -> None:
+        descriptor = VALUE_PROPERTY_DESCRIPTOR_BY_NAME[type(self), name]
+        if descriptor is None:
+            if PROP_KIND_BY_TYPE[type(value)] in VALUE_PROP_KINDS:
+                # First ElementProperty or AttributeProperty stored as ``name`` in this class
+                VALUE_PROPERTY_DESCRIPTOR_BY_NAME.install(type(self), name)
+
+            super().__setattr__(name, value)
+            return
+
         try:
-            obj = object.__getattribute__(self, key)
-            if isinstance(obj, (ElementProperty, AttributeProperty)) and onlyValue:
-                # If the property is an ElementProperty or AttributeProperty, and onlyValue is true, return just the value of the Element property
-                return obj.value
-            else:
-                return obj
+            obj = descriptor.get_raw(self)
         except AttributeError:
-            # Key doesn't exist, return None
-            return None
+            obj = None
 
-    def __setattr__(self, name: str, value) -> None:
-        # Get the full object
-        obj = self.__getattribute__(name, False)
-        if obj is not None and isinstance(obj, (ElementProperty, AttributeProperty)) and not isinstance(value, (ElementProperty, AttributeProperty)):
+        if (
+            obj is not None and
+            PROP_KIND_BY_TYPE[type(obj)] in VALUE_PROP_KINDS and
+            PROP_KIND_BY_TYPE[type(value)] not in VALUE_PROP_KINDS
+        ):
             # If the object is an ElementProperty or AttributeProperty, set it's value
             obj.value = value
-            super().__setattr__(name, obj)
         else:
-            super().__setattr__(name, value)
+            descriptor.__set__(self, value)
 
     def get_element(self, key):
-        obj = self.__getattribute__(key, False)
+        try:
+            obj = get_raw_attribute(self, key)
+        except AttributeError:
+            return None
 
-        if isinstance(obj, ElementProperty):
+        if PROP_KIND_BY_TYPE[type(obj)] == PROP_KIND_ELEMENT_PROPERTY:
             return obj
 
 
-@dataclass
+@dataclass(slots=True)
 class AttributeProperty:
     name: str
     _value: Any = None
@@ -179,7 +757,7 @@ class ElementProperty(Element, AbstractClass):
     def value_types(self):
         raise NotImplementedError
 
-    tag_name = None
+    __slots__ = ("tag_name", "value")
 
     def __init__(self, tag_name, value):
         super().__init__()
@@ -220,12 +798,58 @@ class ListProperty(ElementProperty, AbstractClass):
             new.value.append(new.list_type.from_xml(child))
         return new
 
+    @classmethod
+    def from_xml_stream(cls, stream: XmlEventStream, element: ET.Element):
+        if get_from_xml_owner(cls) is not ListProperty:
+            return super().from_xml_stream(stream, element)
+
+        new = cls(element.tag)
+        item_tag_name = new.item_tag_name or new.list_type.tag_name
+        for child in stream.iter_children(element):
+            if child.tag == item_tag_name:
+                new.value.append(new.list_type.from_xml_stream(stream, child))
+        return new
+
     def to_xml(self):
         if self.value:
             return self._do_to_xml()
 
         return None
 
+    def write_to(self, writer: XmlWriter, level: int = 0):
+        to_xml_owner = get_to_xml_owner(type(self))
+        if to_xml_owner is not ListProperty and to_xml_owner is not ListPropertyRequired:
+            return super().write_to(writer, level)
+
+        if self.value or to_xml_owner is ListPropertyRequired:
+            self._do_write_to(writer, level)
+
+    def _do_write_to(self, writer: XmlWriter, level: int):
+        attrib = [
+            (child.name, str(child.value)) for child in vars(self).values() if isinstance(child, AttributeProperty)
+        ]
+        writer.write_tree(self.tag_name, attrib, self._iter_xml_items(), level)
+
+    def _iter_xml_items(self) -> Iterator[Union[Element, ET.Element]]:
+        """Iterate the list items to write, same checks as ``_do_to_xml``."""
+        for item in self.value:
+            if item is None:
+                if self.allow_none_items:
+                    yield self.create_element_for_none_item()
+                else:
+                    raise TypeError(f"{type(self).__name__} does not allow 'None' entries")
+                continue
+
+            if self.item_tag_name:
+                item.tag_name = self.item_tag_name
+            if isinstance(item, self.list_type):
+                yield item
+            else:
+                raise TypeError(
+                    f"{type(self).__name__} can only hold objects of type '{self.list_type.__name__}', "
+                    f"not '{type(item)}'"
+                )
+
     def _do_to_xml(self):
         element = ET.Element(self.tag_name)
 
@@ -268,7 +892,32 @@ class ListPropertyRequired(ListProperty):
         return self._do_to_xml()
 
 
+class TextChunksElement(Element):
+    """Element that only has text, generated in chunks by ``iter_text`` so it can be written without building the
+    whole string. Only used for writing."""
+
+    tag_name = None
+
+    def __init__(self, tag_name: str, iter_text: Callable[[], Iterable[str]]):
+        super().__init__()
+        self.tag_name = tag_name
+        self.iter_text = iter_text
+
+    @classmethod
+    def from_xml(cls, element: ET.Element):
+        raise NotImplementedError
+
+    def to_xml(self):
+        element = ET.Element(self.tag_name)
+        element.text = "".join(self.iter_text())
+        return element
+
+    def write_to(self, writer: XmlWriter, level: int = 0):
+        writer.write_text_element(self.tag_name, self.iter_text(), level)
+
+
 class TextProperty(ElementProperty):
+    __slots__ = ()
     value_types = (str)
 
     def __init__(self, tag_name: str = "Name", value=None):
@@ -289,6 +938,7 @@ class TextProperty(ElementProperty):
 
 class TextPropertyRequired(ElementProperty):
     """Same as TextProperty but returns an empty element rather then None in case the passed element's value is empty or None"""
+    __slots__ = ()
     value_types = (str)
 
     def __init__(self, tag_name: str = "Name", value=None):
@@ -307,6 +957,7 @@ class TextPropertyRequired(ElementProperty):
 
 
 class ColorProperty(ElementProperty):
+    __slots__ = ()
     value_types = (list)
 
     def __init__(self, tag_name: str, value=None):
@@ -324,6 +975,7 @@ class ColorProperty(ElementProperty):
 
 
 class Vector2Property(ElementProperty):
+    __slots__ = ()
     value_types = (Vector)
 
     def __init__(self, tag_name: str, value=None):
@@ -343,6 +995,7 @@ class Vector2Property(ElementProperty):
 
 
 class VectorProperty(ElementProperty):
+    __slots__ = ()
     value_types = (Vector)
 
     def __init__(self, tag_name: str, value=None):
@@ -360,6 +1013,7 @@ class VectorProperty(ElementProperty):
 
 
 class Vector4Property(ElementProperty):
+    __slots__ = ()
     value_types = (Vector)
 
     def __init__(self, tag_name: str, value=None):
@@ -378,6 +1032,7 @@ class Vector4Property(ElementProperty):
 
 
 class QuaternionProperty(ElementProperty):
+    __slots__ = ()
     value_types = (Quaternion)
 
     def __init__(self, tag_name: str, value=None):
@@ -399,6 +1054,7 @@ class QuaternionProperty(ElementProperty):
 
 
 class MatrixProperty(ElementProperty):
+    __slots__ = ()
     value_types = (Matrix)
 
     def __init__(self, tag_name: str, value=None):
@@ -433,6 +1089,7 @@ class MatrixProperty(ElementProperty):
 
 
 class Matrix33Property(ElementProperty):
+    __slots__ = ()
     value_types = (Matrix)
 
     def __init__(self, tag_name: str, value=None):
@@ -467,6 +1124,7 @@ class Matrix33Property(ElementProperty):
 
 
 class FlagsProperty(ElementProperty):
+    __slots__ = ()
     value_types = (list)
 
     def __init__(self, tag_name: str = "Flags", value=None):
@@ -501,6 +1159,7 @@ class FlagsProperty(ElementProperty):
 
 
 class ValueProperty(ElementProperty):
+    __slots__ = ()
     value_types = (int, str, bool, float)
 
     def __init__(self, tag_name: str, value=0):
@@ -524,6 +1183,7 @@ class ValueProperty(ElementProperty):
 
 
 class StringValueProperty(ElementProperty):
+    __slots__ = ()
     value_types = (str)
 
     def __init__(self, tag_name: str, value=""):
@@ -542,6 +1202,7 @@ class StringValueProperty(ElementProperty):
 
 class TextListProperty(ElementProperty):
     """Separates each word of an element's text into a list"""
+    __slots__ = ()
     value_types = (list)
 
     def __init__(self, tag_name, value=None):
@@ -1,12 +1,17 @@
+from typing import Iterable, Optional
+import numpy as np
+from numpy.typing import NDArray
 from .element import (
     ElementTree,
+    ElementProperty,
     ListProperty,
     TextProperty,
     ValueProperty,
-    VectorProperty
+    VectorProperty,
+    XmlEventStream,
 )
+from ..tools.npformat import FloatFormat, columns_to_str
 from xml.etree import ElementTree as ET
-from mathutils import Vector
 
 
 class YNV:
@@ -55,44 +60,82 @@ class NavPortalList(ListProperty):
     tag_name = "Portals"
 
 
-class NavPolygonVertices(ListProperty):
-    list_type = Vector
-    tag_name = "Vertices"
+class NavPolygons:
+    """Polygons of a navmesh stored as flat arrays, without an object per polygon. The vertices of all the polygons are
+    in ``vertices``, polygon ``i`` uses ``lengths[i]`` of them starting at ``offsets[i]``. ``flags`` and ``edges`` have
+    the text of each polygon."""
 
-    def __init__(self, tag_name=None, value=None):
-        super().__init__(tag_name=tag_name, value=value)
+    __slots__ = ("vertices", "lengths", "flags", "edges")
+
+    def __init__(
+        self,
+        vertices: Optional[NDArray[np.float32]] = None,
+        lengths: Optional[NDArray[np.uint32]] = None,
+        flags: Optional[list[str]] = None,
+        edges: Optional[list[str]] = None,
+    ):
+        self.vertices = vertices if vertices is not None else np.empty((0, 3), dtype=np.float32)
+        self.lengths = lengths if lengths is not None else np.empty(0, dtype=np.uint32)
+        self.flags = flags if flags is not None else []
+        self.edges = edges if edges is not None else []
+
+    @property
+    def offsets(self) -> NDArray[np.uint32]:
+        offsets = np.zeros(len(self.lengths), dtype=np.uint32)
+        np.cumsum(self.lengths[:-1], out=offsets[1:])
+        return offsets
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+
+class NavPolygonsProperty(ElementProperty):
+    """Navmesh polygons as a ``NavPolygons``. The vertices of all the polygons are parsed at once."""
+    __slots__ = ()
+    value_types = (NavPolygons)
+
+    def __init__(self, tag_name: str = "Polygons", value: Optional[NavPolygons] = None):
+        super().__init__(tag_name, value if value is not None else NavPolygons())
 
     @classmethod
     def from_xml(cls, element: ET.Element):
-        new = cls()
-        verts = []
-        if element.text:
-            txts = element.text.strip().split("\n")
-            for txt in txts:
-                txt = txt.strip()
-            for txt in txts:
-                nums = txt.split(", ")
-                v0 = float(nums[0])
-                v1 = float(nums[1])
-                v2 = float(nums[2])
-                verts.append(Vector((v0, v1, v2)))
-        new.value = verts
-        return new
-
-
-class NavPolygon(ElementTree):
-    tag_name = "Item"
-
-    def __init__(self):
-        super().__init__()
-        self.flags = TextProperty("Flags")
-        self.vertices = NavPolygonVertices("Vertices")
-        self.edges = TextProperty("Edges")
+        return cls(element.tag, cls._read_polygons(element))
 
+    @classmethod
+    def from_xml_stream(cls, stream: XmlEventStream, element: ET.Element):
+        items = (stream.build(item) for item in stream.iter_children(element))
+        return cls(element.tag, cls._read_polygons(items))
 
-class NavPolygonList(ListProperty):
-    list_type = NavPolygon
-    tag_name = "Polygons"
+    @staticmethod
+    def _read_polygons(items: Iterable[ET.Element]) -> NavPolygons:
+        flags = []
+        edges = []
+        vertices_texts = []
+        for item in items:
+            flags.append(item.findtext("Flags", ""))
+            edges.append(item.findtext("Edges", ""))
+            vertices_texts.append(item.findtext("Vertices", ""))
+
+        # Each vertex is a "x, y, z" line, so the number of vertices is half the number of commas
+        lengths = np.array([text.count(",") // 2 for text in vertices_texts], dtype=np.uint32)
+        vertices = np.fromstring("\n".join(vertices_texts).replace(",", " "), dtype=np.float32, sep=" ")
+        if len(vertices) != 3 * int(lengths.sum()):
+            raise ValueError("Invalid vertices in navmesh polygons!")
+
+        return NavPolygons(vertices.reshape((-1, 3)), lengths, flags, edges)
+
+    def to_xml(self):
+        element = ET.Element(self.tag_name)
+        polys = self.value
+        vertices_text = columns_to_str(polys.vertices.T, [", ", ", "], FloatFormat.SHORTEST).split("\n")
+        polys_data = zip(polys.offsets.tolist(), polys.lengths.tolist(), polys.flags, polys.edges)
+        for offset, length, flags, edges in polys_data:
+            item = ET.SubElement(element, "Item")
+            ET.SubElement(item, "Flags").text = flags
+            ET.SubElement(item, "Vertices").text = "\n".join(["", *vertices_text[offset:offset + length], ""])
+            ET.SubElement(item, "Edges").text = edges
+
+        return element
 
 
 class Navmesh(ElementTree):
@@ -105,6 +148,6 @@ class Navmesh(ElementTree):
         self.bb_min = VectorProperty("BBMin")
         self.bb_max = VectorProperty("BBMax")
         self.bb_size = VectorProperty("BBSize")
-        self.polygons = NavPolygonList()
+        self.polygons = NavPolygonsProperty()
         self.portals = NavPortalList()
         self.points = NavPointList()
@@ -399,6 +399,11 @@ class ExtensionsList(ListProperty):
 
 class Entity(ElementTree):
     tag_name = "Item"
+    __slots__ = (
+        "type", "archetype_name", "flags", "guid", "position", "rotation", "scale_xy", "scale_z", "parent_index",
+        "lod_dist", "child_lod_dist", "lod_level", "num_children", "priority_level", "extensions",
+        "ambient_occlusion_multiplier", "artificial_ambient_occlusion", "tint_value",
+    )
 
     def __init__(self):
         super().__init__()
@@ -1,5 +1,6 @@
 import traceback
 import os
+from contextlib import nullcontext
 from typing import Optional
 import bpy
 import time
@@ -19,6 +20,7 @@ from .cwxml.ytyp import YTYP
 from .cwxml.ymap import YMAP
 from .ydr.ydrimport import import_ydr
 from .ydr.ydrexport import export_ydr
+from .ydr.geometry_cache import get_geometry_cache
 from .ydd.yddimport import import_ydd
 from .ydd.yddexport import export_ydd
 from .yft.yftimport import import_yft
@@ -28,6 +30,7 @@ from .ybn.ybnexport import export_ybn
 from .ynv.ynvimport import import_ynv
 from .ycd.ycdimport import import_ycd
 from .ycd.ycdexport import export_ycd
+from .tools.exportpool import ExportPool, PendingWrite
 from .ymap.ymapimport import import_ymap
 from .ymap.ymapexport import export_ymap
 from .ytyp.ytypimport import import_ytyp
@@ -221,47 +224,80 @@ class SOLLUMZ_OT_export_assets(bpy.types.Operator, TimedOperator):
                 return {"CANCELLED"}
 
             any_warnings_or_errors = False
-            for obj in objs:
-                op_log.clear_log_counts()
-                filepath = None
-                try:
-                    success = False
-                    if obj.sollum_type == SollumType.DRAWABLE:
-                        filepath = self.get_filepath(obj, YDR.file_extension)
-                        success = export_ydr(obj, filepath)
-                    elif obj.sollum_type == SollumType.DRAWABLE_DICTIONARY:
-                        filepath = self.get_filepath(obj, YDD.file_extension)
-                        success = export_ydd(obj, filepath)
-                    elif obj.sollum_type == SollumType.FRAGMENT:
-                        filepath = self.get_filepath(obj, YFT.file_extension)
-                        success = export_yft(obj, filepath)
-                    elif obj.sollum_type == SollumType.CLIP_DICTIONARY:
-                        filepath = self.get_filepath(obj, YCD.file_extension)
-                        success = export_ycd(obj, filepath)
-                    elif obj.sollum_type == SollumType.BOUND_COMPOSITE:
-                        filepath = self.get_filepath(obj, YBN.file_extension)
-                        success = export_ybn(obj, filepath)
-                    elif obj.sollum_type == SollumType.YMAP:
-                        filepath = self.get_filepath(obj, YMAP.file_extension)
-                        success = export_ymap(obj, filepath)
-                    else:
-                        continue
+            # Objects waiting for their files to be written by the pool: (filepath, has_warnings_or_errors,
+            # time collecting the data, pending writes)
+            queued_exports: list[tuple[str, bool, float, list[PendingWrite]]] = []
+            num_threads = export_settings.export_threads
+            with ExportPool(num_threads or None) if num_threads != 1 else nullcontext() as pool:
+                for obj in objs:
+                    op_log.clear_log_counts()
+                    filepath = None
+                    try:
+                        success = False
+                        start_time = time.perf_counter()
+                        if obj.sollum_type == SollumType.DRAWABLE:
+                            filepath = self.get_filepath(obj, YDR.file_extension)
+                            success = export_ydr(obj, filepath, pool)
+                        elif obj.sollum_type == SollumType.DRAWABLE_DICTIONARY:
+                            filepath = self.get_filepath(obj, YDD.file_extension)
+                            success = export_ydd(obj, filepath, pool)
+                        elif obj.sollum_type == SollumType.FRAGMENT:
+                            filepath = self.get_filepath(obj, YFT.file_extension)
+                            success = export_yft(obj, filepath, pool)
+                        elif obj.sollum_type == SollumType.CLIP_DICTIONARY:
+                            filepath = self.get_filepath(obj, YCD.file_extension)
+                            success = export_ycd(obj, filepath, pool)
+                        elif obj.sollum_type == SollumType.BOUND_COMPOSITE:
+                            filepath = self.get_filepath(obj, YBN.file_extension)
+                            success = export_ybn(obj, filepath, pool)
+                        elif obj.sollum_type == SollumType.YMAP:
+                            filepath = self.get_filepath(obj, YMAP.file_extension)
+                            success = export_ymap(obj, filepath, pool)
+                        else:
+                            continue
+
+                        export_time = time.perf_counter() - start_time
+                        pending_writes = pool.take_pending_writes() if pool is not None else []
 
-                    if success:
-                        if op_log.has_warnings_or_errors:
-                            logger.info(f"Exported '{filepath}' with WARNINGS or ERRORS! Please check the Info Log for details.")
-                            any_warnings_or_errors = True
+                        if success:
+                            if pending_writes:
+                                queued_exports.append(
+                                    (filepath, op_log.has_warnings_or_errors, export_time, pending_writes))
+                                continue
+
+                            self.log_exported(filepath, op_log.has_warnings_or_errors, f"{export_time:.3f}s")
+                            any_warnings_or_errors |= op_log.has_warnings_or_errors
                         else:
-                            logger.info(f"Successfully exported '{filepath}'")
-                    else:
-                        if op_log.has_warnings_or_errors:
-                            logger.info(f"Failed to export '{obj.name}', ERRORS found! Please check the Info Log for details.")
-                            any_warnings_or_errors = True
-                except:
-                    logger.error(f"Error exporting: {filepath or obj.name} \n {traceback.format_exc()}")
-                    any_warnings_or_errors = True
+                            if op_log.has_warnings_or_errors:
+                                logger.info(
+                                    f"Failed to export '{obj.name}', ERRORS found! "
+                                    "Please check the Info Log for details."
+                                )
+                                any_warnings_or_errors = True
+                    except:
+                        logger.error(f"Error exporting: {filepath or obj.name} \n {traceback.format_exc()}")
+                        any_warnings_or_errors = True
+                        return {"CANCELLED"}
+
+                any_write_failed = False
+                for filepath, has_warnings_or_errors, export_time, pending_writes in queued_exports:
+                    try:
+                        write_time = sum(pending_write.future.result() for pending_write in pending_writes)
+                    except:
+                        logger.error(f"Error exporting: {filepath} \n {traceback.format_exc()}")
+                        any_warnings_or_errors = any_write_failed = True
+                        continue
+
+                    self.log_exported(filepath, has_warnings_or_errors,
+                                      f"{export_time:.3f}s collecting, {write_time:.3f}s writing")
+                    any_warnings_or_errors |= has_warnings_or_errors
+
+                if any_write_failed:
                     return {"CANCELLED"}
 
+            if export_settings.use_geometry_cache:
+                get_geometry_cache().evict()
+
             if export_settings.export_with_ytyp:
                 ytyp = ytyp_from_objects(objs)
                 filepath = os.path.join(
@@ -274,6 +310,14 @@ class SOLLUMZ_OT_export_assets(bpy.types.Operator, TimedOperator):
                 bpy.ops.screen.info_log_show()
             return {"FINISHED"}
 
+    def log_exported(self, filepath: str, has_warnings_or_errors: bool, timings: str):
+        if has_warnings_or_errors:
+            logger.info(
+                f"Exported '{filepath}' ({timings}) with WARNINGS or ERRORS! Please check the Info Log for details."
+            )
+        else:
+            logger.info(f"Successfully exported '{filepath}' ({timings})")
+
     def collect_objects(self, context: bpy.types.Context) -> list[bpy.types.Object]:
         export_settings = get_export_settings()
 
@@ -10,6 +10,7 @@ from bpy.types import (
 from bpy.props import (
     StringProperty,
     IntProperty,
+    FloatProperty,
     BoolProperty,
     EnumProperty,
     CollectionProperty,
@@ -43,6 +44,18 @@ class SollumzExportSettings(PropertyGroup):
         update=_save_preferences_on_update
     )
 
+    export_threads: IntProperty(
+        name="Export Threads",
+        description=(
+            "Number of threads writing the exported files while the next objects are being processed. 1 exports the "
+            "objects one after another, 0 uses one thread per CPU core"
+        ),
+        default=1,
+        min=0,
+        max=64,
+        update=_save_preferences_on_update
+    )
+
     export_with_ytyp: BoolProperty(
         name="Export with ytyp",
         description="Exports a .ytyp.xml with an archetype for every drawable or drawable dictionary being exported",
@@ -97,6 +110,59 @@ class SollumzExportSettings(PropertyGroup):
         update=_save_preferences_on_update
     )
 
+    compact_vertex_floats: BoolProperty(
+        name="Compact Vertex Floats",
+        description=(
+            "Write vertex buffer floats with the fewest digits needed to read back the same value, instead of always "
+            "using 7 decimals. Produces smaller files"
+        ),
+        default=False,
+        update=_save_preferences_on_update
+    )
+
+    vertex_weld_decimals: IntProperty(
+        name="Vertex Weld Decimals",
+        description=(
+            "Vertices with the same attributes when rounded to this number of decimals are merged into a single "
+            "vertex. Fewer decimals merge more vertices that are only different due to rounding errors"
+        ),
+        default=6,
+        min=1,
+        max=9,
+        update=_save_preferences_on_update
+    )
+
+    use_geometry_cache: BoolProperty(
+        name="Geometry Cache",
+        description=(
+            "Store the geometries created from each mesh in the Sollumz config folder, so re-exporting unchanged "
+            "meshes skips welding and vertex cache optimization. The cache can use up to 512 MB of disk space"
+        ),
+        default=False,
+        update=_save_preferences_on_update
+    )
+
+    force_full_export: BoolProperty(
+        name="Force Full Export",
+        description=(
+            "Process every mesh again instead of reusing the geometries cached from previous exports of unchanged "
+            "meshes. The cache is still updated"
+        ),
+        default=False,
+        update=_save_preferences_on_update
+    )
+
+    optimize_vertex_cache: BoolProperty(
+        name="Optimize Vertex Cache",
+        description=(
+            "Reorder the triangles and vertices of each geometry to reduce the vertices transformed by the GPU when "
+            "drawing it. Slower export, about 2 seconds per million triangle corners. The improvement is reported in "
+            "the Info Log"
+        ),
+        default=False,
+        update=_save_preferences_on_update
+    )
+
     @property
     def export_hi(self) -> bool:
         return "sollumz_export_very_high" in self.export_lods
@@ -128,6 +194,26 @@ class SollumzImportSettings(PropertyGroup):
         update=_save_preferences_on_update
     )
 
+    ycd_reduce_keyframes: BoolProperty(
+        name="Reduce Keyframes",
+        description=(
+            "Create a single keyframe for static animation channels and, for the other channels, only the keyframes "
+            "needed to stay within the keyframe tolerance with linear interpolation. Otherwise, every frame gets a "
+            "keyframe. Reduced animations are exported at the scene frame rate instead of their original frame count"
+        ),
+        default=False,
+        update=_save_preferences_on_update
+    )
+
+    ycd_keyframe_tolerance: FloatProperty(
+        name="Keyframe Tolerance",
+        description="Largest difference allowed between the reduced animation channels and the imported values",
+        default=0.001,
+        min=0.0,
+        precision=4,
+        update=_save_preferences_on_update
+    )
+
     ymap_skip_missing_entities: BoolProperty(
         name="Skip Missing Entities",
         description="If enabled, missing entities wont be created as an empty object",
@@ -173,6 +173,17 @@ class SOLLUMZ_PT_import_ydd(bpy.types.Panel, SollumzImportSettingsPanel):
         layout.prop(settings, "import_ext_skeleton")
 
 
+class SOLLUMZ_PT_import_ycd(bpy.types.Panel, SollumzImportSettingsPanel):
+    bl_label = "Clip Dictionary"
+    bl_order = 3
+
+    def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzImportSettings):
+        layout.prop(settings, "ycd_reduce_keyframes")
+        row = layout.row()
+        row.active = settings.ycd_reduce_keyframes
+        row.prop(settings, "ycd_keyframe_tolerance")
+
+
 class SOLLUMZ_UL_armature_list(bpy.types.UIList):
     bl_idname = "SOLLUMZ_UL_armature_list"
 
@@ -197,7 +208,7 @@ class SOLLUMZ_UL_armature_list(bpy.types.UIList):
 
 class SOLLUMZ_PT_import_ymap(bpy.types.Panel, SollumzImportSettingsPanel):
     bl_label = "Ymap"
-    bl_order = 3
+    bl_order = 4
 
     def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzImportSettings):
         layout.prop(settings, "ymap_skip_missing_entities")
@@ -215,6 +226,7 @@ class SOLLUMZ_PT_export_include(bpy.types.Panel, SollumzExportSettingsPanel):
     def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzExportSettings):
         row = layout.row(heading="Limit To")
         row.prop(settings, "limit_to_selected", text="Selected Objects")
+        layout.prop(settings, "export_threads")
 
 
 class SOLLUMZ_PT_export_drawable(bpy.types.Panel, SollumzExportSettingsPanel):
@@ -224,6 +236,13 @@ class SOLLUMZ_PT_export_drawable(bpy.types.Panel, SollumzExportSettingsPanel):
     def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzExportSettings):
         layout.prop(settings, "apply_transforms")
         layout.prop(settings, "export_with_ytyp")
+        layout.prop(settings, "compact_vertex_floats")
+        layout.prop(settings, "vertex_weld_decimals")
+        layout.prop(settings, "optimize_vertex_cache")
+        layout.prop(settings, "use_geometry_cache")
+        row = layout.row()
+        row.active = settings.use_geometry_cache
+        row.prop(settings, "force_full_export")
 
 
 class SOLLUMZ_PT_export_fragment(bpy.types.Panel, SollumzExportSettingsPanel):
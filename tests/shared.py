@@ -19,12 +19,17 @@ def get_env_path(name: str) -> Optional[Path]:
 SOLLUMZ_TEST_TMP_DIR = get_env_path("SOLLUMZ_TEST_TMP_DIR")
 SOLLUMZ_TEST_GAME_ASSETS_DIR = get_env_path("SOLLUMZ_TEST_GAME_ASSETS_DIR")
 SOLLUMZ_TEST_ASSETS_DIR = Path(__file__).parent.joinpath("assets/")
+SOLLUMZ_TEST_BENCHMARKS = os.getenv("SOLLUMZ_TEST_BENCHMARKS", default="").lower() in ("1", "true")
 
 
 def is_tmp_dir_available() -> bool:
     return SOLLUMZ_TEST_TMP_DIR is not None
 
 
+def is_benchmark_enabled() -> bool:
+    return SOLLUMZ_TEST_BENCHMARKS
+
+
 def tmp_path(file_name: str, subdirectory: Optional[str] = None) -> Path:
     if not is_tmp_dir_available():
         raise Exception("SOLLUMZ_TEST_TMP_DIR environment variable is required.")
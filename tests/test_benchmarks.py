@@ -0,0 +1,833 @@
+"""Micro-benchmarks comparing optimized code paths with the implementations they replaced.
+
+Only run when the ``SOLLUMZ_TEST_BENCHMARKS`` environment variable is set to ``true``. Use ``pytest -s`` to see the
+timings.
+"""
+import io
+import sys
+import time
+import tracemalloc
+import bpy
+import numpy as np
+from mathutils import Quaternion, Vector
+from numpy.testing import assert_allclose, assert_array_equal
+from xml.etree import ElementTree as ET
+from .shared import is_benchmark_enabled
+from .test_vertex_cache import grid_triangles
+from ..cwxml.bound import (
+    POLYGON_DTYPES,
+    BoundPolygons,
+    PolygonsProperty,
+    PolygonType,
+    VertexColorProperty,
+    VerticesProperty,
+)
+from ..cwxml.drawable import IndexBuffer, VertexBuffer, VertexLayoutList
+from ..cwxml.element import SLOT_NAMES_BY_TYPE, AttributeProperty, Element, ElementTree, ListProperty, XmlWriter
+from ..cwxml.clipdictionary import Animation, ChannelsList, FramesBuffer, ValuesBuffer
+from ..cwxml.navmesh import NavPolygons, NavPolygonsProperty
+from ..cwxml.ymap import CMapData, Entity
+from ..tools.animationhelper import Track, TrackFormat
+from ..tools.fcurvesampling import sample_fcurves
+from ..tools.npformat import FloatFormat
+from ..tools.utils import np_arr_to_str
+from ..ydr.vertex_buffer_builder import VertexBufferBuilder, dedupe_and_get_indices
+from ..ydr.vertex_cache import calc_acmr, optimize_vertex_cache
+from ..ycd.ycdexport import build_values_channel
+from ..ycd.ycdimport import combine_sequences_and_build_action_data
+from ..ydr.ydrexport import get_loop_inds_by_material, join_ind_arrs, join_vert_arrs, split_vert_buffers
+from ..ynv.ynvimport import get_material as ynv_get_material, polygons_to_obj as ynv_polygons_to_obj
+
+
+def measure(func, *args, repeat: int = 3) -> float:
+    """Returns the best time in seconds of ``repeat`` calls to ``func``."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, old_time: float, new_time: float):
+    print(f"\n{name}: old {old_time * 1000:.2f} ms, new {new_time * 1000:.2f} ms ({old_time / new_time:.1f}x)")
+
+
+def random_vertex_buffer(num_verts: int, layout: list[str]) -> VertexBuffer:
+    rng = np.random.default_rng(0)
+    struct_dtype = np.dtype([VertexBuffer.VERT_ATTR_DTYPES[name] for name in layout])
+    data = np.empty(num_verts, dtype=struct_dtype)
+    for name in layout:
+        shape = data[name].shape
+        if data[name].dtype == np.uint32:
+            data[name] = rng.integers(0, 256, size=shape)
+        else:
+            data[name] = rng.uniform(-100.0, 100.0, size=shape)
+
+    vertex_buffer = VertexBuffer()
+    vertex_buffer.layout = VertexLayoutList(value=layout)
+    vertex_buffer.data = data
+    return vertex_buffer
+
+
+if is_benchmark_enabled():
+    def legacy_vertex_data_to_str(vertex_buffer: VertexBuffer) -> str:
+        vert_arr = vertex_buffer.data
+        formats = []
+        for field_name in vert_arr.dtype.names:
+            attr_fmt = "%.0u" if vert_arr.dtype[field_name].base == np.uint32 else "%.7f"
+            formats.append(" ".join([attr_fmt] * vert_arr[field_name].shape[1]))
+
+        vert_arr_2d = np.column_stack([vert_arr[name] for name in vert_arr.dtype.names])
+        return np_arr_to_str(vert_arr_2d, "   ".join(formats))
+
+    def legacy_indices_to_str(index_buffer: IndexBuffer) -> str:
+        indices_arr = index_buffer.data
+        num_divisble_inds = len(indices_arr) - (len(indices_arr) % 24)
+        index_buffer_str = np_arr_to_str(indices_arr[:num_divisble_inds].reshape((-1, 24)), fmt="%.0u")
+        last_row_str = np_arr_to_str(indices_arr[num_divisble_inds:], fmt="%.0u")
+        return f"{index_buffer_str}\n{last_row_str}"
+
+    def test_benchmark_vertex_buffer_encode_1m_verts():
+        layout = ["Position", "Normal", "Colour0", "TexCoord0", "Tangent"]
+        vertex_buffer = random_vertex_buffer(1_000_000, layout)
+
+        assert vertex_buffer._data_to_str() == legacy_vertex_data_to_str(vertex_buffer)
+
+        old_time = measure(legacy_vertex_data_to_str, vertex_buffer, repeat=1)
+        new_time = measure(vertex_buffer._data_to_str, repeat=1)
+        report("VertexBuffer encode (1M vertices)", old_time, new_time)
+
+        vertex_buffer.float_format = FloatFormat.SHORTEST
+        shortest_time = measure(vertex_buffer._data_to_str, repeat=1)
+        report("VertexBuffer encode shortest (1M vertices)", old_time, shortest_time)
+
+    def test_benchmark_index_buffer_encode_3m_indices():
+        index_buffer = IndexBuffer()
+        index_buffer.data = np.random.default_rng(0).integers(0, 65535, 3_000_000, dtype=np.uint32)
+
+        assert index_buffer._inds_to_str() == legacy_indices_to_str(index_buffer)
+
+        old_time = measure(legacy_indices_to_str, index_buffer, repeat=1)
+        new_time = measure(index_buffer._inds_to_str, repeat=1)
+        report("IndexBuffer encode (3M indices)", old_time, new_time)
+
+    def iter_element_objects(obj):
+        """Yields ``obj`` and all the element and attribute objects below it."""
+        yield obj
+        if isinstance(obj, ElementTree):
+            children = obj.get_properties().values()
+        elif isinstance(obj, ListProperty):
+            children = obj.value
+        else:
+            return
+
+        for child in children:
+            if isinstance(child, (Element, AttributeProperty)):
+                yield from iter_element_objects(child)
+
+    def get_object_attrs(obj) -> dict:
+        attrs = {}
+        for name in SLOT_NAMES_BY_TYPE[type(obj)]:
+            try:
+                attrs[name] = object.__getattribute__(obj, name)
+            except AttributeError:
+                pass
+        try:
+            attrs.update(object.__getattribute__(obj, "__dict__"))
+        except AttributeError:
+            pass
+        return attrs
+
+    dict_backed_types = {}
+
+    def dict_backed_copy(obj):
+        """Copy of ``obj`` with its attributes in a ``__dict__``, like all element objects were before they used
+        ``__slots__``."""
+        obj_type = type(obj)
+        if obj_type not in dict_backed_types:
+            dict_backed_types[obj_type] = type(obj_type.__name__, (), {})
+
+        new = dict_backed_types[obj_type]()
+        for name, value in get_object_attrs(obj).items():
+            setattr(new, name, value)
+        return new
+
+    def same_type_copy(obj):
+        new = object.__new__(type(obj))
+        for name, value in get_object_attrs(obj).items():
+            object.__setattr__(new, name, value)
+        return new
+
+    def measure_copies_memory(objects: list, copy_func) -> int:
+        """Returns the bytes allocated by copies of ``objects``. The attribute values are shared with the originals,
+        so only the objects themselves are measured."""
+        tracemalloc.start()
+        try:
+            copies = [copy_func(obj) for obj in objects]
+            size = tracemalloc.get_traced_memory()[0] - sys.getsizeof(copies)
+        finally:
+            tracemalloc.stop()
+        return size
+
+    def benchmark_element_objects_memory(name: str, root: Element):
+        objects = list(iter_element_objects(root))
+        old_size = measure_copies_memory(objects, dict_backed_copy)
+        new_size = measure_copies_memory(objects, same_type_copy)
+        num_nodes = len(objects)
+        print(
+            f"\n{name}: {num_nodes} nodes, old {old_size / num_nodes:.1f} bytes/node, "
+            f"new {new_size / num_nodes:.1f} bytes/node ({old_size / new_size:.1f}x)"
+        )
+
+    def test_benchmark_memory_large_ymap(tmp_path):
+        rng = np.random.default_rng(0)
+        ymap = CMapData()
+        for i in range(20_000):
+            entity = Entity()
+            entity.archetype_name = f"prop_{i}"
+            entity.guid = i
+            entity.position = Vector(rng.uniform(-1000.0, 1000.0, 3))
+            entity.lod_dist = 100.0
+            entity.lod_level = "LODTYPES_DEPTH_ORPHANHD"
+            entity.priority_level = "PRI_REQUIRED"
+            ymap.entities.append(entity)
+
+        path = tmp_path / "large.ymap.xml"
+        ymap.write_xml(path)
+
+        benchmark_element_objects_memory("Memory (ymap, 20k entities)", CMapData.from_xml_file(path))
+
+    class LegacyPolyTriangle(ElementTree):
+        tag_name = "Triangle"
+        __slots__ = ("material_index", "v1", "v2", "v3", "f1", "f2", "f3")
+
+        def __init__(self):
+            super().__init__()
+            self.material_index = AttributeProperty("m", 0)
+            self.v1 = AttributeProperty("v1", 0)
+            self.v2 = AttributeProperty("v2", 0)
+            self.v3 = AttributeProperty("v3", 0)
+            self.f1 = AttributeProperty("f1", 0)
+            self.f2 = AttributeProperty("f2", 0)
+            self.f3 = AttributeProperty("f3", 0)
+
+    def legacy_load_polygons(element: ET.Element) -> list[LegacyPolyTriangle]:
+        return [LegacyPolyTriangle.from_xml(child) for child in element.iter() if child.tag == "Triangle"]
+
+    def legacy_write_polygons(polygons: list[LegacyPolyTriangle]):
+        XmlWriter(io.StringIO()).write_tree("Polygons", [], polygons, 0)
+
+    def write_polygons(polygons: PolygonsProperty):
+        polygons.write_to(XmlWriter(io.StringIO()))
+
+    def measure_memory(func, *args) -> int:
+        """Returns the bytes still allocated by the result of ``func``."""
+        tracemalloc.start()
+        try:
+            result = func(*args)
+            size = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        del result
+        return size
+
+    def test_benchmark_bvh_polygons_200k():
+        num_triangles = 200_000
+        triangles = np.zeros(num_triangles, dtype=POLYGON_DTYPES[PolygonType.TRIANGLE])
+        triangles["material_index"] = np.arange(num_triangles) % 7
+        triangles["v1"] = np.arange(num_triangles)
+        triangles["v2"] = np.arange(num_triangles) + 1
+        triangles["v3"] = np.arange(num_triangles) + 2
+        triangles["f1"] = np.arange(num_triangles) - 1
+        polygons = PolygonsProperty(value=BoundPolygons.concatenate([(PolygonType.TRIANGLE, triangles)]))
+        element = polygons.to_xml()
+
+        legacy_polygons = legacy_load_polygons(element)
+        assert [(p.material_index, p.v1, p.v2, p.v3, p.f1) for p in legacy_polygons[:1000]] == [
+            tuple(row) for row in triangles[["material_index", "v1", "v2", "v3", "f1"]][:1000].tolist()
+        ]
+        assert_array_equal(PolygonsProperty.from_xml(element).value.triangles, triangles)
+
+        old_time = measure(legacy_load_polygons, element, repeat=1)
+        new_time = measure(PolygonsProperty.from_xml, element, repeat=1)
+        report("BVH polygons decode (200k triangles)", old_time, new_time)
+
+        old_time = measure(legacy_write_polygons, legacy_polygons, repeat=1)
+        new_time = measure(write_polygons, polygons, repeat=1)
+        report("BVH polygons encode (200k triangles)", old_time, new_time)
+
+        old_size = measure_memory(legacy_load_polygons, element)
+        new_size = measure_memory(PolygonsProperty.from_xml, element)
+        print(
+            f"\nMemory (200k BVH triangles): old {old_size / num_triangles:.1f} bytes/polygon, "
+            f"new {new_size / num_triangles:.1f} bytes/polygon ({old_size / new_size:.1f}x)"
+        )
+
+    def legacy_load_bound_vertices(text: str) -> list[Vector]:
+        vertices = []
+        for line in text.strip().split("\n"):
+            coords = line.strip().split(",")
+            vertices.append(Vector((float(coords[0]), float(coords[1]), float(coords[2]))))
+        return vertices
+
+    def legacy_bound_vertices_to_str(vertices: list[Vector]) -> str:
+        text = ["\n"]
+        for vertex in vertices:
+            for index, component in enumerate(vertex):
+                text.append(str(component))
+                if index < len(vertex) - 1:
+                    text.append(", ")
+            text.append("\n")
+        return "".join(text)
+
+    def legacy_load_bound_vertex_colors(text: str) -> list[tuple[int, int, int, int]]:
+        colors = []
+        for line in text.strip().split("\n"):
+            c = line.strip().split(",")
+            colors.append((int(c[0]), int(c[1]), int(c[2]), int(c[3])))
+        return colors
+
+    def test_benchmark_bound_vertices_200k():
+        rng = np.random.default_rng(0)
+        vertices = VerticesProperty(value=rng.uniform(-1000.0, 1000.0, (200_000, 3)).astype(np.float32))
+        text = "".join(vertices._iter_text())
+        element = ET.Element("Vertices")
+        element.text = text
+
+        legacy_vertices = legacy_load_bound_vertices(text)
+        assert_array_equal(VerticesProperty.from_xml(element).value, np.array(legacy_vertices, dtype=np.float32))
+
+        old_time = measure(legacy_load_bound_vertices, text, repeat=1)
+        new_time = measure(VerticesProperty.from_xml, element, repeat=1)
+        report("Bound vertices decode (200k vertices)", old_time, new_time)
+
+        old_time = measure(legacy_bound_vertices_to_str, legacy_vertices, repeat=1)
+        new_time = measure(vertices.to_xml, repeat=1)
+        report("Bound vertices encode (200k vertices)", old_time, new_time)
+
+        colors = VertexColorProperty(value=rng.integers(0, 256, (200_000, 4), dtype=np.uint8))
+        element = colors.to_xml()
+        assert_array_equal(VertexColorProperty.from_xml(element).value, legacy_load_bound_vertex_colors(element.text))
+
+        old_time = measure(legacy_load_bound_vertex_colors, element.text, repeat=1)
+        new_time = measure(VertexColorProperty.from_xml, element, repeat=1)
+        report("Bound vertex colors decode (200k vertices)", old_time, new_time)
+
+    def legacy_load_buffer(text: str, item_type: type) -> list:
+        values = []
+        for line in text.strip().split("\n"):
+            for item in line.strip().split(" "):
+                values.append(item_type(item))
+        return values
+
+    def legacy_buffer_to_str(values: list) -> str:
+        columns = 10
+        text = []
+        for index, value in enumerate(values):
+            text.append(str(value))
+            if index < len(values) - 1:
+                text.append(" ")
+            if (index + 1) % columns == 0:
+                text.append("\n")
+        return "".join(text)
+
+    def test_benchmark_clip_buffers_2m_values():
+        rng = np.random.default_rng(0)
+        values = ValuesBuffer(rng.uniform(-1.0, 1.0, 2_000_000).astype(np.float32))
+        frames = FramesBuffer(rng.integers(0, 256, 2_000_000, dtype=np.uint32))
+
+        for name, buffer, item_type in (("ValuesBuffer", values, float), ("FramesBuffer", frames, int)):
+            element = buffer.to_xml()
+            legacy_values = legacy_load_buffer(element.text, item_type)
+            legacy_element = ET.Element(buffer.tag_name)
+            legacy_element.text = legacy_buffer_to_str(legacy_values)
+            assert_array_equal(np.array(legacy_values, dtype=buffer.dtype), buffer.value)
+            assert_array_equal(type(buffer).from_xml(legacy_element).value, buffer.value)
+
+            old_time = measure(legacy_load_buffer, element.text, item_type, repeat=1)
+            new_time = measure(type(buffer).from_xml, element, repeat=1)
+            report(f"{name} decode (2M values)", old_time, new_time)
+
+            old_time = measure(legacy_buffer_to_str, legacy_values, repeat=1)
+            new_time = measure(buffer.to_xml, repeat=1)
+            report(f"{name} encode (2M values)", old_time, new_time)
+
+    def synthetic_navmesh_polygons(num_polys: int) -> ET.Element:
+        rng = np.random.default_rng(0)
+        lengths = rng.integers(3, 7, num_polys)
+        vertices = rng.uniform(-1000.0, 1000.0, (int(lengths.sum()), 3)).astype(np.float32)
+        flags = [f"{i % 5} {i % 3 * 64} 0 255 161 107" for i in range(num_polys)]
+        polygons = NavPolygonsProperty(value=NavPolygons(vertices, lengths.astype(np.uint32), flags, [""] * num_polys))
+        return polygons.to_xml()
+
+    def legacy_load_nav_polygons(element: ET.Element) -> list[tuple[str, list[Vector]]]:
+        polygons = []
+        for item in element:
+            verts = []
+            for txt in item.find("Vertices").text.strip().split("\n"):
+                nums = txt.split(", ")
+                verts.append(Vector((float(nums[0]), float(nums[1]), float(nums[2]))))
+            polygons.append((item.find("Flags").text, verts))
+        return polygons
+
+    def legacy_polygons_to_mesh(polygons: list[tuple[str, list[Vector]]]) -> bpy.types.Mesh:
+        material_cache = {}
+        mats = []
+        verts = []
+        indices = []
+        for flags, poly_verts in polygons:
+            mats.append(ynv_get_material(flags, material_cache))
+            indices.append(list(range(len(verts), len(verts) + len(poly_verts))))
+            verts.extend(poly_verts)
+
+        mesh = bpy.data.meshes.new("legacy_navmesh")
+        mesh.from_pydata(verts, [], indices)
+        used_materials = []
+        for mat in mats:
+            if mat not in used_materials:
+                mesh.materials.append(mat)
+                used_materials.append(mat)
+
+        for idx, poly in enumerate(mesh.polygons):
+            poly.material_index = used_materials.index(mats[idx])
+
+        return mesh
+
+    def get_mesh_arrays(mesh: bpy.types.Mesh) -> tuple[np.ndarray, ...]:
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+        vertex_indices = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", vertex_indices)
+        material_indices = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("material_index", material_indices)
+        return co, loop_totals, vertex_indices, material_indices, len(mesh.edges)
+
+    def test_benchmark_navmesh_polygons_50k():
+        element = synthetic_navmesh_polygons(50_000)
+
+        legacy_polygons = legacy_load_nav_polygons(element)
+        polygons = NavPolygonsProperty.from_xml(element).value
+        legacy_vertices = np.array([v for _, verts in legacy_polygons for v in verts], dtype=np.float32)
+        assert_array_equal(polygons.vertices, legacy_vertices)
+
+        old_time = measure(legacy_load_nav_polygons, element, repeat=1)
+        new_time = measure(NavPolygonsProperty.from_xml, element, repeat=1)
+        report("Navmesh polygons decode (50k polygons)", old_time, new_time)
+
+        start = time.perf_counter()
+        legacy_mesh = legacy_polygons_to_mesh(legacy_polygons)
+        old_time = time.perf_counter() - start
+        start = time.perf_counter()
+        obj = ynv_polygons_to_obj(polygons)
+        new_time = time.perf_counter() - start
+        report("Navmesh polygons to mesh (50k polygons)", old_time, new_time)
+
+        for legacy_array, array in zip(get_mesh_arrays(legacy_mesh), get_mesh_arrays(obj.data)):
+            assert_array_equal(array, legacy_array)
+        # Materials are created again for the new mesh, with a numeric suffix
+        material_names = [m.name.split(".")[0] for m in obj.data.materials]
+        assert material_names == [m.name.split(".")[0] for m in legacy_mesh.materials]
+
+        bpy.data.meshes.remove(legacy_mesh)
+        bpy.data.objects.remove(obj)
+
+    def legacy_split_vert_buffers(vert_buffer: np.ndarray, ind_buffer: np.ndarray):
+        MAX_INDEX = 65535
+
+        total_index = 0
+        idx_count = len(ind_buffer)
+
+        split_vert_arrs = []
+        split_ind_arrs = []
+        while total_index < idx_count:
+            old_index_to_new_index = {}
+            chunk_vertices_indices = []
+            chunk_indices = []
+            chunk_index = 0
+            while total_index < idx_count and len(chunk_indices) < MAX_INDEX:
+                old_index = ind_buffer[total_index]
+                existing_index = old_index_to_new_index.get(old_index, None)
+                if existing_index is not None:
+                    chunk_indices.append(existing_index)
+                else:
+                    chunk_indices.append(chunk_index)
+                    chunk_vertices_indices.append(old_index)
+                    old_index_to_new_index[old_index] = chunk_index
+                    chunk_index += 1
+
+                total_index += 1
+
+            split_vert_arrs.append(vert_buffer[chunk_vertices_indices])
+            split_ind_arrs.append(np.array(chunk_indices, dtype=np.uint32))
+
+        return (tuple(split_vert_arrs), tuple(split_ind_arrs))
+
+    def test_benchmark_split_vert_buffers_3m_indices():
+        rng = np.random.default_rng(0)
+        num_verts = 500_000
+        vert_buffer = random_vertex_buffer(num_verts, ["Position", "Normal", "Colour0", "TexCoord0"]).data
+        # Mostly local triangles, like a real mesh, with some far away vertices
+        ind_buffer = (np.repeat(np.arange(1_000_000), 3) // 6 + rng.integers(0, 8, 3_000_000)) % num_verts
+        ind_buffer[rng.integers(0, 3_000_000, 10_000)] = rng.integers(0, num_verts, 10_000)
+        ind_buffer = ind_buffer.astype(np.uint32)
+
+        expected_verts, expected_inds = legacy_split_vert_buffers(vert_buffer, ind_buffer)
+        split_verts, split_inds = split_vert_buffers(vert_buffer, ind_buffer)
+        assert len(split_verts) == len(expected_verts) == 46
+        for verts, inds, expected_vert_arr, expected_ind_arr in zip(
+            split_verts, split_inds, expected_verts, expected_inds
+        ):
+            assert inds.dtype == expected_ind_arr.dtype
+            assert_array_equal(inds, expected_ind_arr)
+            assert_array_equal(verts, expected_vert_arr)
+
+        old_time = measure(legacy_split_vert_buffers, vert_buffer, ind_buffer, repeat=1)
+        new_time = measure(split_vert_buffers, vert_buffer, ind_buffer, repeat=1)
+        report("Split vertex buffers (3M indices)", old_time, new_time)
+
+    def legacy_dedupe_and_get_indices(vertex_arr: np.ndarray):
+        vertex_arr_flatten = np.concatenate(
+            [vertex_arr[name] for name in vertex_arr.dtype.names], axis=1, dtype=np.float64)
+        np.round(vertex_arr_flatten, out=vertex_arr_flatten, decimals=6)
+        _, unique_indices, inverse_indices = np.unique(
+            vertex_arr_flatten, axis=0, return_index=True, return_inverse=True)
+        return vertex_arr[unique_indices], np.asarray(inverse_indices, dtype=np.uint32)
+
+    def test_benchmark_dedupe_1m_loops():
+        # Each vertex used by 4 loops on average, with rounding errors in the normals
+        rng = np.random.default_rng(0)
+        layout = ["Position", "Normal", "Colour0", "TexCoord0", "Tangent"]
+        vertex_arr = random_vertex_buffer(250_000, layout).data[rng.integers(0, 250_000, 1_000_000)]
+        vertex_arr["Normal"] += rng.uniform(-1e-8, 1e-8, vertex_arr["Normal"].shape)
+
+        expected_verts, expected_inds = legacy_dedupe_and_get_indices(vertex_arr)
+        verts, inds = dedupe_and_get_indices(vertex_arr)
+        assert len(verts) == len(expected_verts)
+        assert_array_equal(verts[inds]["Position"], expected_verts[expected_inds]["Position"])
+        assert_array_equal(verts[inds]["TexCoord0"], expected_verts[expected_inds]["TexCoord0"])
+
+        old_time = measure(legacy_dedupe_and_get_indices, vertex_arr, repeat=1)
+        new_time = measure(dedupe_and_get_indices, vertex_arr, repeat=1)
+        report("Dedupe vertices (1M loops)", old_time, new_time)
+
+    def test_benchmark_optimize_vertex_cache_1m_loops():
+        # Grid with the triangles in random order, 333k triangles. No previous implementation, compare with the dedupe
+        # of the same loops to see the time the "Optimize Vertex Cache" export option adds to each geometry.
+        rng = np.random.default_rng(0)
+        size = 409
+        tris = grid_triangles(size)
+        tris = tris[rng.permutation(len(tris))]
+        layout = ["Position", "Normal", "Colour0", "TexCoord0", "Tangent"]
+        loop_arr = random_vertex_buffer(size * size, layout).data[tris.ravel()]
+        vertex_arr, ind_arr = dedupe_and_get_indices(loop_arr)
+
+        new_vertex_arr, new_ind_arr = optimize_vertex_cache(vertex_arr, ind_arr)
+        assert calc_acmr(new_ind_arr) < calc_acmr(ind_arr)
+
+        dedupe_time = measure(dedupe_and_get_indices, loop_arr, repeat=1)
+        optimize_time = measure(optimize_vertex_cache, vertex_arr, ind_arr, repeat=1)
+        print(
+            f"\nOptimize vertex cache ({len(loop_arr) / 1e6:.1f}M loops): {optimize_time * 1000:.2f} ms, "
+            f"dedupe {dedupe_time * 1000:.2f} ms, ACMR {calc_acmr(ind_arr):.2f} -> {calc_acmr(new_ind_arr):.2f}"
+        )
+
+    def grid_mesh_with_materials(size: int, num_materials: int) -> bpy.types.Mesh:
+        rng = np.random.default_rng(0)
+        xs, ys = np.meshgrid(np.arange(size + 1, dtype=np.float32), np.arange(size + 1, dtype=np.float32))
+        co = np.column_stack((xs.ravel(), ys.ravel(), np.zeros(xs.size, dtype=np.float32)))
+        corners = (np.arange(size)[:, None] * (size + 1) + np.arange(size)[None, :]).ravel()
+        quads = np.column_stack((corners, corners + 1, corners + size + 2, corners + size + 1))
+
+        mesh = bpy.data.meshes.new("grid_with_materials")
+        mesh.vertices.add(len(co))
+        mesh.vertices.foreach_set("co", co.ravel())
+        mesh.loops.add(quads.size)
+        mesh.loops.foreach_set("vertex_index", quads.ravel().astype(np.int32))
+        mesh.polygons.add(len(quads))
+        mesh.polygons.foreach_set("loop_start", np.arange(0, quads.size, 4, dtype=np.int32))
+        mesh.polygons.foreach_set("loop_total", np.full(len(quads), 4, dtype=np.int32))
+        mesh.update(calc_edges=True)
+        for i in range(num_materials):
+            mesh.materials.append(bpy.data.materials.new(f"grid_material_{i}"))
+        mesh.polygons.foreach_set("material_index", rng.integers(0, num_materials, len(quads)).astype(np.int32))
+        mesh.calc_loop_triangles()
+        return mesh
+
+    def legacy_partition_by_material(mesh: bpy.types.Mesh, vert_buffer: np.ndarray) -> list[np.ndarray]:
+        tri_mat_indices = np.empty(len(mesh.loop_triangles), dtype=np.uint32)
+        mesh.loop_triangles.foreach_get("material_index", tri_mat_indices)
+        loop_mat_inds = np.repeat(tri_mat_indices, 3)
+        all_loop_inds = np.empty(len(mesh.loop_triangles) * 3, dtype=np.uint32)
+        mesh.loop_triangles.foreach_get("loops", all_loop_inds)
+        return [
+            vert_buffer[all_loop_inds[np.where(loop_mat_inds == i)[0]]][["Position", "Normal", "TexCoord0"]]
+            for i in range(len(mesh.materials))
+        ]
+
+    def partition_by_material(mesh: bpy.types.Mesh, vert_buffer: np.ndarray) -> list[np.ndarray]:
+        loop_inds, loop_slices_by_mat = get_loop_inds_by_material(mesh, list(mesh.materials))
+        vert_buffer = vert_buffer.view((np.void, vert_buffer.dtype.itemsize))[loop_inds].view(vert_buffer.dtype)
+        return [
+            vert_buffer[loop_slice][["Position", "Normal", "TexCoord0"]] for loop_slice in loop_slices_by_mat.values()
+        ]
+
+    def test_benchmark_partition_by_material_40_materials():
+        mesh = grid_mesh_with_materials(400, 40)
+        layout = ["Position", "Normal", "Colour0", "TexCoord0", "TexCoord1", "Tangent"]
+        vert_buffer = random_vertex_buffer(len(mesh.loops), layout).data
+
+        expected = legacy_partition_by_material(mesh, vert_buffer)
+        partitioned = partition_by_material(mesh, vert_buffer)
+        assert len(partitioned) == len(expected) == 40
+        for arr, expected_arr in zip(partitioned, expected):
+            assert_array_equal(arr, expected_arr)
+
+        old_time = measure(legacy_partition_by_material, mesh, vert_buffer)
+        new_time = measure(partition_by_material, mesh, vert_buffer)
+        report("Partition loops by material (640k loops, 40 materials)", old_time, new_time)
+
+        materials = list(mesh.materials)
+        bpy.data.meshes.remove(mesh)
+        for mat in materials:
+            bpy.data.materials.remove(mat)
+
+    def legacy_build_vertex_buffer(mesh: bpy.types.Mesh, loop_inds: np.ndarray) -> np.ndarray:
+        # Each attribute in its own loop domain array, then copied into a structured array and gathered again
+        vert_inds = np.empty(len(mesh.loops), dtype=np.uint32)
+        mesh.loops.foreach_get("vertex_index", vert_inds)
+        positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.attributes["position"].data.foreach_get("vector", positions)
+        positions = positions.reshape((-1, 3))[vert_inds]
+        normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+        mesh.loops.foreach_get("normal", normals)
+        normals = normals.reshape((-1, 3))
+        tangents = np.zeros((len(mesh.loops), 4), dtype=np.float32)
+
+        vertex_arr = np.empty(
+            len(mesh.loops), dtype=[("Position", np.float32, 3), ("Normal", np.float32, 3), ("Tangent", np.float32, 4)])
+        vertex_arr["Position"] = positions
+        vertex_arr["Normal"] = normals
+        vertex_arr["Tangent"] = tangents
+        return vertex_arr.view((np.void, vertex_arr.dtype.itemsize))[loop_inds].view(vertex_arr.dtype)
+
+    def build_vertex_buffer(mesh: bpy.types.Mesh, loop_inds: np.ndarray) -> np.ndarray:
+        return VertexBufferBuilder(mesh).build(loop_inds)
+
+    def measure_peak_memory(func, *args) -> int:
+        tracemalloc.start()
+        try:
+            func(*args)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return peak
+
+    def test_benchmark_vertex_buffer_builder_2m_loops():
+        mesh = grid_mesh_with_materials(580, 4)
+        loop_inds, _ = get_loop_inds_by_material(mesh, list(mesh.materials))
+
+        expected = legacy_build_vertex_buffer(mesh, loop_inds)
+        vertex_arr = build_vertex_buffer(mesh, loop_inds)
+        assert_array_equal(vertex_arr, expected)
+
+        old_time = measure(legacy_build_vertex_buffer, mesh, loop_inds)
+        new_time = measure(build_vertex_buffer, mesh, loop_inds)
+        report(f"Build vertex buffer ({len(loop_inds) / 1e6:.1f}M triangle loops)", old_time, new_time)
+
+        old_peak = measure_peak_memory(legacy_build_vertex_buffer, mesh, loop_inds)
+        new_peak = measure_peak_memory(build_vertex_buffer, mesh, loop_inds)
+        output_size = vertex_arr.nbytes
+        print(
+            f"Build vertex buffer peak memory: old {old_peak / output_size:.2f}x, new {new_peak / output_size:.2f}x "
+            "the output buffer size"
+        )
+        assert new_peak < old_peak
+
+        materials = list(mesh.materials)
+        bpy.data.meshes.remove(mesh)
+        for mat in materials:
+            bpy.data.materials.remove(mat)
+
+    def legacy_join_vert_arrs(vert_arrs: list[np.ndarray]) -> np.ndarray:
+        num_verts = sum(len(vert_arr) for vert_arr in vert_arrs)
+        attr_names = []
+        for vert_arr in vert_arrs:
+            attr_names.extend(name for name in vert_arr.dtype.names if name not in attr_names)
+        joined_arr = np.zeros(num_verts, dtype=[VertexBuffer.VERT_ATTR_DTYPES[name] for name in attr_names])
+        for attr_name in joined_arr.dtype.names:
+            row_start = 0
+            for vert_arr in vert_arrs:
+                if attr_name not in vert_arr.dtype.names:
+                    continue
+                row_end = row_start + len(vert_arr)
+                joined_arr[attr_name][row_start:row_end] = vert_arr[attr_name]
+                row_start = row_end
+        return joined_arr
+
+    def legacy_join_ind_arrs(ind_arrs: list[np.ndarray], vert_counts: list[int]) -> np.ndarray:
+        return np.concatenate([ind_arr + sum(vert_counts[:i]) for i, ind_arr in enumerate(ind_arrs)])
+
+    def join_all_geometries(
+        geoms_to_join: list[list[tuple[np.ndarray, np.ndarray]]],
+        join_vert_arrs_func,
+        join_ind_arrs_func,
+    ):
+        joined = []
+        for geoms in geoms_to_join:
+            vert_arrs = [vert_arr for vert_arr, _ in geoms]
+            ind_arrs = [ind_arr for _, ind_arr in geoms]
+            vert_counts = [len(vert_arr) for vert_arr in vert_arrs]
+            joined.append((join_vert_arrs_func(vert_arrs), join_ind_arrs_func(ind_arrs, vert_counts)))
+        return joined
+
+    def synthetic_ped_ydd_geometries(num_components: int) -> list[list[tuple[np.ndarray, np.ndarray]]]:
+        """Geometries joined by shader when exporting each LOD of each component drawable of a ped .ydd, as
+        ``(vertices, indices)``. Each component has 6 skinned models with 2 shaders."""
+        rng = np.random.default_rng(0)
+        layout = ["Position", "BlendWeights", "BlendIndices", "Normal", "Colour0", "Colour1", "TexCoord0", "Tangent"]
+        geoms_to_join = []
+        for _ in range(num_components):
+            for num_verts in (1500, 700, 300):
+                for _ in range(2):
+                    geoms = []
+                    for _ in range(6):
+                        vert_arr = random_vertex_buffer(num_verts, layout).data
+                        ind_arr = rng.integers(0, num_verts, size=num_verts * 3, dtype=np.uint32)
+                        geoms.append((vert_arr, ind_arr))
+                    geoms_to_join.append(geoms)
+        return geoms_to_join
+
+    def test_benchmark_join_geometries_ped_ydd_40_components():
+        geoms_to_join = synthetic_ped_ydd_geometries(40)
+
+        expected = join_all_geometries(geoms_to_join, legacy_join_vert_arrs, legacy_join_ind_arrs)
+        joined = join_all_geometries(geoms_to_join, join_vert_arrs, join_ind_arrs)
+        for (vert_arr, ind_arr), (expected_vert_arr, expected_ind_arr) in zip(joined, expected):
+            assert_array_equal(vert_arr, expected_vert_arr)
+            assert_array_equal(ind_arr, expected_ind_arr)
+
+        old_time = measure(join_all_geometries, geoms_to_join, legacy_join_vert_arrs, legacy_join_ind_arrs)
+        new_time = measure(join_all_geometries, geoms_to_join, join_vert_arrs, join_ind_arrs)
+        report("Join skinned geometries (ped .ydd, 40 components)", old_time, new_time)
+
+    def legacy_sample_fcurves(fcurves: list[bpy.types.FCurve], frames: np.ndarray) -> list[list[float]]:
+        return [[fcurve.evaluate(frame) for frame in frames.tolist()] for fcurve in fcurves]
+
+    def test_benchmark_sample_fcurves_200_curves_3000_frames():
+        rng = np.random.default_rng(0)
+        action = bpy.data.actions.new("benchmark_sample_fcurves")
+        fcurves = []
+        for i in range(200):
+            fcurve = action.fcurves.new(f'pose.bones["bone{i // 7}"].location', index=i % 7)
+            key_frames = np.cumsum(rng.integers(1, 12, size=400))
+            fcurve.keyframe_points.add(len(key_frames))
+            co = np.column_stack((key_frames, rng.uniform(-1.0, 1.0, size=len(key_frames))))
+            fcurve.keyframe_points.foreach_set("co", co.astype(np.float32).ravel())
+            fcurve.update()
+            fcurves.append(fcurve)
+        frames = np.linspace(0.0, 3000.0, 3000)
+
+        expected = legacy_sample_fcurves(fcurves, frames)
+        sampled = sample_fcurves(fcurves, frames)
+        for values, expected_values in zip(sampled, expected):
+            assert_allclose(values, expected_values, rtol=1e-5, atol=1e-5)
+
+        old_time = measure(legacy_sample_fcurves, fcurves, frames, repeat=1)
+        new_time = measure(sample_fcurves, fcurves, frames, repeat=1)
+        report("Sample F-curves (200 curves, 3000 frames)", old_time, new_time)
+
+        bpy.data.actions.remove(action)
+
+    def legacy_get_quantum_and_min_val(nums) -> tuple[float, float]:
+        min_val = sys.float_info.max
+        max_val = sys.float_info.min
+        min_delta = sys.float_info.max
+        last_val = 0
+        for value in nums:
+            min_val = min(min_val, value)
+            max_val = max(max_val, value)
+            if value != last_val:
+                min_delta = min(min_delta, abs(value - last_val))
+            last_val = value
+        if min_delta == sys.float_info.max:
+            min_delta = 0
+        return min_val, max(min_delta, (max_val - min_val) / 1048576)
+
+    def legacy_build_values_channels(channels_values: list[np.ndarray]):
+        for values in channels_values:
+            uniq_values, uniq_indices = np.unique(values, return_inverse=True)
+            if len(uniq_values) == 1:
+                continue
+            elif len(uniq_values) / len(values) <= 0.1:
+                legacy_get_quantum_and_min_val(uniq_values.tolist())
+                uniq_indices.astype(np.uint32)
+            else:
+                legacy_get_quantum_and_min_val(values.tolist())
+
+    def build_all_values_channels(channels_values: list[np.ndarray]):
+        for values in channels_values:
+            build_values_channel(values)
+
+    def test_benchmark_build_values_channels_300_channels_3000_frames():
+        rng = np.random.default_rng(0)
+        frames = np.linspace(0.0, 1.0, 3000)
+        channels_values = []
+        for i in range(300):
+            values = np.sin(frames * rng.uniform(1.0, 20.0) + rng.uniform(0.0, 6.0)) * rng.uniform(0.1, 2.0)
+            if i % 3 == 0:
+                values = np.round(values, 1)
+            channels_values.append(values.astype(np.float32).astype(np.float64))
+
+        old_time = measure(legacy_build_values_channels, channels_values, repeat=1)
+        new_time = measure(build_all_values_channels, channels_values, repeat=1)
+        report("Build animation channels (300 channels, 3000 frames)", old_time, new_time)
+
+    def legacy_combine_sequences(animation: Animation) -> dict:
+        action_data = {}
+        sequence = animation.sequences[0]
+        for frame_id in range(animation.frame_count):
+            for sequence_data_index, sequence_data in enumerate(sequence.sequence_data):
+                bone_data = animation.bone_ids[sequence_data_index]
+                channel_values = [channel.values[frame_id % len(channel.values)] for channel in sequence_data.channels]
+                if bone_data.format == TrackFormat.Vector3:
+                    value = Vector(channel_values)
+                else:
+                    value = Quaternion((channel_values[3], channel_values[0], channel_values[1], channel_values[2]))
+                action_data.setdefault(bone_data.bone_id, {}).setdefault(bone_data.track, []).append(value)
+        return action_data
+
+    def test_benchmark_decode_animation_100_bones_2000_frames():
+        rng = np.random.default_rng(0)
+        animation = Animation()
+        animation.frame_count = 2000
+        animation.sequence_frame_limit = 2030
+        sequence = Animation.SequenceList.Sequence()
+        for bone_id in range(100):
+            for track, track_format in ((Track.BonePosition, TrackFormat.Vector3),
+                                        (Track.BoneRotation, TrackFormat.Quaternion)):
+                bone = Animation.BoneIdList.BoneId()
+                bone.bone_id = bone_id
+                bone.track = track.value
+                bone.format = track_format.value
+                animation.bone_ids.append(bone)
+
+                sequence_data = Animation.SequenceDataList.SequenceData()
+                for _ in range(3 if track_format == TrackFormat.Vector3 else 4):
+                    channel = ChannelsList.QuantizeFloat()
+                    channel.values = rng.uniform(-1.0, 1.0, 2000).astype(np.float32)
+                    sequence_data.channels.append(channel)
+                sequence.sequence_data.append(sequence_data)
+        animation.sequences.append(sequence)
+
+        expected = legacy_combine_sequences(animation)
+        action_data = combine_sequences_and_build_action_data(animation)
+        for bone_id, bone_data in expected.items():
+            for track, values in bone_data.items():
+                assert_allclose(action_data[bone_id][track], np.array([tuple(value) for value in values]), rtol=1e-6)
+
+        old_time = measure(legacy_combine_sequences, animation, repeat=1)
+        new_time = measure(combine_sequences_and_build_action_data, animation, repeat=1)
+        report("Decode animation (100 bones, 2000 frames)", old_time, new_time)
@@ -6,6 +6,7 @@ from pathlib import Path
 from functools import cache
 from xml.etree import ElementTree as ET
 from .shared import is_tmp_dir_available, tmp_path, glob_assets
+from .test_fixtures import use_tmp_geometry_cache
 from ..yft.yftimport import import_yft
 from ..yft.yftexport import export_yft
 
@@ -87,7 +88,8 @@ if is_tmp_dir_available():  # need the temp directory to store exported .yfts
             assert obj is not None
 
             out_path = tmp_path(yft_path.name, "export_physics_properties_yfts")
-            success = export_yft(obj, str(out_path))
+            with use_tmp_geometry_cache():
+                success = export_yft(obj, str(out_path))
             assert success
             assert out_path.exists()
 
@@ -0,0 +1,65 @@
+import bpy
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+from ..tools.fcurvesampling import sample_fcurve
+
+
+def make_random_fcurve(
+    action: bpy.types.Action,
+    index: int,
+    interpolations: list[str],
+    handle_types: list[str],
+    extrapolation: str,
+    seed: int
+) -> bpy.types.FCurve:
+    rng = np.random.default_rng(seed)
+    fcurve = action.fcurves.new("location", index=index)
+    frame = 0.0
+    for _ in range(20):
+        keyframe = fcurve.keyframe_points.insert(frame, float(rng.uniform(-5.0, 5.0)))
+        keyframe.interpolation = interpolations[int(rng.integers(len(interpolations)))]
+        keyframe.handle_left_type = keyframe.handle_right_type = handle_types[int(rng.integers(len(handle_types)))]
+        frame += float(rng.uniform(0.5, 12.0))
+
+    fcurve.extrapolation = extrapolation
+    fcurve.update()
+    return fcurve
+
+
+@pytest.mark.parametrize("interpolations, handle_types, extrapolation", (
+    (["BEZIER"], ["AUTO_CLAMPED"], "CONSTANT"),
+    (["BEZIER"], ["AUTO", "VECTOR"], "CONSTANT"),
+    (["LINEAR", "CONSTANT"], ["AUTO_CLAMPED"], "CONSTANT"),
+    (["BEZIER", "LINEAR", "CONSTANT", "SINE", "BOUNCE"], ["AUTO_CLAMPED", "VECTOR"], "CONSTANT"),
+    (["BEZIER", "LINEAR"], ["AUTO"], "LINEAR"),
+))
+def test_sample_fcurve_same_as_evaluate(interpolations: list[str], handle_types: list[str], extrapolation: str):
+    action = bpy.data.actions.new("test_sample_fcurve")
+    try:
+        for seed in range(3):
+            fcurve = make_random_fcurve(action, seed, interpolations, handle_types, extrapolation, seed)
+            last_frame = fcurve.keyframe_points[-1].co[0]
+            frames = np.concatenate((
+                np.linspace(-10.0, last_frame + 10.0, 1000),
+                [keyframe.co[0] for keyframe in fcurve.keyframe_points],
+                [keyframe.co[0] + 0.005 for keyframe in fcurve.keyframe_points],
+            ))
+
+            expected = np.array([fcurve.evaluate(frame) for frame in frames])
+            assert_allclose(sample_fcurve(fcurve, frames), expected, rtol=1e-5, atol=1e-5)
+    finally:
+        bpy.data.actions.remove(action)
+
+
+def test_sample_fcurve_with_modifiers():
+    action = bpy.data.actions.new("test_sample_fcurve_with_modifiers")
+    try:
+        fcurve = make_random_fcurve(action, 0, ["BEZIER"], ["AUTO_CLAMPED"], "CONSTANT", 0)
+        fcurve.modifiers.new("CYCLES")
+        frames = np.linspace(-50.0, 300.0, 500)
+
+        expected = np.array([fcurve.evaluate(frame) for frame in frames])
+        assert_allclose(sample_fcurve(fcurve, frames), expected)
+    finally:
+        bpy.data.actions.remove(action)
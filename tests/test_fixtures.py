@@ -1,7 +1,12 @@
 import pytest
 import bpy
+from contextlib import contextmanager
+from unittest.mock import patch
 from ..ydr.shader_materials import shadermats
 from ..ybn.collision_materials import collisionmats
+from ..ydr import ydrexport
+from ..ydr.geometry_cache import GeometryCache
+from .shared import tmp_path
 
 SOLLUMZ_SHADERS = list(map(lambda s: s.value, shadermats))
 SOLLUMZ_COLLISION_MATERIALS = list(collisionmats)
@@ -50,3 +55,18 @@ def fps_dependent(request):
     yield fps / fps_base, f"{fps / fps_base:.2f}"
 
     bpy.context.scene.render.fps, bpy.context.scene.render.fps_base = prev_fps
+
+
+@contextmanager
+def use_tmp_geometry_cache():
+    """Stores the geometry cache of the exports inside the block in the tests temporary directory instead of the user
+    config directory. Requires the temporary directory."""
+    cache = GeometryCache(str(tmp_path("cache", "geometry_cache")))
+    with patch.object(ydrexport, "get_geometry_cache", lambda: cache):
+        yield cache
+
+
+@pytest.fixture()
+def tmp_geometry_cache():
+    with use_tmp_geometry_cache() as cache:
+        yield cache
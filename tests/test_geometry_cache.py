@@ -0,0 +1,136 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from numpy.testing import assert_array_equal
+from .shared import is_tmp_dir_available, tmp_path
+from ..ydr.geometry_cache import (
+    CachedGeometry,
+    GeometryCache,
+    add_shared_geometries,
+    get_shared_geometries,
+    share_geometries,
+)
+
+
+def make_vertices(num_verts: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vertices = np.empty(
+        num_verts, dtype=[("Position", np.float32, 3), ("Normal", np.float32, 3), ("TexCoord0", np.float32, 2)])
+    vertices["Position"] = rng.uniform(-10.0, 10.0, (num_verts, 3))
+    vertices["Normal"] = rng.uniform(-1.0, 1.0, (num_verts, 3))
+    vertices["TexCoord0"] = rng.uniform(0.0, 1.0, (num_verts, 2))
+    return vertices
+
+
+def make_geometry(vertices: np.ndarray, shader_index: int) -> CachedGeometry:
+    positions = vertices["Position"]
+    indices = np.arange(len(vertices) // 3 * 3, dtype=np.uint32)
+    return CachedGeometry(shader_index, vertices, indices, positions.min(axis=0), positions.max(axis=0))
+
+
+def test_geometry_cache_key_depends_on_vertices_and_params():
+    vertices = make_vertices(30)
+    key = GeometryCache.make_key(vertices, [(0, 0, 30)], 6)
+
+    assert GeometryCache.make_key(vertices.copy(), [(0, 0, 30)], 6) == key
+    assert GeometryCache.make_key(vertices, [(0, 0, 30)], 5) != key
+    assert GeometryCache.make_key(vertices[["Position", "Normal"]], [(0, 0, 30)], 6) != key
+
+    vertices["Position"][10, 2] += 0.001
+    assert GeometryCache.make_key(vertices, [(0, 0, 30)], 6) != key
+
+
+def test_share_geometries_until_outermost_block_exits():
+    geometries = [make_geometry(make_vertices(30), 0)]
+    key = GeometryCache.make_key(geometries[0].vertices)
+
+    add_shared_geometries(key, geometries)
+    assert get_shared_geometries(key) is None
+
+    with share_geometries():
+        assert get_shared_geometries(key) is None
+        with share_geometries():
+            add_shared_geometries(key, geometries)
+        assert get_shared_geometries(key) is geometries
+
+    assert get_shared_geometries(key) is None
+
+
+if is_tmp_dir_available():
+    def make_cache(name: str, max_size: int = 1024 * 1024) -> GeometryCache:
+        cache = GeometryCache(str(tmp_path(name, "geometry_cache")), max_size)
+        cache.clear()
+        return cache
+
+    def test_geometry_cache_store_and_load():
+        cache = make_cache("store_and_load")
+        vertices = make_vertices(30)
+        # Field view with padding, as created when exporting
+        geometries = [make_geometry(vertices[["Position", "TexCoord0"]], 2), make_geometry(vertices[:12], 0)]
+        key = GeometryCache.make_key(vertices)
+
+        assert cache.load(key) is None
+        cache.store(key, geometries)
+        loaded = cache.load(key)
+
+        assert len(loaded) == len(geometries)
+        for loaded_geom, geom in zip(loaded, geometries):
+            assert loaded_geom.shader_index == geom.shader_index
+            assert loaded_geom.vertices.dtype.names == geom.vertices.dtype.names
+            assert_array_equal(loaded_geom.vertices, geom.vertices)
+            assert_array_equal(loaded_geom.indices, geom.indices)
+            assert_array_equal(loaded_geom.bounding_box_min, geom.bounding_box_min)
+            assert_array_equal(loaded_geom.bounding_box_max, geom.bounding_box_max)
+
+    def test_geometry_cache_evicts_least_recently_used():
+        cache = make_cache("evict")
+        keys = [GeometryCache.make_key(make_vertices(3000, seed)) for seed in range(3)]
+        for i, key in enumerate(keys):
+            cache.store(key, [make_geometry(make_vertices(3000, i), 0)])
+            os.utime(cache._get_path(key), (i, i))
+
+        # Use the oldest entry, then go over the size limit with a new one
+        assert cache.load(keys[0]) is not None
+        cache.max_size = sum(os.path.getsize(cache._get_path(key)) for key in keys)
+        new_key = GeometryCache.make_key(make_vertices(3000, 3))
+        cache.store(new_key, [make_geometry(make_vertices(3000, 3), 0)])
+        cache.evict()
+
+        assert cache.load(keys[1]) is None
+        assert cache.load(keys[0]) is not None
+        assert cache.load(keys[2]) is not None
+        assert cache.load(new_key) is not None
+
+    def test_geometry_cache_ignores_corrupted_entries():
+        cache = make_cache("corrupted")
+        key = GeometryCache.make_key(make_vertices(30))
+        os.makedirs(cache.directory, exist_ok=True)
+        with open(cache._get_path(key), "wb") as f:
+            f.write(b"not a npz file")
+
+        assert cache.load(key) is None
+        assert not os.path.exists(cache._get_path(key))
+
+    def test_geometry_cache_store_same_key_from_threads():
+        cache = make_cache("threads")
+        geometries = [make_geometry(make_vertices(3000), 0)]
+        key = GeometryCache.make_key(geometries[0].vertices)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: cache.store(key, geometries), range(8)))
+
+        assert cache.load(key) is not None
+        assert os.listdir(cache.directory) == [os.path.basename(cache._get_path(key))]
+
+    def test_geometry_cache_store_failure_is_not_an_error():
+        # The cache directory cannot be created where a file already exists
+        not_a_directory = tmp_path("not_a_directory", "geometry_cache")
+        not_a_directory.write_bytes(b"")
+        cache = GeometryCache(str(not_a_directory))
+        geometries = [make_geometry(make_vertices(30), 0)]
+        key = GeometryCache.make_key(geometries[0].vertices)
+
+        cache.store(key, geometries)
+        cache.evict()
+
+        assert cache.load(key) is None
@@ -3,7 +3,7 @@ import numpy as np
 from numpy.testing import assert_allclose, assert_equal
 from pathlib import Path
 from xml.etree import ElementTree as ET
-from .test_fixtures import fps_dependent
+from .test_fixtures import fps_dependent, tmp_geometry_cache
 from .shared import is_tmp_dir_available, tmp_path as tmp_path_with_subdir, glob_assets, asset_path
 from ..ydr.ydrimport import import_ydr
 from ..ydr.ydrexport import export_ydr
@@ -13,9 +13,13 @@ from ..ybn.ybnimport import import_ybn
 from ..ybn.ybnexport import export_ybn
 from ..ycd.ycdimport import import_ycd
 from ..ycd.ycdexport import export_ycd
+from ..tools.exportpool import ExportPool
 
 
 if is_tmp_dir_available():
+    # Keep the geometry cache of the exports out of the user config directory
+    pytestmark = pytest.mark.usefixtures("tmp_geometry_cache")
+
     def tmp_path(file_name: str) -> Path:
         return tmp_path_with_subdir(file_name, "import_export")
 
@@ -29,6 +33,35 @@ if is_tmp_dir_available():
         assert success
         assert out_path.exists()
 
+    @pytest.mark.parametrize("ydr_path, ydr_path_str", glob_assets("ydr"))
+    def test_export_ydr_in_pool(ydr_path: Path, ydr_path_str: str):
+        obj = import_ydr(ydr_path_str)
+        assert obj is not None
+
+        out_path = tmp_path(ydr_path.name)
+        pool_out_path = tmp_path(f"pool_{ydr_path.name}")
+        assert export_ydr(obj, str(out_path))
+        with ExportPool(max_workers=2) as pool:
+            assert export_ydr(obj, str(pool_out_path), pool)
+            pending_writes = pool.take_pending_writes()
+
+        assert [pending_write.filepath for pending_write in pending_writes] == [str(pool_out_path)]
+        assert pending_writes[0].future.result() >= 0.0
+        assert pool_out_path.read_bytes() == out_path.read_bytes()
+
+    @pytest.mark.parametrize("ycd_path, ycd_path_str", glob_assets("ycd"))
+    def test_export_ycd_in_pool(ycd_path: Path, ycd_path_str: str):
+        obj = import_ycd(ycd_path_str)
+        assert obj is not None
+
+        out_path = tmp_path(ycd_path.name)
+        pool_out_path = tmp_path(f"pool_{ycd_path.name}")
+        assert export_ycd(obj, str(out_path))
+        with ExportPool(max_workers=2) as pool:
+            assert export_ycd(obj, str(pool_out_path), pool)
+
+        assert pool_out_path.read_bytes() == out_path.read_bytes()
+
     @pytest.mark.parametrize("yft_path, yft_path_str", glob_assets("yft"))
     def test_import_export_yft(yft_path: Path, yft_path_str: str):
         obj = import_yft(yft_path_str)
@@ -0,0 +1,117 @@
+import pytest
+import numpy as np
+from numpy.testing import assert_array_equal
+from ..tools.npformat import FloatFormat, columns_to_str, iter_columns_str
+from ..tools.utils import np_arr_to_str
+
+
+def random_columns(num_rows: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(0)
+    columns = [(rng.standard_normal(num_rows) * scale).astype(np.float32) for scale in (1e-6, 1.0, 100.0, 1e6, 1e10)]
+    columns.append(rng.integers(0, 2 ** 32, num_rows, dtype=np.uint64).astype(np.uint32))
+    columns.append(rng.integers(0, 256, num_rows).astype(np.uint8))
+
+    # Signed zeros, values that round to zero, ties and values that round up to the next integer
+    special_values = np.array(
+        [0.0, -0.0, 1e-9, -1e-9, 5e-8, -5e-8, 1.5e-7, 2.5e-7, 0.99999999, -9.99999995, 9999.9999999, -1e8, 123456789.0],
+        dtype=np.float32
+    )
+    for column in columns[:5]:
+        column[:len(special_values)] = special_values[:num_rows]
+        rng.shuffle(special_values)
+
+    return columns
+
+
+def legacy_columns_to_str(columns: list[np.ndarray], separators: list[str]) -> str:
+    formats = ["%.0u" if column.dtype.kind == "u" else "%.7f" for column in columns]
+    fmt = "".join(f + sep for f, sep in zip(formats, separators)) + formats[-1]
+    return np_arr_to_str(np.column_stack(columns), fmt)
+
+
+@pytest.mark.parametrize("num_rows", (1, 7, 1000, 20000))
+def test_columns_to_str_fixed_same_as_printf(num_rows: int):
+    columns = random_columns(num_rows)
+    separators = [" ", " ", "   ", " ", "   ", " "]
+
+    assert columns_to_str(columns, separators, FloatFormat.FIXED) == legacy_columns_to_str(columns, separators)
+
+
+@pytest.mark.parametrize("values", (
+    [np.nan, 1.0],
+    [np.inf, -np.inf],
+    [1e30, -1e30],
+))
+def test_columns_to_str_fixed_unsupported_values(values: list[float]):
+    columns = [np.array(values, dtype=np.float32), np.array([1, 2], dtype=np.uint32)]
+
+    assert columns_to_str(columns, [" "]) == legacy_columns_to_str(columns, [" "])
+
+
+def test_columns_to_str_fixed_float64():
+    columns = [np.array([0.1, -2.000000049], dtype=np.float64)]
+
+    assert columns_to_str(columns, []) == "0.1000000\n-2.0000000"
+
+
+def test_columns_to_str_shortest():
+    columns = [np.array([0.1, -2.5, 0.0, -0.0, 1e-9, 123.456, 0.30200914], dtype=np.float32),
+               np.array([7, 255, 0, 1, 2, 3, 4], dtype=np.uint32)]
+
+    assert columns_to_str(columns, ["   "], FloatFormat.SHORTEST) == (
+        "0.1   7\n-2.5   255\n0.0   0\n-0.0   1\n0.0   2\n123.456   3\n0.3020091   4"
+    )
+
+
+def test_columns_to_str_shortest_reads_back_same_values_as_fixed():
+    columns = random_columns(1000)
+    separators = [" "] * 6
+
+    shortest_text = columns_to_str(columns, separators, FloatFormat.SHORTEST)
+    fixed_text = columns_to_str(columns, separators, FloatFormat.FIXED)
+
+    assert len(shortest_text) < len(fixed_text)
+    shortest_values = np.fromstring(shortest_text, sep=" ").reshape((1000, 7))
+    fixed_values = np.fromstring(fixed_text, sep=" ").reshape((1000, 7))
+    for i, column in enumerate(columns):
+        assert_array_equal(shortest_values[:, i].astype(column.dtype), fixed_values[:, i].astype(column.dtype))
+
+
+def test_iter_columns_str_chunks():
+    columns = random_columns(100)
+    separators = [" "] * 6
+
+    chunks = list(iter_columns_str(columns, separators, chunk_num_rows=30))
+
+    assert len(chunks) == 4
+    assert all(chunk.startswith("\n") for chunk in chunks[1:])
+    assert "".join(chunks) == legacy_columns_to_str(columns, separators)
+
+
+def test_columns_to_str_roundtrip():
+    columns = [np.array([0.1, -2.5, 0.0, -0.0, 1e-9, 123.456, 0.30200914, 1e-5, 16777217.0], dtype=np.float32),
+               np.arange(9, dtype=np.uint32)]
+
+    assert columns_to_str(columns, [" "], FloatFormat.ROUNDTRIP) == (
+        "0.1 0\n-2.5 1\n0.0 2\n-0.0 3\n0.000000001 4\n123.456 5\n0.30200914 6\n0.00001 7\n16777216.0 8"
+    )
+
+
+def test_columns_to_str_roundtrip_falls_back_to_repr():
+    columns = [np.array([0.5, 1.6161546e-14], dtype=np.float32), np.arange(2, dtype=np.uint32)]
+
+    assert columns_to_str(columns, [" "], FloatFormat.ROUNDTRIP) == "0.5 0\n1.6161546e-14 1"
+
+
+def test_columns_to_str_roundtrip_reads_back_same_values():
+    columns = random_columns(20000)
+    rng = np.random.default_rng(1)
+    columns.append(rng.integers(0, 2 ** 32, 20000, dtype=np.uint64).astype(np.uint32).view(np.float32))
+    columns[-1][~np.isfinite(columns[-1])] = 1.0
+    separators = [" "] * 7
+
+    text = columns_to_str(columns, separators, FloatFormat.ROUNDTRIP)
+
+    values = np.array(text.replace("\n", " ").split(" ")).reshape((20000, 8))
+    for i, column in enumerate(columns):
+        assert_array_equal(values[:, i].astype(column.dtype), column)
@@ -93,3 +93,52 @@ def test_dedupe_repeated_but_with_rounding_errors():
     assert len(vertex_arr) == 2
     assert len(ind_arr) == 9
     assert_allclose(vertex_arr[ind_arr]["Normal"], input_vertex_arr["Normal"], atol=1e-6)
+
+
+def test_dedupe_keeps_first_occurrence_order():
+    struct_dtype = [VertexBuffer.VERT_ATTR_DTYPES["Position"]]
+    input_vertex_arr = np.empty(6, dtype=struct_dtype)
+    input_vertex_arr["Position"] = [
+        [5, 0, 0],
+        [-1, 0, 0],
+        [5, 0, 0],
+        [3, 0, 0],
+        [-1, 0, 0],
+        [0, 0, 0],
+    ]
+
+    vertex_arr, ind_arr = dedupe_and_get_indices(input_vertex_arr)
+
+    assert_array_equal(vertex_arr["Position"][:, 0], [5, -1, 3, 0])
+    assert_array_equal(ind_arr, [0, 1, 0, 2, 1, 3])
+    assert ind_arr.dtype == np.uint32
+
+
+@pytest.mark.parametrize("decimals, expected_num_verts", ((6, 3), (3, 2), (1, 1)))
+def test_dedupe_decimals(decimals: int, expected_num_verts: int):
+    struct_dtype = [VertexBuffer.VERT_ATTR_DTYPES["Position"]]
+    input_vertex_arr = np.empty(3, dtype=struct_dtype)
+    input_vertex_arr["Position"] = [
+        [1.0, 0, 0],
+        [1.0001, 0, 0],
+        [1.01, 0, 0],
+    ]
+
+    vertex_arr, ind_arr = dedupe_and_get_indices(input_vertex_arr, decimals)
+
+    assert len(vertex_arr) == expected_num_verts
+    assert_allclose(vertex_arr[ind_arr]["Position"], input_vertex_arr["Position"], atol=0.5 * 10 ** -decimals)
+
+
+def test_dedupe_same_vertices_as_np_unique():
+    rng = np.random.default_rng(0)
+    struct_dtype = [VertexBuffer.VERT_ATTR_DTYPES[name] for name in ("Position", "Normal", "Colour0", "TexCoord0")]
+    unique_vertex_arr = np.empty(500, dtype=struct_dtype)
+    for name in unique_vertex_arr.dtype.names:
+        unique_vertex_arr[name] = rng.integers(0, 4, unique_vertex_arr[name].shape)
+    input_vertex_arr = unique_vertex_arr[rng.integers(0, 500, 5000)]
+
+    vertex_arr, ind_arr = dedupe_and_get_indices(input_vertex_arr)
+
+    assert_array_equal(vertex_arr[ind_arr], input_vertex_arr)
+    assert len(vertex_arr) == len(np.unique(input_vertex_arr))
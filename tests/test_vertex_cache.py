@@ -0,0 +1,50 @@
+import numpy as np
+from numpy.testing import assert_array_equal
+from ..ydr.vertex_cache import calc_acmr, count_cache_misses, optimize_vertex_cache
+
+
+def grid_triangles(size: int) -> np.ndarray:
+    vert_inds = np.arange(size * size).reshape((size, size))
+    a, b = vert_inds[:-1, :-1].ravel(), vert_inds[1:, :-1].ravel()
+    c, d = vert_inds[:-1, 1:].ravel(), vert_inds[1:, 1:].ravel()
+    return np.concatenate((np.stack((a, b, c), axis=1), np.stack((c, b, d), axis=1))).astype(np.uint32)
+
+
+def test_count_cache_misses():
+    ind_arr = np.array([0, 1, 2, 2, 1, 3, 4, 5, 6, 0, 1, 2], dtype=np.uint32)
+
+    assert count_cache_misses(ind_arr, cache_size=16) == 7
+    assert count_cache_misses(ind_arr, cache_size=3) == 10
+    assert calc_acmr(ind_arr, cache_size=16) == 7 / 4
+
+
+def test_calc_acmr_empty():
+    assert calc_acmr(np.empty(0, dtype=np.uint32)) == 0.0
+
+
+def test_optimize_vertex_cache():
+    rng = np.random.default_rng(0)
+    tris = grid_triangles(50)
+    tris = tris[rng.permutation(len(tris))]
+    vertex_arr = np.arange(50 * 50) * 10
+
+    new_vertex_arr, new_ind_arr = optimize_vertex_cache(vertex_arr, tris.ravel())
+
+    assert calc_acmr(new_ind_arr) < 0.75 < calc_acmr(tris.ravel())
+    assert new_ind_arr.dtype == np.uint32
+    # Same triangles, with the same winding
+    new_tris = new_vertex_arr[new_ind_arr].reshape((-1, 3)) // 10
+    assert sorted(map(tuple, new_tris.tolist())) == sorted(map(tuple, tris.tolist()))
+    # Vertices in order of first use
+    _, first_uses = np.unique(new_ind_arr, return_index=True)
+    assert_array_equal(np.argsort(first_uses), np.arange(len(new_vertex_arr)))
+
+
+def test_optimize_vertex_cache_disconnected_triangles():
+    ind_arr = np.array([6, 7, 8, 0, 1, 2, 3, 4, 5], dtype=np.uint32)
+
+    new_vertex_arr, new_ind_arr = optimize_vertex_cache(np.arange(9), ind_arr)
+
+    new_tris = new_vertex_arr[new_ind_arr].reshape((-1, 3))
+    assert sorted(map(tuple, new_tris.tolist())) == [(0, 1, 2), (3, 4, 5), (6, 7, 8)]
+    assert_array_equal(new_ind_arr, np.arange(9))
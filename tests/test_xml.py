@@ -1,6 +1,27 @@
+import io
 import pytest
-from ..cwxml.element import get_str_type, ElementTree, ValueProperty
+import numpy as np
+from numpy.testing import assert_array_equal
+from xml.etree import ElementTree as ET
+from .shared import asset_path
+from ..cwxml.element import (
+    get_str_type,
+    indent,
+    AttributeProperty,
+    ElementTree,
+    ListProperty,
+    TextChunksElement,
+    TextProperty,
+    ValueProperty,
+    VectorProperty,
+    XmlEventStream,
+    XmlWriter,
+)
+from ..cwxml.drawable import Drawable, IndexBuffer, VertexBuffer, VertexLayoutList
 from ..cwxml.ymap import HexColorProperty
+from ..cwxml.bound import PolygonsProperty, PolygonType, VertexColorProperty, VerticesProperty
+from ..cwxml.clipdictionary import FramesBuffer, ValuesBuffer
+from ..cwxml.navmesh import NavPolygonsProperty
 
 
 @pytest.mark.parametrize("string, expected", (
@@ -52,3 +73,569 @@ def test_argb_hex_to_rgba(argb_hex, expected_rgba):
 ))
 def test_rgba_to_argb_hex(rgba, expected_argb_hex):
     assert HexColorProperty.rgba_to_argb_hex(rgba) == expected_argb_hex
+
+
+def test_xml_stream_reads_same_as_from_xml():
+    class Item(ElementTree):
+        tag_name = "Item"
+
+        def __init__(self):
+            super().__init__()
+            self.a = AttributeProperty("a", 0)
+            self.name = TextProperty("Name")
+            self.v = ValueProperty("v")
+
+    class ItemList(ListProperty):
+        list_type = Item
+        tag_name = "Items"
+
+    class Root(ElementTree):
+        tag_name = "Root"
+
+        def __init__(self):
+            super().__init__()
+            self.items = ItemList()
+            self.pos = VectorProperty("Pos")
+
+    xml = (
+        "<Root><Unknown><Nested /></Unknown>"
+        "<Items><Item a=\"1\"><Name>first</Name><v value=\"2\" /></Item><Other />"
+        "<Item a=\"3\"><Name>b</Name></Item></Items>"
+        "<Pos x=\"1\" y=\"2\" z=\"3\" /><Pos x=\"4\" y=\"5\" z=\"6\" /></Root>"
+    )
+
+    expected = Root.from_xml(ET.fromstring(xml))
+    stream = XmlEventStream(io.StringIO(xml))
+    actual = Root.from_xml_stream(stream, stream.read_root())
+
+    assert len(actual.items) == 2
+    assert ET.tostring(actual.to_xml()) == ET.tostring(expected.to_xml())
+
+
+def test_xml_file_stream_reads_same_as_from_xml():
+    path = asset_path("sollumz_cube.ydr.xml")
+
+    expected = Drawable.from_xml(ET.parse(path).getroot())
+    actual = Drawable.from_xml_file(path)
+
+    assert ET.tostring(actual.to_xml()) == ET.tostring(expected.to_xml())
+
+
+def test_xml_schema_is_cached_per_class():
+    class Base(ElementTree):
+        tag_name = "Base"
+
+        def __init__(self):
+            super().__init__()
+            self.a = AttributeProperty("a", 0)
+            self.v = ValueProperty("v")
+
+    class Derived(Base):
+        tag_name = "Derived"
+
+        def __init__(self):
+            super().__init__()
+            self.name = TextProperty("Name")
+
+    base_schema = Base.get_xml_schema()
+    derived_schema = Derived.get_xml_schema()
+
+    assert Base.get_xml_schema() is base_schema
+    assert derived_schema is not base_schema
+    assert base_schema.attributes == [("a", "a")]
+    assert base_schema.children == [("v", "v", ValueProperty)]
+    assert derived_schema.children == [("v", "v", ValueProperty), ("name", "Name", TextProperty)]
+
+
+def test_xml_from_xml_reads_first_child_with_tag():
+    class Data(ElementTree):
+        tag_name = "Data"
+
+        def __init__(self):
+            super().__init__()
+            self.a = AttributeProperty("a", "default")
+            self.first = ValueProperty("v")
+            self.second = ValueProperty("v", 5)
+            self.name = TextProperty("Name")
+
+    xml = "<Data><v value=\"1\" /><Name>n</Name><v value=\"2\" /></Data>"
+    stream = XmlEventStream(io.StringIO(xml))
+    for data in (Data.from_xml(ET.fromstring(xml)), Data.from_xml_stream(stream, stream.read_root())):
+        assert data.a == "default"
+        assert data.first == 1
+        assert data.second == 1
+        assert data.name == "n"
+        assert data.get_element("first") is not data.get_element("second")
+
+    data = Data.from_xml(ET.fromstring(xml))
+    assert isinstance(data.get_element("first"), ValueProperty)
+
+    data.first = 3
+    assert data.first == 3
+    assert data.get_element("first").value == 3
+
+    data.first = ValueProperty("v", 4)
+    assert data.first == 4
+
+
+def test_xml_slotted_element_tree():
+    class Base(ElementTree):
+        tag_name = "Item"
+        __slots__ = ("a", "v")
+
+        def __init__(self):
+            super().__init__()
+            self.a = AttributeProperty("a", 0)
+            self.v = ValueProperty("v")
+
+    class Slotted(Base):
+        __slots__ = ("name",)
+
+        def __init__(self):
+            super().__init__()
+            self.name = TextProperty("Name")
+
+    class WithDict(Base):
+        def __init__(self):
+            super().__init__()
+            self.name = TextProperty("Name")
+
+    xml = "<Item a=\"1\"><v value=\"2\" /><Name>n</Name></Item>"
+    for cls in (Slotted, WithDict):
+        item = cls.from_xml(ET.fromstring(xml))
+        assert list(item.get_properties()) == ["a", "v", "name"]
+        assert (item.a, item.v, item.name) == (1, 2, "n")
+        assert ET.tostring(item.to_xml()) == ET.tostring(ET.fromstring(xml))
+
+    with pytest.raises(AttributeError):
+        Slotted().unknown = 1
+
+
+def test_xml_element_tree_attribute_lookup():
+    class Child(ElementTree):
+        tag_name = "Child"
+
+    class Item(ElementTree):
+        tag_name = "Item"
+        type = "ItemType"
+
+        def __init__(self):
+            super().__init__()
+            self.type = AttributeProperty("type", self.type)
+            self.v = ValueProperty("v", 1)
+            self.child = Child()
+
+    item = Item()
+
+    # Only properties are resolved by a descriptor, other attributes are found by the default lookup
+    assert type(vars(Item)["v"]).__name__ == "ValuePropertyDescriptor"
+    assert "child" not in vars(Item)
+    assert isinstance(item.child, Child)
+    assert item.v == 1
+    assert item.missing is None
+
+    # Class attributes replaced by a property are still available from the class
+    assert Item.type == "ItemType"
+    assert item.type == "ItemType"
+    item.type = "Other"
+    assert item.type == "Other"
+    assert Item().type == "ItemType"
+    assert isinstance(item.get_properties()["type"], AttributeProperty)
+
+
+@pytest.mark.parametrize("layout_type, normal_str", (
+    ("GTAV1", "0.0 0.0 1.0"),
+    ("GTAV2", "0.0 0.0 1.0 0.0"),
+))
+def test_xml_vertex_buffer_data(layout_type: str, normal_str: str):
+    xml = (
+        f"<VertexBuffer><Flags value=\"0\" /><Layout type=\"{layout_type}\"><Position /><Normal /><Colour0 /></Layout>"
+        "<Data>\n"
+        f"1.5 -2.25 3.0   {normal_str}   255 128 0 255\n"
+        f"-1.0 0.0 0.5   {normal_str}   0 1 2 3\n"
+        "</Data></VertexBuffer>"
+    )
+
+    vertex_buffer = VertexBuffer.from_xml(ET.fromstring(xml))
+
+    data = vertex_buffer.data
+    assert data.dtype.names == ("Position", "Normal", "Colour0")
+    assert_array_equal(data["Position"], np.array([[1.5, -2.25, 3.0], [-1.0, 0.0, 0.5]], dtype=np.float32))
+    assert_array_equal(data["Normal"], np.array([[0.0, 0.0, 1.0], [0.0, 0.0, 1.0]], dtype=np.float32))
+    assert_array_equal(data["Colour0"], np.array([[255, 128, 0, 255], [0, 1, 2, 3]], dtype=np.uint32))
+
+
+def test_xml_vertex_buffer_data_invalid_size():
+    xml = (
+        "<VertexBuffer><Flags value=\"0\" /><Layout type=\"GTAV1\"><Position /></Layout>"
+        "<Data>1.0 2.0 3.0\n4.0 5.0</Data></VertexBuffer>"
+    )
+
+    with pytest.raises(ValueError):
+        VertexBuffer.from_xml(ET.fromstring(xml))
+
+
+def test_xml_bound_vertices():
+    element = ET.fromstring("<Vertices>\n1.5, -2.25, 3\n-1, 0, 0.125\n</Vertices>")
+
+    vertices = VerticesProperty.from_xml(element)
+
+    assert vertices.value.dtype == np.float32
+    assert_array_equal(vertices.value, np.array([[1.5, -2.25, 3.0], [-1.0, 0.0, 0.125]], dtype=np.float32))
+    assert vertices.to_xml().text == "\n1.5, -2.25, 3.0\n-1.0, 0.0, 0.125\n"
+
+
+def test_xml_bound_vertex_colors():
+    element = ET.fromstring("<VertexColours>\n255, 128, 0, 255\n0, 1, 2, 3\n</VertexColours>")
+
+    colors = VertexColorProperty.from_xml(element)
+
+    assert colors.value.dtype == np.uint8
+    assert_array_equal(colors.value, np.array([[255, 128, 0, 255], [0, 1, 2, 3]], dtype=np.uint8))
+    assert colors.to_xml().text == "\n255, 128, 0, 255\n0, 1, 2, 3\n"
+
+
+def test_xml_bound_vertices_empty():
+    vertices = VerticesProperty.from_xml(ET.fromstring("<Vertices />"))
+
+    assert vertices.value.shape == (0, 3)
+    assert vertices.to_xml() is None
+
+
+def test_xml_bound_vertices_invalid_size():
+    with pytest.raises(ValueError):
+        VerticesProperty.from_xml(ET.fromstring("<Vertices>1.0, 2.0, 3.0\n4.0, 5.0</Vertices>"))
+
+
+BOUND_POLYGONS_XML = (
+    "<Polygons>"
+    "<Triangle m=\"0\" v1=\"0\" v2=\"1\" v3=\"2\" f1=\"-1\" f2=\"1\" f3=\"2\" />"
+    "<Triangle m=\"1\" v1=\"1\" v2=\"2\" v3=\"3\" f1=\"0\" f2=\"0\" f3=\"0\" />"
+    "<Box m=\"2\" v1=\"4\" v2=\"5\" v3=\"6\" v4=\"7\" />"
+    "<Sphere m=\"0\" v=\"8\" radius=\"1.25\" />"
+    "<Triangle m=\"3\" v1=\"9\" v2=\"10\" v3=\"11\" f1=\"0\" f2=\"0\" f3=\"0\" />"
+    "<Capsule m=\"1\" v1=\"12\" v2=\"13\" radius=\"0.5\" />"
+    "<Cylinder m=\"1\" v1=\"14\" v2=\"15\" radius=\"0.75\" />"
+    "</Polygons>"
+)
+
+
+def test_xml_bound_polygons():
+    polygons = PolygonsProperty.from_xml(ET.fromstring(BOUND_POLYGONS_XML)).value
+
+    assert len(polygons) == 7
+    assert_array_equal(polygons.types, [0, 0, 1, 2, 0, 3, 4])
+    assert polygons.triangles.tolist() == [(0, 0, 1, 2, -1, 1, 2), (1, 1, 2, 3, 0, 0, 0), (3, 9, 10, 11, 0, 0, 0)]
+    assert polygons.boxes.tolist() == [(2, 4, 5, 6, 7)]
+    assert polygons.spheres.tolist() == [(0, 8, 1.25)]
+    assert polygons.capsules.tolist() == [(1, 12, 13, 0.5)]
+    assert polygons.cylinders.tolist() == [(1, 14, 15, 0.75)]
+    assert [(poly_type, len(polys)) for poly_type, polys in polygons.iter_runs()] == [
+        (PolygonType.TRIANGLE, 2),
+        (PolygonType.BOX, 1),
+        (PolygonType.SPHERE, 1),
+        (PolygonType.TRIANGLE, 1),
+        (PolygonType.CAPSULE, 1),
+        (PolygonType.CYLINDER, 1),
+    ]
+
+
+def test_xml_bound_polygons_write_same_as_read():
+    polygons = PolygonsProperty.from_xml(ET.fromstring(BOUND_POLYGONS_XML))
+    element = ET.fromstring(BOUND_POLYGONS_XML)
+    indent(element)
+    expected = ET.tostring(element, encoding="unicode")
+
+    stream = io.StringIO()
+    polygons.write_to(XmlWriter(stream))
+
+    assert stream.getvalue() == expected
+    assert ET.tostring(polygons.to_xml()) == ET.tostring(ET.fromstring(BOUND_POLYGONS_XML))
+
+
+def test_xml_bound_polygons_stream_reads_same_as_from_xml(tmp_path):
+    path = tmp_path / "polygons.xml"
+    path.write_text(BOUND_POLYGONS_XML)
+    stream = XmlEventStream(str(path))
+
+    polygons = PolygonsProperty.from_xml_stream(stream, stream.read_root()).value
+    expected = PolygonsProperty.from_xml(ET.fromstring(BOUND_POLYGONS_XML)).value
+
+    assert_array_equal(polygons.types, expected.types)
+    for poly_type in PolygonType:
+        assert_array_equal(polygons.tables[poly_type], expected.tables[poly_type])
+
+
+def test_xml_bound_polygons_missing_attributes_use_defaults():
+    xml = (
+        "<Polygons>"
+        "<Box m=\"2\" v1=\"4\" v2=\"5\" v4=\"7\" />"
+        "<Capsule m=\"1\" v1=\"12\" radius=\"0.5\" />"
+        "<Cylinder v1=\"14\" radius=\"0.75\" />"
+        "</Polygons>"
+    )
+
+    polygons = PolygonsProperty.from_xml(ET.fromstring(xml)).value
+
+    assert polygons.boxes.tolist() == [(2, 4, 5, 2, 7)]
+    assert polygons.capsules.tolist() == [(1, 12, 1, 0.5)]
+    assert polygons.cylinders.tolist() == [(0, 14, 1, 0.75)]
+
+
+NAV_POLYGONS_XML = """<Polygons>
+  <Item>
+    <Flags>0 204 0 255 161 107</Flags>
+    <Vertices>
+      1.5, 2, -3
+      4, 5.25, 6
+      7, 8, 9.5
+    </Vertices>
+    <Edges>
+      0:1, 0:2
+    </Edges>
+  </Item>
+  <Item>
+    <Flags>1 0 0 0 0 0</Flags>
+    <Vertices>
+      10, 11, 12
+      13, 14, 15
+      16, 17, 18
+      19, 20, -21
+    </Vertices>
+    <Edges />
+  </Item>
+</Polygons>
+"""
+
+
+def test_xml_nav_polygons():
+    polygons = NavPolygonsProperty.from_xml(ET.fromstring(NAV_POLYGONS_XML)).value
+
+    assert len(polygons) == 2
+    assert polygons.vertices.dtype == np.float32
+    assert_array_equal(polygons.vertices, [
+        (1.5, 2, -3), (4, 5.25, 6), (7, 8, 9.5),
+        (10, 11, 12), (13, 14, 15), (16, 17, 18), (19, 20, -21),
+    ])
+    assert_array_equal(polygons.lengths, [3, 4])
+    assert_array_equal(polygons.offsets, [0, 3])
+    assert polygons.flags == ["0 204 0 255 161 107", "1 0 0 0 0 0"]
+    assert polygons.edges[0].strip() == "0:1, 0:2"
+    assert polygons.edges[1] == ""
+
+
+def test_xml_nav_polygons_stream_reads_same_as_from_xml(tmp_path):
+    path = tmp_path / "polygons.xml"
+    path.write_text(NAV_POLYGONS_XML)
+    stream = XmlEventStream(str(path))
+
+    polygons = NavPolygonsProperty.from_xml_stream(stream, stream.read_root()).value
+    expected = NavPolygonsProperty.from_xml(ET.fromstring(NAV_POLYGONS_XML)).value
+
+    assert_array_equal(polygons.vertices, expected.vertices)
+    assert_array_equal(polygons.lengths, expected.lengths)
+    assert polygons.flags == expected.flags
+    assert polygons.edges == expected.edges
+
+
+def test_xml_nav_polygons_write_same_as_read():
+    polygons = NavPolygonsProperty.from_xml(ET.fromstring(NAV_POLYGONS_XML))
+
+    written = NavPolygonsProperty.from_xml(ET.fromstring(ET.tostring(polygons.to_xml()))).value
+
+    assert_array_equal(written.vertices, polygons.value.vertices)
+    assert_array_equal(written.lengths, polygons.value.lengths)
+    assert written.flags == polygons.value.flags
+
+
+def test_xml_nav_polygons_invalid_vertices():
+    with pytest.raises(ValueError):
+        NavPolygonsProperty.from_xml(ET.fromstring(
+            "<Polygons><Item><Flags>0</Flags><Vertices>1, 2, 3\n4, 5</Vertices></Item></Polygons>"
+        ))
+
+
+def test_xml_bound_polygons_empty():
+    polygons = PolygonsProperty.from_xml(ET.fromstring("<Polygons />"))
+
+    assert len(polygons.value) == 0
+    assert list(polygons.value.iter_runs()) == []
+    assert polygons.to_xml() is None
+
+
+def test_xml_clip_values_buffer():
+    element = ET.fromstring("<Values>0.5 -1.25 3 \n 0.1</Values>")
+
+    values = ValuesBuffer.from_xml(element)
+
+    assert values.value.dtype == np.float32
+    assert_array_equal(values.value, np.array([0.5, -1.25, 3.0, 0.1], dtype=np.float32))
+
+
+def test_xml_clip_frames_buffer():
+    element = ET.fromstring("<Frames>0 1 2 \n3</Frames>")
+
+    frames = FramesBuffer.from_xml(element)
+
+    assert frames.value.dtype == np.uint32
+    assert_array_equal(frames.value, [0, 1, 2, 3])
+
+
+@pytest.mark.parametrize("num_values, expected", (
+    (0, None),
+    (3, "0.0 0.5 1.0"),
+    (10, "0.0 0.5 1.0 1.5 2.0 2.5 3.0 3.5 4.0 4.5\n"),
+    (12, "0.0 0.5 1.0 1.5 2.0 2.5 3.0 3.5 4.0 4.5 \n5.0 5.5"),
+))
+def test_xml_clip_values_buffer_to_xml(num_values: int, expected: str):
+    values = ValuesBuffer(np.arange(num_values) * 0.5)
+
+    assert values.to_xml().text == (expected or "")
+    assert_array_equal(ValuesBuffer.from_xml(values.to_xml()).value, values.value)
+
+
+@pytest.mark.parametrize("values, expected", (
+    ([0.1, 0.153520718, -0.0, 1e-6, 123456789.0], "0.1 0.15352072 -0.0 0.000001 123456790.0"),
+    # Values too large or too small for positional notation
+    ([0.1, -3.4028235e38, 1e-30], "0.1 -3.4028235e+38 1e-30"),
+))
+def test_xml_clip_values_buffer_to_xml_reads_back_same_values(values: list[float], expected: str):
+    values = ValuesBuffer(np.array(values, dtype=np.float32))
+
+    assert values.to_xml().text == expected
+    assert_array_equal(ValuesBuffer.from_xml(values.to_xml()).value.view(np.uint32), values.value.view(np.uint32))
+
+
+def test_xml_clip_frames_buffer_to_xml():
+    frames = FramesBuffer(np.arange(11, dtype=np.uint32) * 1000)
+
+    assert frames.to_xml().text == "0 1000 2000 3000 4000 5000 6000 7000 8000 9000 \n10000"
+
+
+@pytest.mark.parametrize("layout_type", ("GTAV1", "GTAV2"))
+def test_xml_vertex_buffer_data_to_str(layout_type: str):
+    rng = np.random.default_rng(0)
+    vertex_buffer = VertexBuffer()
+    layout = VertexLayoutList(type=layout_type, value=["Position", "Normal", "Colour0", "TexCoord0"])
+    vertex_buffer.layout = layout
+    vertex_buffer.data = np.empty(1000, dtype=[VertexBuffer.VERT_ATTR_DTYPES[name] for name in layout.value])
+    vertex_buffer.data["Position"] = rng.standard_normal((1000, 3)) * 100
+    vertex_buffer.data["Normal"] = rng.uniform(-1.0, 1.0, (1000, 3))
+    vertex_buffer.data["Colour0"] = rng.integers(0, 256, (1000, 4))
+    vertex_buffer.data["TexCoord0"] = rng.uniform(-1.0, 2.0, (1000, 2))
+    vertex_buffer.data["Normal"][0] = (-0.0, 4e-8, -4e-8)
+
+    data_str = vertex_buffer._data_to_str()
+
+    lines = data_str.split("\n")
+    assert len(lines) == 1000
+    gtav2_normal_w = " 0.0000000" if layout_type == "GTAV2" else ""
+    assert lines[0].split("   ")[1] == "-0.0000000 0.0000000 -0.0000000" + gtav2_normal_w
+    for line, vert in zip(lines, vertex_buffer.data):
+        position, normal, colour, texcoord = line.split("   ")
+        assert position == " ".join("%.7f" % v for v in vert["Position"])
+        assert normal == " ".join("%.7f" % v for v in vert["Normal"]) + gtav2_normal_w
+        assert colour == " ".join("%d" % v for v in vert["Colour0"])
+        assert texcoord == " ".join("%.7f" % v for v in vert["TexCoord0"])
+
+
+@pytest.mark.parametrize("num_indices, expected", (
+    (0, "\n"),
+    (3, "\n0 1 2"),
+    (24, " ".join(map(str, range(24))) + "\n"),
+    (27, " ".join(map(str, range(24))) + "\n24 25 26"),
+    (48, " ".join(map(str, range(24))) + "\n" + " ".join(map(str, range(24, 48))) + "\n"),
+))
+def test_xml_index_buffer_data_to_str(num_indices: int, expected: str):
+    index_buffer = IndexBuffer()
+    index_buffer.data = np.arange(num_indices, dtype=np.uint32)
+
+    assert index_buffer._inds_to_str() == expected
+
+
+def indented_xml_str(element: ET.Element) -> str:
+    indent(element)
+    return ET.tostring(element, encoding="unicode")
+
+
+def written_xml_str(obj) -> str:
+    stream = io.StringIO()
+    obj.write_to(XmlWriter(stream))
+    return stream.getvalue()
+
+
+def test_xml_writer_same_as_indent():
+    class Item(ElementTree):
+        tag_name = "Item"
+
+        def __init__(self):
+            super().__init__()
+            self.a = AttributeProperty("a", 0)
+            self.b = AttributeProperty("b")
+            self.name = TextProperty("Name")
+            self.v = ValueProperty("v")
+
+    class ItemList(ListProperty):
+        list_type = Item
+        tag_name = "Items"
+
+    class Root(ElementTree):
+        tag_name = "Root"
+
+        def __init__(self):
+            super().__init__()
+            self.items = ItemList()
+            self.empty_items = ItemList("EmptyItems")
+            self.empty = TextProperty("Empty")
+            self.pos = VectorProperty("Pos")
+
+    root = Root()
+    for i, name in enumerate(("first", "<&>\"", "")):
+        item = Item()
+        item.a = i
+        item.b = "x\"y\n" if i == 1 else None
+        item.name = name
+        root.items.append(item)
+    root.items.append(Item())
+
+    assert written_xml_str(root) == indented_xml_str(root.to_xml())
+    assert written_xml_str(Item()) == indented_xml_str(Item().to_xml())
+
+
+@pytest.mark.parametrize("text_chunks", (
+    [],
+    [""],
+    ["single line"],
+    ["  single", " line  "],
+    ["\n"],
+    ["\n", "  \n", ""],
+    ["\n0 1 2"],
+    ["0 1 2\n"],
+    ["  0 1", " 2\n3 4 5", "\n", "6 <7> 8\n  ", "", "\n"],
+    ["a", "b", "\n", "c"],
+))
+def test_xml_writer_text_chunks_same_as_indent(text_chunks: list[str]):
+    element = ET.Element("Data")
+    element.text = "".join(text_chunks)
+    parent = ET.Element("Parent")
+    parent.append(element)
+    expected = indented_xml_str(parent)
+
+    stream = io.StringIO()
+    writer = XmlWriter(stream)
+    writer.write_tree("Parent", [], [TextChunksElement("Data", lambda: iter(text_chunks))], 0)
+
+    assert stream.getvalue() == expected
+
+
+def test_xml_write_xml_same_as_indent(tmp_path):
+    drawable = Drawable.from_xml_file(asset_path("sollumz_cube.ydr.xml"))
+    element = drawable.to_xml()
+    indent(element)
+    expected_path = tmp_path / "expected.ydr.xml"
+    ET.ElementTree(element).write(expected_path, encoding="UTF-8", xml_declaration=True)
+
+    path = tmp_path / "actual.ydr.xml"
+    drawable.write_xml(path)
+
+    assert path.read_bytes() == expected_path.read_bytes()
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose, assert_array_equal
+from ..cwxml import clipdictionary as ycdxml
+from ..tools.animationhelper import QUANTIZE_MAX_STEPS, Track, get_quantum_and_min_val
+from ..ycd.ycdexport import (
+    CHANNEL_QUANTIZE_MAX_ERROR,
+    QUATERNION_CHANNEL_QUANTIZE_MAX_ERROR,
+    build_values_channel,
+    get_channel_quantize_max_error,
+    quantize_values,
+)
+
+
+def decode_channel(channel: ycdxml.ChannelsList.Channel, num_values: int) -> np.ndarray:
+    if isinstance(channel, ycdxml.ChannelsList.StaticFloat):
+        return np.full(num_values, channel.value)
+    if isinstance(channel, ycdxml.ChannelsList.RawFloat):
+        return np.asarray(channel.values, dtype=np.float64)
+
+    values = np.asarray(channel.values, dtype=np.float64)
+    quantized, _ = quantize_values(values, channel.offset, channel.quantum)
+    values = np.float32(channel.offset) + quantized * np.float64(np.float32(channel.quantum))
+    if isinstance(channel, ycdxml.ChannelsList.IndirectQuantizeFloat):
+        values = values[np.asarray(channel.frames)]
+    return values
+
+
+def test_get_quantum_and_min_val():
+    min_val, quantum = get_quantum_and_min_val(np.array([0.5, 0.75, 2.0, 1.0, 1.0, -1.5]))
+
+    assert min_val == -1.5
+    assert quantum == 0.25
+
+
+def test_get_quantum_and_min_val_limits_quantum_to_range():
+    min_val, quantum = get_quantum_and_min_val(np.array([1.0, 1.0 + 1e-9, 2.0]))
+
+    assert min_val == 1.0
+    assert quantum == 1.0 / (1 << 20)
+
+
+@pytest.mark.parametrize("values, expected_type", (
+    (np.full(30, 2.5), ycdxml.ChannelsList.StaticFloat),
+    (np.tile([0.0, 0.123456, 0.9, -3.3], 100), ycdxml.ChannelsList.IndirectQuantizeFloat),
+    (np.sin(np.linspace(0.0, 6.0, 300)), ycdxml.ChannelsList.QuantizeFloat),
+    (np.random.default_rng(0).uniform(-1e6, 1e6, 300), ycdxml.ChannelsList.RawFloat),
+))
+def test_build_values_channel(values: np.ndarray, expected_type: type):
+    channel = build_values_channel(values)
+
+    assert type(channel) is expected_type
+    assert_allclose(decode_channel(channel, len(values)), values, rtol=1e-7, atol=CHANNEL_QUANTIZE_MAX_ERROR * 1.001)
+
+
+def test_build_values_channel_keeps_exact_steps():
+    values = np.repeat(np.arange(-8.0, 8.0, 0.25), 3)
+
+    channel = build_values_channel(values)
+
+    assert_array_equal(decode_channel(channel, len(values)), values)
+
+
+def test_build_values_channel_limits_quantize_steps():
+    # The quantum within the error bound needs more steps than the limit, and the largest quantum within the limit
+    # is too coarse
+    values = np.sin(np.linspace(0.0, 6.0, 300)) * 1000.0
+    assert (values.max() - values.min()) / (2.0 * CHANNEL_QUANTIZE_MAX_ERROR) > QUANTIZE_MAX_STEPS
+
+    channel = build_values_channel(values)
+
+    assert type(channel) is ycdxml.ChannelsList.RawFloat
+
+
+def test_get_channel_quantize_max_error():
+    assert get_channel_quantize_max_error(Track.BonePosition) == CHANNEL_QUANTIZE_MAX_ERROR
+    assert get_channel_quantize_max_error(Track.BoneRotation) == QUATERNION_CHANNEL_QUANTIZE_MAX_ERROR
+    assert get_channel_quantize_max_error(Track.CameraRotation) == QUATERNION_CHANNEL_QUANTIZE_MAX_ERROR
+    assert get_channel_quantize_max_error(Track.UV0) < CHANNEL_QUANTIZE_MAX_ERROR
+    assert get_channel_quantize_max_error(Track.CameraFOV) > CHANNEL_QUANTIZE_MAX_ERROR
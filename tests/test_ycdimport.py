@@ -0,0 +1,134 @@
+import bpy
+import numpy as np
+from mathutils import Quaternion, Vector
+from numpy.testing import assert_allclose, assert_array_equal
+from ..cwxml import clipdictionary as ycdxml
+from ..tools.animationhelper import Track, TrackFormat
+from ..ycd.ycdimport import animation_to_obj, combine_sequences_and_build_action_data, reduce_keyframes
+from .shared import asset_path
+
+
+def make_sequence_data(*channels: ycdxml.ChannelsList.Channel) -> ycdxml.Animation.SequenceDataList.SequenceData:
+    sequence_data = ycdxml.Animation.SequenceDataList.SequenceData()
+    for channel in channels:
+        sequence_data.channels.append(channel)
+    return sequence_data
+
+
+def make_quantize_channel(values: list[float]) -> ycdxml.ChannelsList.QuantizeFloat:
+    channel = ycdxml.ChannelsList.QuantizeFloat()
+    channel.values = np.array(values, dtype=np.float32)
+    return channel
+
+
+def make_animation(frame_count: int, sequence_frame_limit: int, tracks: list[tuple[int, Track, TrackFormat]]):
+    animation = ycdxml.Animation()
+    animation.frame_count = frame_count
+    animation.sequence_frame_limit = sequence_frame_limit
+    for bone_id, track, track_format in tracks:
+        bone = ycdxml.Animation.BoneIdList.BoneId()
+        bone.bone_id = bone_id
+        bone.track = track.value
+        bone.format = track_format.value
+        animation.bone_ids.append(bone)
+    return animation
+
+
+def test_combine_sequences_and_build_action_data():
+    animation = make_animation(5, 3, [
+        (0, Track.BonePosition, TrackFormat.Vector3),
+        (0, Track.BoneRotation, TrackFormat.Quaternion),
+        (1, Track.CameraFOV, TrackFormat.Float),
+    ])
+
+    static_vec = ycdxml.ChannelsList.StaticVector3()
+    static_vec.value = Vector((1.0, 2.0, 3.0))
+    static_quat = ycdxml.ChannelsList.StaticQuaternion()
+    static_quat.value = Quaternion((1.0, 0.0, 0.0, 0.0))
+    indirect = ycdxml.ChannelsList.IndirectQuantizeFloat()
+    indirect.values = np.array([10.0, 20.0], dtype=np.float32)
+    indirect.frames = np.array([1, 0, 1], dtype=np.uint32)
+    sequence = ycdxml.Animation.SequenceList.Sequence()
+    sequence.sequence_data.append(make_sequence_data(static_vec))
+    sequence.sequence_data.append(make_sequence_data(static_quat))
+    sequence.sequence_data.append(make_sequence_data(indirect))
+    animation.sequences.append(sequence)
+
+    # Last sequence, with X, Y, Z channels and the W component cached
+    cached_quat = ycdxml.ChannelsList.CachedQuaternion1()
+    cached_quat.quat_index = 3
+    raw = ycdxml.ChannelsList.RawFloat()
+    raw.values = np.array([5.0, 6.0], dtype=np.float32)
+    sequence = ycdxml.Animation.SequenceList.Sequence()
+    sequence.sequence_data.append(make_sequence_data(
+        make_quantize_channel([0.0, 1.0]), make_quantize_channel([0.5, 0.25]), make_quantize_channel([-1.0, -2.0])
+    ))
+    sequence.sequence_data.append(make_sequence_data(
+        make_quantize_channel([0.0, 0.6]), make_quantize_channel([0.0, 0.0]), make_quantize_channel([0.0, 0.0]),
+        cached_quat
+    ))
+    sequence.sequence_data.append(make_sequence_data(raw))
+    animation.sequences.append(sequence)
+
+    action_data = combine_sequences_and_build_action_data(animation)
+
+    assert_allclose(action_data[0][Track.BonePosition], [
+        [1.0, 2.0, 3.0], [1.0, 2.0, 3.0], [1.0, 2.0, 3.0], [0.0, 0.5, -1.0], [1.0, 0.25, -2.0]
+    ])
+    assert_allclose(action_data[0][Track.BoneRotation], [
+        [1.0, 0.0, 0.0, 0.0], [1.0, 0.0, 0.0, 0.0], [1.0, 0.0, 0.0, 0.0], [1.0, 0.0, 0.0, 0.0], [0.8, 0.6, 0.0, 0.0]
+    ], atol=1e-7)
+    assert_allclose(action_data[1][Track.CameraFOV], [20.0, 10.0, 20.0, 5.0, 6.0])
+
+
+def test_combine_sequences_and_build_action_data_clamps_to_frame_count():
+    # Two sequences of 4 frames, but only 3 frames in the animation
+    animation = make_animation(3, 4, [(0, Track.CameraFOV, TrackFormat.Float)])
+    for values in ([1.0, 2.0, 3.0, 4.0], [5.0, 6.0, 7.0, 8.0]):
+        sequence = ycdxml.Animation.SequenceList.Sequence()
+        sequence.sequence_data.append(make_sequence_data(make_quantize_channel(values)))
+        animation.sequences.append(sequence)
+
+    action_data = combine_sequences_and_build_action_data(animation)
+
+    assert_allclose(action_data[0][Track.CameraFOV], [1.0, 2.0, 3.0])
+
+
+def test_reduce_keyframes():
+    frames = np.arange(200, dtype=np.float64)
+    values = np.array([
+        np.full(200, 0.5),
+        frames * 0.25 - 3.0,
+        np.sin(frames * 0.02),
+        np.where(frames < 120, 0.0, 1.0),
+    ])
+
+    keep = reduce_keyframes(values, 0.001)
+
+    assert_array_equal(np.flatnonzero(keep[0]), [0])
+    assert_array_equal(np.flatnonzero(keep[1]), [0, 199])
+    assert keep[2, 0] and keep[2, -1] and np.count_nonzero(keep[2]) < 100
+    assert_array_equal(np.flatnonzero(keep[3]), [0, 119, 120, 199])
+    for curve_values, curve_keep in zip(values[1:], keep[1:]):
+        reduced_values = np.interp(frames, frames[curve_keep], curve_values[curve_keep])
+        assert_allclose(reduced_values, curve_values, rtol=0.0, atol=0.001)
+
+
+def test_animation_to_obj_reduce_keyframes():
+    animation = ycdxml.YCD.from_xml_file(str(asset_path("roundtrip_anim_values.ycd.xml"))).animations[0]
+
+    full_action = animation_to_obj(animation).animation_properties.action
+    reduced_action = animation_to_obj(animation, keyframe_tolerance=0.001).animation_properties.action
+
+    assert tuple(reduced_action.frame_range) == tuple(full_action.frame_range)
+    assert len(reduced_action.fcurves) == len(full_action.fcurves)
+    for full_fcurve, reduced_fcurve in zip(full_action.fcurves, reduced_action.fcurves):
+        assert reduced_fcurve.data_path == full_fcurve.data_path
+        assert reduced_fcurve.array_index == full_fcurve.array_index
+        assert len(reduced_fcurve.keyframe_points) < len(full_fcurve.keyframe_points)
+        for keyframe in full_fcurve.keyframe_points:
+            frame, value = keyframe.co
+            assert abs(reduced_fcurve.evaluate(frame) - value) <= 0.001 + 1e-6
+
+    for action in (full_action, reduced_action):
+        bpy.data.actions.remove(action)
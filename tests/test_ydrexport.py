@@ -0,0 +1,70 @@
+import numpy as np
+from numpy.testing import assert_array_equal
+from ..cwxml.drawable import Geometry, VertexBuffer
+from ..tools.npformat import FloatFormat
+from ..ydr.ydrexport import join_geometries, join_ind_arrs, join_vert_arrs, split_geom_by_vert_count
+
+
+def make_vert_arr(num_verts: int, layout: list[str], start: int = 0) -> np.ndarray:
+    vert_arr = np.empty(num_verts, dtype=[VertexBuffer.VERT_ATTR_DTYPES[name] for name in layout])
+    for name in layout:
+        values = np.arange(start, start + vert_arr[name].size).reshape(vert_arr[name].shape)
+        vert_arr[name] = values
+    return vert_arr
+
+
+def test_join_vert_arrs_same_layout():
+    layout = ["Position", "BlendWeights", "BlendIndices", "Normal", "TexCoord0"]
+    vert_arrs = [make_vert_arr(3, layout), make_vert_arr(5, layout, 100), make_vert_arr(2, layout, 200)]
+
+    joined_arr = join_vert_arrs(vert_arrs)
+
+    assert joined_arr.dtype.names == tuple(layout)
+    assert_array_equal(joined_arr, np.concatenate(vert_arrs))
+
+
+def test_join_vert_arrs_different_layouts():
+    vert_arrs = [
+        make_vert_arr(3, ["Position", "Colour0"]),
+        make_vert_arr(4, ["Position"], 100),
+        # Field view with padding, as created when exporting
+        make_vert_arr(2, ["Position", "Normal", "TexCoord0", "Colour0"], 200)[["Position", "TexCoord0", "Colour0"]],
+    ]
+
+    joined_arr = join_vert_arrs(vert_arrs)
+
+    assert joined_arr.dtype.names == ("Position", "Colour0", "TexCoord0")
+    assert_array_equal(joined_arr["Position"], np.concatenate([vert_arr["Position"] for vert_arr in vert_arrs]))
+    # Attributes are kept in the rows of their array, zero in the arrays without them
+    assert_array_equal(joined_arr["Colour0"][:3], vert_arrs[0]["Colour0"])
+    assert_array_equal(joined_arr["Colour0"][3:7], 0)
+    assert_array_equal(joined_arr["Colour0"][7:], vert_arrs[2]["Colour0"])
+    assert_array_equal(joined_arr["TexCoord0"][:7], 0)
+    assert_array_equal(joined_arr["TexCoord0"][7:], vert_arrs[2]["TexCoord0"])
+
+
+def test_join_ind_arrs():
+    ind_arrs = [np.array([0, 1, 2], dtype=np.uint32), np.array([1, 0, 2, 2, 3, 1], dtype=np.uint32),
+                np.array([0, 1, 2], dtype=np.uint32)]
+
+    joined_arr = join_ind_arrs(ind_arrs, [3, 4, 3])
+
+    assert joined_arr.dtype == np.uint32
+    assert_array_equal(joined_arr, [0, 1, 2, 4, 3, 5, 5, 6, 4, 7, 8, 9])
+
+
+def test_join_and_split_geometries_keep_float_format():
+    geoms = []
+    for start in (0, 100):
+        geom = Geometry()
+        geom.vertex_buffer.data = make_vert_arr(3, ["Position"], start)
+        geom.vertex_buffer.float_format = FloatFormat.SHORTEST
+        geom.index_buffer.data = np.array([0, 1, 2], dtype=np.uint32)
+        geoms.append(geom)
+
+    joined_geom = join_geometries(geoms, 0)
+    split_geoms = split_geom_by_vert_count(joined_geom)
+
+    assert joined_geom.vertex_buffer.float_format == FloatFormat.SHORTEST
+    assert [geom.vertex_buffer.float_format for geom in split_geoms] == [FloatFormat.SHORTEST]
+    assert Geometry().vertex_buffer.float_format == FloatFormat.FIXED
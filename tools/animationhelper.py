@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import bpy
 import math
-from sys import float_info
+import numpy as np
+from numpy.typing import NDArray
 from mathutils import Quaternion, Vector, Euler, Matrix
 from enum import IntFlag, IntEnum
 from ..sollumz_properties import MaterialType, SollumType
@@ -170,26 +171,23 @@ TrackToPropertyNameMap = {
 PropertyNameToTrackMap = {v: k for k, v in TrackToPropertyNameMap.items()}
 
 
-def get_quantum_and_min_val(nums):
-    min_val = float_info.max
-    max_val = float_info.min
-    min_delta = float_info.max
-    last_val = 0
+# Quantized values use at most 20 bits
+QUANTIZE_MAX_STEPS = 1 << 20
 
-    for value in nums:
-        min_val = min(min_val, value)
-        max_val = max(max_val, value)
 
-        if value != last_val:
-            min_delta = min(min_delta, abs(value - last_val))
+def get_quantum_and_min_val(nums: NDArray[np.float64]) -> tuple[float, float]:
+    """Get the offset and quantum to quantize ``nums``. The quantum is the smallest change between consecutive values,
+    starting from zero, but no less than the range of values split in ``QUANTIZE_MAX_STEPS``."""
+    nums = np.asarray(nums, dtype=np.float64)
+    min_val = float(nums.min())
+    max_val = float(nums.max())
 
-        last_val = value
-
-    if min_delta == float_info.max:
-        min_delta = 0
+    deltas = np.abs(np.diff(nums, prepend=0.0))
+    deltas = deltas[deltas != 0.0]
+    min_delta = float(deltas.min()) if len(deltas) > 0 else 0.0
 
     range_value = max_val - min_val
-    min_quant = range_value / 1048576
+    min_quant = range_value / QUANTIZE_MAX_STEPS
     quantum = max(min_delta, min_quant)
 
     return min_val, quantum
@@ -0,0 +1,76 @@
+"""Writing of exported XML files in worker threads."""
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, NamedTuple, Optional, TypeVar
+
+from ..cwxml.element import Element
+
+T = TypeVar("T")
+
+
+class PendingWrite(NamedTuple):
+    filepath: str
+    future: Future
+
+
+class ExportPool:
+    """Runs the XML serialization and file writing of exported objects in a thread pool, so it overlaps with the
+    collection of the Blender data of the following objects on the main thread. Work of the objects being exported
+    that doesn't need Blender data can run in the pool too, see ``submit``. Worker threads never access ``bpy``.
+
+    A thread pool instead of a process pool because cwxml objects depend on ``mathutils``, which is only available
+    inside Blender. The NumPy formatting of the vertex, index and animation buffers releases the GIL."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or os.cpu_count(), thread_name_prefix="SollumzExport")
+        self._pending: list[PendingWrite] = []
+        self._last_write_by_path: dict[str, Future] = {}
+
+    def submit_write(self, xml: Element, filepath: str):
+        """Queue ``xml`` to be written to ``filepath``. ``xml`` must not be modified afterwards."""
+        # Multiple objects can be exported to the same file, the last one queued wins as when exporting sequentially.
+        # Workers take the writes in order, so the previous write is already running or done and waiting is safe.
+        previous_write = self._last_write_by_path.get(filepath, None)
+        future = self._executor.submit(_timed_write_xml, xml, filepath, previous_write)
+        self._last_write_by_path[filepath] = future
+        self._pending.append(PendingWrite(filepath, future))
+
+    def submit(self, fn: Callable[..., T], *args) -> Future:
+        """Queue ``fn(*args)`` to run in a worker thread. ``fn`` must not access ``bpy``. Workers take the calls and
+        the writes in the order they are queued."""
+        return self._executor.submit(fn, *args)
+
+    def take_pending_writes(self) -> list[PendingWrite]:
+        """Get the writes queued since the last call. Their futures return the time spent writing, in seconds."""
+        pending = self._pending
+        self._pending = []
+        return pending
+
+    def shutdown(self):
+        """Wait for the queued writes to finish and stop the worker threads."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+
+def _timed_write_xml(xml: Element, filepath: str, previous_write: Optional[Future]) -> float:
+    if previous_write is not None:
+        wait([previous_write])
+
+    start = time.perf_counter()
+    xml.write_xml(filepath)
+    return time.perf_counter() - start
+
+
+def write_xml(xml: Element, filepath: str, pool: Optional[ExportPool] = None):
+    """Write ``xml`` to ``filepath``, in ``pool`` if specified or right away otherwise."""
+    if pool is None:
+        xml.write_xml(filepath)
+    else:
+        pool.submit_write(xml, filepath)
@@ -0,0 +1,286 @@
+"""Evaluation of F-curves at many frames at once with NumPy."""
+import bpy
+import numpy as np
+from numpy.typing import NDArray
+
+# Values of ``Keyframe.interpolation`` read with ``foreach_get``
+INTERPOLATION_CONSTANT = 0
+INTERPOLATION_LINEAR = 1
+INTERPOLATION_BEZIER = 2
+
+# Frames closer than this to a keyframe get the keyframe value, same threshold as Blender uses when evaluating
+KEYFRAME_FRAME_THRESHOLD = 0.0001
+FLT_EPSILON = np.finfo(np.float32).eps
+# Samples evaluated at a time, so the intermediate arrays stay in the CPU cache
+SAMPLES_CHUNK_SIZE = 1 << 15
+
+
+def sample_fcurve(fcurve: bpy.types.FCurve, frames: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Evaluate ``fcurve`` at each of ``frames``. See ``sample_fcurves``."""
+    return sample_fcurves([fcurve], frames)[0]
+
+
+def sample_fcurves(fcurves: list[bpy.types.FCurve], frames: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Evaluate each of ``fcurves`` at each of ``frames``, as a ``(len(fcurves), len(frames))`` array. Same results as
+    ``FCurve.evaluate`` within float precision.
+
+    The keyframes of all F-curves are read with ``foreach_get`` and the constant, linear and Bezier segments are
+    evaluated with NumPy for all samples at once. Samples that need anything else (easing interpolation, linear
+    extrapolation, F-curve modifiers, baked samples) are left to ``FCurve.evaluate``."""
+    # Blender evaluates at single-precision frames
+    frames = np.asarray(frames, dtype=np.float32).astype(np.float64)
+    num_frames = len(frames)
+
+    values = np.zeros((len(fcurves), num_frames), dtype=np.float64)
+    needs_evaluate = np.zeros((len(fcurves), num_frames), dtype=bool)
+
+    # Keyframes of all the F-curves that can be sampled, one after the other
+    curve_inds = []
+    key_counts = []
+    cos = []
+    handles_left = []
+    handles_right = []
+    interpolations = []
+    for curve_ind, fcurve in enumerate(fcurves):
+        keyframe_points = fcurve.keyframe_points
+        num_keys = len(keyframe_points)
+        if num_keys == 0 or len(fcurve.modifiers) > 0:
+            needs_evaluate[curve_ind] = True
+            continue
+
+        co = read_keyframes_vector(keyframe_points, "co")
+        if fcurve.extrapolation != "CONSTANT" and num_keys > 1:
+            needs_evaluate[curve_ind] = (frames <= co[0, 0]) | (frames >= co[-1, 0])
+
+        interpolation = np.empty(num_keys, dtype=np.int32)
+        keyframe_points.foreach_get("interpolation", interpolation)
+
+        curve_inds.append(curve_ind)
+        key_counts.append(num_keys)
+        cos.append(co)
+        handles_left.append(read_keyframes_vector(keyframe_points, "handle_left"))
+        handles_right.append(read_keyframes_vector(keyframe_points, "handle_right"))
+        interpolations.append(interpolation)
+
+    if curve_inds:
+        curve_inds = np.array(curve_inds)
+        key_counts = np.array(key_counts)
+        curve_values, curve_needs_evaluate = _sample_keyframes(
+            np.concatenate(cos), np.concatenate(handles_left), np.concatenate(handles_right),
+            np.concatenate(interpolations), key_counts, frames
+        )
+        values[curve_inds] = curve_values
+        needs_evaluate[curve_inds] |= curve_needs_evaluate
+
+    for curve_ind in np.flatnonzero(needs_evaluate.any(axis=1)):
+        curve_needs_evaluate = needs_evaluate[curve_ind]
+        values[curve_ind, curve_needs_evaluate] = evaluate_fcurve(fcurves[curve_ind], frames[curve_needs_evaluate])
+
+    return values
+
+
+def evaluate_fcurve(fcurve: bpy.types.FCurve, frames: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Evaluate ``fcurve`` at each of ``frames`` with Blender, one frame at a time."""
+    evaluate = fcurve.evaluate
+    return np.array([evaluate(frame) for frame in frames.tolist()], dtype=np.float64)
+
+
+def read_keyframes_vector(keyframe_points: bpy.types.FCurveKeyframePoints, prop_name: str) -> NDArray[np.float64]:
+    """Read a 2D vector property of each keyframe, as a ``(num_keys, 2)`` array."""
+    values = np.empty(len(keyframe_points) * 2, dtype=np.float32)
+    keyframe_points.foreach_get(prop_name, values)
+    return values.reshape((-1, 2)).astype(np.float64)
+
+
+def _sample_keyframes(
+    co: NDArray[np.float64],
+    handle_left: NDArray[np.float64],
+    handle_right: NDArray[np.float64],
+    interpolation: NDArray[np.int32],
+    key_counts: NDArray[np.intp],
+    frames: NDArray[np.float64]
+) -> tuple[NDArray[np.float64], NDArray[np.bool_]]:
+    """Evaluate curves, given by their concatenated keyframes with ``key_counts`` keyframes each, at ``frames``.
+    Returns the values and whether each sample must be evaluated by Blender instead."""
+    num_curves = len(key_counts)
+    num_frames = len(frames)
+    key_starts = np.zeros(num_curves, dtype=np.intp)
+    np.cumsum(key_counts[:-1], out=key_starts[1:])
+    key_ends = key_starts + key_counts - 1
+    key_frames = co[:, 0]
+    key_values = co[:, 1]
+
+    # Outside the keyframes, the value of the first or last keyframe (constant extrapolation)
+    before = frames <= key_frames[key_starts, np.newaxis]
+    after = frames >= key_frames[key_ends, np.newaxis]
+    values = np.where(before, key_values[key_starts, np.newaxis], key_values[key_ends, np.newaxis])
+    needs_evaluate = np.zeros((num_curves, num_frames), dtype=bool)
+
+    sample_inds = np.flatnonzero(~(before | after))
+    if len(sample_inds) == 0:
+        return values, needs_evaluate
+
+    sample_curves = sample_inds // num_frames
+    sample_frames = frames[sample_inds - sample_curves * num_frames]
+
+    # Find the segment of each sample in all the keyframes at once, offsetting the frames of each curve so they come
+    # after the previous curve. Whole frame offsets keep the frames exact.
+    min_frame = key_frames.min()
+    frame_span = np.ceil(key_frames.max() - min_frame) + 1.0
+    offset_key_frames = key_frames - min_frame + np.repeat(np.arange(num_curves) * frame_span, key_counts)
+    segments = np.searchsorted(offset_key_frames, sample_frames - min_frame + sample_curves * frame_span, side="right")
+    segments -= 1
+    np.clip(segments, key_starts[sample_curves], key_ends[sample_curves] - 1, out=segments)
+
+    x_coeffs, y_coeffs, segment_needs_evaluate = _calc_segment_coefficients(
+        co, handle_left, handle_right, interpolation)
+
+    # Frames on a keyframe get its exact value
+    on_left = np.abs(sample_frames - key_frames[segments]) < KEYFRAME_FRAME_THRESHOLD
+    on_right = np.abs(key_frames[segments + 1] - sample_frames) < KEYFRAME_FRAME_THRESHOLD
+    on_right &= ~on_left
+    on_key = on_left | on_right
+
+    flat_values = values.reshape(-1)
+    flat_needs_evaluate = needs_evaluate.reshape(-1)
+    for chunk_start in range(0, len(sample_inds), SAMPLES_CHUNK_SIZE):
+        chunk = slice(chunk_start, chunk_start + SAMPLES_CHUNK_SIZE)
+        chunk_segments = segments[chunk]
+        t = _solve_cubic_monotonic(
+            *(np.take(coeff, chunk_segments) for coeff in x_coeffs), sample_frames[chunk]
+        )
+        flat_values[sample_inds[chunk]] = _eval_cubic(*(np.take(coeff, chunk_segments) for coeff in y_coeffs), t)
+
+    flat_values[sample_inds[on_left]] = key_values[segments[on_left]]
+    flat_values[sample_inds[on_right]] = key_values[segments[on_right] + 1]
+    flat_needs_evaluate[sample_inds] = segment_needs_evaluate[segments] & ~on_key
+    return values, needs_evaluate
+
+
+def _calc_segment_coefficients(
+    co: NDArray[np.float64],
+    handle_left: NDArray[np.float64],
+    handle_right: NDArray[np.float64],
+    interpolation: NDArray[np.int32],
+) -> tuple[tuple[NDArray[np.float64], ...], tuple[NDArray[np.float64], ...], NDArray[np.bool_]]:
+    """Get the polynomial coefficients of the frame and the value along each segment between consecutive keyframes,
+    as Bezier curves. Constant and linear segments are Bezier curves with the control points on the line. Returns
+    the frame coefficients, the value coefficients and whether each segment must be evaluated by Blender instead."""
+    p1 = co[:-1]
+    p4 = co[1:]
+    p2 = handle_right[:-1].copy()
+    p3 = handle_left[1:].copy()
+    segment_interpolation = interpolation[:-1]
+
+    # Correct the handles so the curve doesn't go back in time, as Blender does
+    h1 = p1 - p2
+    h2 = p4 - p3
+    length = p4[:, 0] - p1[:, 0]
+    handles_length = np.abs(h1[:, 0]) + np.abs(h2[:, 0])
+    too_long = handles_length > length
+    fac = np.divide(length, handles_length, out=np.ones_like(length), where=too_long)[:, np.newaxis]
+    p2[too_long] = (p1 - fac * h1)[too_long]
+    p3[too_long] = (p4 - fac * h2)[too_long]
+
+    is_bezier = segment_interpolation == INTERPOLATION_BEZIER
+    is_flat = (
+        (np.abs(p1[:, 1] - p4[:, 1]) < FLT_EPSILON) &
+        (np.abs(p2[:, 1] - p3[:, 1]) < FLT_EPSILON) &
+        (np.abs(p3[:, 1] - p4[:, 1]) < FLT_EPSILON)
+    )
+    # With handles pointing inside the segment, time increases monotonically along it
+    is_monotonic = (p2[:, 0] >= p1[:, 0]) & (p3[:, 0] <= p4[:, 0])
+
+    # Straight segments, the frame coefficients are linear and the value ones linear or constant
+    is_straight = ~is_bezier | is_flat
+    line = p4 - p1
+    p2[is_straight] = (p1 + line / 3.0)[is_straight]
+    p3[is_straight] = (p1 + line * (2.0 / 3.0))[is_straight]
+    is_constant = (segment_interpolation == INTERPOLATION_CONSTANT) | (is_bezier & is_flat)
+    for p in (p2, p3):
+        p[is_constant, 1] = p1[is_constant, 1]
+    y4 = np.where(is_constant, p1[:, 1], p4[:, 1])
+
+    is_supported = (segment_interpolation == INTERPOLATION_CONSTANT) | (segment_interpolation == INTERPOLATION_LINEAR)
+    is_supported |= is_bezier & (is_flat | is_monotonic)
+
+    x_coeffs = _cubic_coefficients(p1[:, 0], p2[:, 0], p3[:, 0], p4[:, 0])
+    y_coeffs = _cubic_coefficients(p1[:, 1], p2[:, 1], p3[:, 1], y4)
+    return x_coeffs, y_coeffs, ~is_supported
+
+
+def _cubic_coefficients(
+    q0: NDArray[np.float64],
+    q1: NDArray[np.float64],
+    q2: NDArray[np.float64],
+    q3: NDArray[np.float64]
+) -> tuple[NDArray[np.float64], ...]:
+    """Polynomial coefficients ``c0, c1, c2, c3`` of the Bezier curve ``q0, q1, q2, q3``."""
+    return q0, 3.0 * (q1 - q0), 3.0 * (q0 - 2.0 * q1 + q2), q3 - q0 + 3.0 * (q1 - q2)
+
+
+def _eval_cubic(
+    c0: NDArray[np.float64],
+    c1: NDArray[np.float64],
+    c2: NDArray[np.float64],
+    c3: NDArray[np.float64],
+    t: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    result = c3 * t
+    result += c2
+    result *= t
+    result += c1
+    result *= t
+    result += c0
+    return result
+
+
+def _solve_cubic_monotonic(
+    c0: NDArray[np.float64],
+    c1: NDArray[np.float64],
+    c2: NDArray[np.float64],
+    c3: NDArray[np.float64],
+    x: NDArray[np.float64],
+    max_iterations: int = 64
+) -> NDArray[np.float64]:
+    """Find ``t`` in [0, 1] where the monotonically increasing cubic ``c0, c1, c2, c3`` equals ``x``. Newton's method
+    from the linear approximation, falling back to bisection when a step leaves the bracket around the root."""
+    c0 = c0 - x
+    length = c1 + c2 + c3
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = -c0 / length
+    np.clip(t, 0.0, 1.0, out=t)
+    t[length == 0.0] = 0.0
+    lo = np.zeros_like(x)
+    hi = np.ones_like(x)
+    dc2 = 2.0 * c2
+    dc3 = 3.0 * c3
+
+    for _ in range(max_iterations):
+        f = _eval_cubic(c0, c1, c2, c3, t)
+        df = dc3 * t
+        df += dc2
+        df *= t
+        df += c1
+
+        # Shrink the bracket around the root
+        below = f < 0.0
+        lo[below] = t[below]
+        above = ~below
+        hi[above] = t[above]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = f / df
+        t_next = t - step
+        out_of_bracket = ~((t_next > lo) & (t_next < hi))
+        out_of_bracket &= f != 0.0
+        if out_of_bracket.any():
+            t_next[out_of_bracket] = 0.5 * (lo[out_of_bracket] + hi[out_of_bracket])
+        t_next[f == 0.0] = t[f == 0.0]
+
+        max_step = np.max(np.abs(t_next - t), initial=0.0)
+        t = t_next
+        if max_step < 1e-12:
+            break
+
+    return t
@@ -0,0 +1,344 @@
+"""Fast conversion of numeric NumPy arrays to text, used to write large CodeWalker XML buffers."""
+from enum import Enum
+from typing import Iterable, Iterator, Optional, Sequence
+import numpy as np
+from numpy.typing import NDArray
+
+
+class FloatFormat(str, Enum):
+    FIXED = "FIXED"
+    """Fixed-point with 7 decimals, same as ``"%.7f"``."""
+    SHORTEST = "SHORTEST"
+    """Fewest decimals (at least 1, at most 7) that read back to the same float32 value as ``FIXED``."""
+    ROUNDTRIP = "ROUNDTRIP"
+    """Fewest significant digits (at most 9) that read back to the exact same float32 value, like the shortest
+    ``repr`` of the float32, in positional notation with at least 1 decimal. Unlike ``FIXED`` and ``SHORTEST``,
+    small values keep all their precision. If some value needs more than ``ROUNDTRIP_MAX_DECIMALS`` decimals or is
+    not below ``ROUNDTRIP_MAX_ABS``, its rows are written with NumPy's shortest ``repr`` instead, which uses exponent
+    notation for very small or large values (e.g. ``1.6161546e-14``)."""
+
+
+FIXED_DECIMALS = 7
+FIXED_SCALE = 10 ** FIXED_DECIMALS
+# Values above this magnitude don't fit in an int64 once scaled, those are formatted with printf instead
+FIXED_MAX_ABS = 2.0 ** 62 / FIXED_SCALE
+
+# Significant digits needed to read back any float32
+ROUNDTRIP_MAX_DIGITS = 9
+# Decimals that fit in a uint64, values that need more are formatted with ``repr`` instead
+ROUNDTRIP_MAX_DECIMALS = 19
+ROUNDTRIP_MAX_ABS = 2.0 ** 62
+
+# Number of rows converted to text at once. Limits the size of the temporary arrays.
+CHUNK_NUM_ROWS = 16384
+
+ASCII_NEWLINE = 10
+
+
+def iter_columns_str(
+    columns: Sequence[NDArray],
+    separators: Sequence[str],
+    float_format: FloatFormat = FloatFormat.FIXED,
+    chunk_num_rows: int = CHUNK_NUM_ROWS,
+) -> Iterator[str]:
+    """Convert 1D ``columns`` to text, one line per row. ``separators[i]`` is placed between ``columns[i]`` and
+    ``columns[i + 1]``. Float columns are formatted with ``float_format`` and integer columns as plain integers.
+
+    Yields the text in chunks of ``chunk_num_rows`` rows so it can be written directly to a file. Chunks after the
+    first one start with a new line, joining them gives the whole text.
+    """
+    assert len(separators) == len(columns) - 1, "Expected one separator between each column"
+
+    num_rows = len(columns[0]) if len(columns) > 0 else 0
+    for chunk_start in range(0, num_rows, chunk_num_rows):
+        chunk_columns = [column[chunk_start:chunk_start + chunk_num_rows] for column in columns]
+
+        chunk_str = _columns_to_str_fixed(chunk_columns, separators, float_format)
+        if chunk_str is None:
+            chunk_str = _columns_to_str_printf(chunk_columns, separators, float_format)
+
+        yield chunk_str if chunk_start == 0 else f"\n{chunk_str}"
+
+
+def columns_to_str(
+    columns: Sequence[NDArray],
+    separators: Sequence[str],
+    float_format: FloatFormat = FloatFormat.FIXED,
+) -> str:
+    """Same as ``iter_columns_str`` but returns the whole text."""
+    return "".join(iter_columns_str(columns, separators, float_format))
+
+
+def _row_format(columns: Sequence[NDArray], separators: Sequence[str], float_fmt: str, int_fmt: str) -> str:
+    formats = [float_fmt if column.dtype.kind == "f" else int_fmt for column in columns]
+    return "".join(fmt + sep for fmt, sep in zip(formats, separators)) + formats[-1]
+
+
+def _columns_to_str_printf(columns: Sequence[NDArray], separators: Sequence[str], float_format: FloatFormat) -> str:
+    """Fallback for values not supported by the vectorized formatting. Same output as ``np_arr_to_str``, except with
+    ``ROUNDTRIP`` where floats are written with their shortest ``repr`` instead."""
+    if float_format == FloatFormat.ROUNDTRIP:
+        fmt = _row_format(columns, separators, "%s", "%s")
+        # NumPy converts float32 to the shortest text that reads back to the same float32
+        columns = [column.astype(str) if column.dtype.kind == "f" else column for column in columns]
+        values = np.column_stack([column.astype(object) for column in columns])
+    else:
+        fmt = _row_format(columns, separators, "%.7f", "%.0u")
+        values = np.column_stack(columns)
+    return "\n".join([fmt] * len(values)) % tuple(values.ravel().tolist())
+
+
+def _columns_to_str_fixed(
+    columns: Sequence[NDArray],
+    separators: Sequence[str],
+    float_format: FloatFormat,
+) -> Optional[str]:
+    """Byte-identical to formatting each value with ``"%.7f"`` (floats) or ``"%.0u"`` (integers), without creating
+    a Python object per value. With ``SHORTEST`` and ``ROUNDTRIP``, floats only keep the decimals needed to read back
+    the same value. Returns ``None`` if some column is not supported.
+
+    Every row is first rendered into a fixed-width buffer, with the values right-aligned in their columns and the
+    digits written four at a time from lookup tables. Then the padding is removed from all the rows at once.
+    """
+    cells = []
+    for column in columns:
+        if float_format == FloatFormat.ROUNDTRIP and column.dtype.kind == "f":
+            cell = _split_roundtrip(column)
+        else:
+            cell = _split_fixed(column, float_format == FloatFormat.SHORTEST)
+        if cell is None:
+            return None
+        cells.append(cell)
+
+    num_rows = len(columns[0])
+
+    # Buffer layout, in 4-byte words, of each column: separator and sign, integer part, decimal point and fraction
+    layouts = []
+    num_words = 0
+    for (int_parts, frac_parts, num_decimals, negative, max_digits, frac_words), sep in zip(cells, ("", *separators)):
+        sep_words = -(-(len(sep) + 1) // 4)
+        int_words = -(-max_digits // 4)
+        layouts.append((num_words, sep_words, int_words, frac_words))
+        num_words += sep_words + int_words + frac_words
+    num_words += 1  # new line
+
+    # Unused bytes are left as zeros and removed at the end
+    words = np.zeros((num_rows, num_words), dtype=np.uint32)
+    text = words.view(np.uint8)
+
+    for cell, sep, layout in zip(cells, ("", *separators), layouts):
+        int_parts, frac_parts, num_decimals, negative, max_digits, _ = cell
+        start, sep_words, int_words, frac_words = layout
+
+        if sep:
+            text[:, start * 4:start * 4 + len(sep)] = np.frombuffer(sep.encode("ascii"), dtype=np.uint8)
+
+        int_start = start + sep_words
+        int_end = int_start + int_words
+        _write_int_parts(words[:, int_start - 1:int_end], int_parts, negative)
+
+        if frac_words:
+            # The decimal point and first 3 decimals, then 4 decimals per word. Trailing digits are removed when only
+            # some of the decimals are kept.
+            remaining = frac_parts
+            for i in range(frac_words - 1, 0, -1):
+                remaining, group = np.divmod(remaining, 10000)
+                word = DIGITS_4_LUT.take(group.astype(np.intp, copy=False))
+                if num_decimals is not None:
+                    word &= KEEP_BYTES_MASKS.take(np.clip(num_decimals - 4 * i + 1, 0, 4))
+                words[:, int_end + i] = word
+
+            word = DOT_DIGITS_3_LUT.take(remaining.astype(np.intp, copy=False))
+            if num_decimals is not None:
+                word &= KEEP_BYTES_MASKS.take(np.minimum(num_decimals + 1, 4))
+            words[:, int_end] = word
+
+    text[:, -4] = ASCII_NEWLINE
+
+    return text.tobytes().translate(None, b"\0")[:-1].decode("ascii")
+
+
+def _write_int_parts(words: NDArray[np.uint32], int_parts: NDArray, negative: NDArray[np.bool_]):
+    """Write the integer parts, with their sign, right-aligned in ``words``, four digits per word. The first word is
+    only used for the sign."""
+    lead_lut_offsets = negative * 10000
+    remaining = int_parts
+    for i in range(words.shape[1] - 1, 0, -1):
+        has_digits = remaining > 0
+        remaining, group = np.divmod(remaining, 10000)
+        is_lead = remaining == 0
+        word = np.where(is_lead, LEAD_DIGITS_4_LUT.take(group + lead_lut_offsets), DIGITS_4_LUT.take(group))
+        if i < words.shape[1] - 1:
+            # Only the least significant group is written for zeros
+            word *= has_digits
+            word |= pending_minus * MINUS_WORD
+            is_lead &= has_digits
+        words[:, i] = word
+        pending_minus = is_lead & negative & (group >= 1000)
+
+    words[:, 0] |= pending_minus * MINUS_WORD
+
+
+def _split_fixed(
+    column: NDArray, trim_decimals: bool
+) -> Optional[tuple[NDArray, Optional[NDArray], Optional[NDArray], NDArray, int, int]]:
+    """Get the integer parts, fractional parts (7 decimals scaled to integers), number of decimals to keep and signs of
+    the values in ``column``, plus the maximum number of integer digits and the number of words needed by the
+    decimals."""
+    if column.dtype.kind == "f":
+        if column.dtype != np.float32:
+            return None
+
+        values = column.astype(np.float64)
+        magnitudes = np.abs(values)
+        if not np.all(magnitudes < FIXED_MAX_ABS):  # also false for NaN
+            return None
+
+        # float32 has 24 significant bits and 10^7 needs 17 bits, so the product is exact in a float64. Rounding it
+        # half to even gives the same digits as printf.
+        scaled = np.rint(magnitudes * FIXED_SCALE).astype(np.int64)
+        num_decimals = None
+        if trim_decimals:
+            scaled, num_decimals = _trim_decimals(magnitudes, scaled)
+
+        int_parts, frac_parts = np.divmod(scaled, FIXED_SCALE)
+        frac_parts = frac_parts.astype(np.int32)
+        negative = np.signbit(values)
+    elif column.dtype.kind in {"i", "u"}:
+        if column.dtype.itemsize > 4:
+            return None
+
+        values = column.astype(np.int64)
+        int_parts = np.abs(values)
+        frac_parts = None
+        num_decimals = None
+        negative = values < 0
+    else:
+        return None
+
+    max_int_part = int(int_parts.max()) if len(int_parts) else 0
+    if max_int_part < 2 ** 31:
+        # int32 division is faster
+        int_parts = int_parts.astype(np.int32)
+
+    frac_words = 0 if frac_parts is None else 2
+    return int_parts, frac_parts, num_decimals, negative, len(str(max_int_part)), frac_words
+
+
+def _split_roundtrip(column: NDArray) -> Optional[tuple[NDArray, NDArray, NDArray, NDArray, int, int]]:
+    """Same as ``_split_fixed`` for float32 values written with the fewest significant digits that read back to the
+    same value. The fractional parts are scaled by as many decimals as the largest number of decimals kept."""
+    if column.dtype != np.float32:
+        return None
+
+    values = column.astype(np.float64)
+    magnitudes = np.abs(values)
+    if not np.all(magnitudes < ROUNDTRIP_MAX_ABS):  # also false for NaN
+        return None
+
+    # Decimal exponent of each value, log10 can be off by one close to powers of 10
+    nonzero = magnitudes > 0
+    with np.errstate(divide="ignore"):
+        exponents = np.floor(np.log10(np.where(nonzero, magnitudes, 1.0))).astype(np.int64)
+    exponents -= magnitudes < 10.0 ** exponents
+    exponents += magnitudes >= 10.0 ** (exponents + 1)
+    exponents[~nonzero] = 0
+
+    # Look for the fewest significant digits, as an integer mantissa and a number of decimals, only retrying the
+    # values that don't read back the same yet. 9 digits are always enough.
+    magnitudes_f32 = np.abs(column)
+    mantissas = np.empty(len(column), dtype=np.int64)
+    decimals = np.empty(len(column), dtype=np.int64)
+    pending = np.arange(len(column))
+    for num_digits in range(1, ROUNDTRIP_MAX_DIGITS):
+        pending_decimals = num_digits - 1 - exponents[pending]
+        scales = ROUNDTRIP_POW10_LUT.take(pending_decimals + ROUNDTRIP_POW10_LUT_OFFSET)
+        pending_mantissas = np.rint(magnitudes[pending] * scales)
+        # Negative powers of 10 are not exact, multiply by the positive ones instead
+        read_back = pending_mantissas / scales
+        no_decimals = pending_decimals < 0
+        read_back[no_decimals] = (
+            pending_mantissas[no_decimals] *
+            ROUNDTRIP_POW10_LUT.take(ROUNDTRIP_POW10_LUT_OFFSET - pending_decimals[no_decimals])
+        )
+        same_value = read_back.astype(np.float32) == magnitudes_f32[pending]
+        done = pending[same_value]
+        mantissas[done] = pending_mantissas[same_value]
+        decimals[done] = pending_decimals[same_value]
+        pending = pending[~same_value]
+
+    pending_decimals = ROUNDTRIP_MAX_DIGITS - 1 - exponents[pending]
+    scales = ROUNDTRIP_POW10_LUT.take(pending_decimals + ROUNDTRIP_POW10_LUT_OFFSET)
+    # Values that still don't have decimals are above 2^23, so they are integers and can be written exactly
+    has_decimals = pending_decimals > 0
+    mantissas[pending] = np.where(has_decimals, np.rint(magnitudes[pending] * scales), magnitudes[pending])
+    decimals[pending] = np.maximum(pending_decimals, 0)
+
+    # Rounding up can add a trailing zero, e.g. 9.99e-6 to 0.000010
+    while True:
+        trailing_zero = (decimals > 1) & (mantissas % 10 == 0)
+        if not trailing_zero.any():
+            break
+        mantissas[trailing_zero] //= 10
+        decimals[trailing_zero] -= 1
+
+    max_decimals = int(decimals.max()) if len(decimals) else 1
+    if max_decimals > ROUNDTRIP_MAX_DECIMALS:
+        return None
+
+    # Mantissas have at most 10 digits, so dividing by more than 10^18 is not needed
+    has_decimals = decimals > 0
+    int_parts, frac_parts = np.divmod(mantissas, 10 ** np.minimum(np.maximum(decimals, 0), 18))
+    int_parts[~has_decimals] = mantissas[~has_decimals] * 10 ** -decimals[~has_decimals]
+    frac_parts[~has_decimals] = 0
+    num_decimals = np.maximum(decimals, 1)
+
+    # The decimal point with 3 decimals, then 4 decimals per word. All fractional parts are scaled by the same number
+    # of decimals, which can need all the bits of a uint64.
+    frac_words = 1 + -(-max(max_decimals - 3, 0) // 4)
+    frac_digits = 3 + 4 * (frac_words - 1)
+    frac_parts = frac_parts.astype(np.uint64) * (10 ** (frac_digits - num_decimals)).astype(np.uint64)
+
+    max_int_part = int(int_parts.max()) if len(int_parts) else 0
+    if max_int_part < 2 ** 31:
+        int_parts = int_parts.astype(np.int32)
+
+    return int_parts, frac_parts, num_decimals, np.signbit(values), len(str(max_int_part)), frac_words
+
+
+def _trim_decimals(magnitudes: NDArray[np.float64], scaled: NDArray[np.int64]) -> tuple[NDArray[np.int64], NDArray]:
+    """Find the fewest decimals that read back to the same float32 as the 7 decimals in ``scaled``. Returns the values
+    rounded to those decimals (still scaled by ``FIXED_SCALE``) and the number of decimals."""
+    target = (scaled / FIXED_SCALE).astype(np.float32)
+    num_decimals = np.full(len(scaled), FIXED_DECIMALS, dtype=np.int8)
+    for decimals in range(FIXED_DECIMALS - 1, 0, -1):
+        # Exact for the same reason as the 7 decimals
+        rounded = np.rint(magnitudes * 10 ** decimals)
+        same_value = (rounded / 10 ** decimals).astype(np.float32) == target
+        num_decimals[same_value] = decimals
+        scaled[same_value] = rounded[same_value].astype(np.int64) * 10 ** (FIXED_DECIMALS - decimals)
+
+    return scaled, num_decimals
+
+
+def _words_lut(strings: Iterable[str]) -> NDArray[np.uint32]:
+    """Pack 4-character ASCII strings, right-aligned and left-padded with zeros, as 4-byte words."""
+    return np.frombuffer(b"".join(s.encode("ascii").rjust(4, b"\0") for s in strings), dtype=np.uint32)
+
+
+# Every number from 0000 to 9999
+DIGITS_4_LUT = _words_lut(f"{i:04d}" for i in range(10000))
+# Every number from .000 to .999
+DOT_DIGITS_3_LUT = _words_lut(f".{i:03d}" for i in range(1000))
+# Most significant group of digits of a number, without leading zeros. Followed by the same for negative numbers,
+# those with 4 digits don't have space for the minus sign so it's written in the previous word instead.
+LEAD_DIGITS_4_LUT = np.concatenate((
+    _words_lut(str(i) for i in range(10000)),
+    _words_lut(f"-{i}" if i < 1000 else str(i) for i in range(10000)),
+))
+MINUS_WORD = _words_lut(["-"])[0]
+# Powers of 10 for all the decimals that can be tried on a float32 below ``ROUNDTRIP_MAX_ABS``
+ROUNDTRIP_POW10_LUT_OFFSET = 18
+ROUNDTRIP_POW10_LUT = 10.0 ** np.arange(-ROUNDTRIP_POW10_LUT_OFFSET, ROUNDTRIP_MAX_DIGITS + 46)
+# Masks to keep only the first N bytes of a word
+KEEP_BYTES_MASKS = np.frombuffer(b"".join(b"\xff" * n + b"\0" * (4 - n) for n in range(5)), dtype=np.uint32)
@@ -1,10 +1,13 @@
 import bpy
+import itertools
 from mathutils import Vector, Matrix
-from typing import Optional, TypeVar, Callable, Type
+from typing import Optional, TypeVar, Callable
 import numpy as np
+from numpy.typing import NDArray
 
 from ..sollumz_helper import get_parent_inverse
 from ..tools.blenderhelper import get_pose_inverse, get_evaluated_obj
+from ..tools.exportpool import ExportPool, write_xml
 from ..cwxml.bound import (
     BoundFile,
     Bound,
@@ -17,11 +20,9 @@ from ..cwxml.bound import (
     BoundCapsule,
     BoundCylinder,
     BoundDisc,
-    PolyTriangle,
-    PolyBox,
-    PolySphere,
-    PolyCapsule,
-    PolyCylinder,
+    BoundPolygons,
+    PolygonType,
+    POLYGON_DTYPES,
     Material
 )
 from ..tools.utils import get_max_vector_list, get_min_vector_list, get_matrix_without_scale
@@ -38,15 +39,14 @@ from .properties import CollisionMatFlags, get_collision_mat_raw_flags, BoundFla
 
 T_Bound = TypeVar("T_Bound", bound=Bound)
 T_BoundChild = TypeVar("T_BoundChild", bound=BoundChild)
-T_PolyCylCap = TypeVar("T_PolyCylCap", bound=PolyCylinder | PolyCapsule)
 
 MAX_VERTICES = 32767
 
 
-def export_ybn(obj: bpy.types.Object, filepath: str) -> bool:
+def export_ybn(obj: bpy.types.Object, filepath: str, pool: Optional[ExportPool] = None) -> bool:
     bounds = BoundFile()
     bounds.composite = create_composite_xml(obj)
-    bounds.write_xml(filepath)
+    write_xml(bounds, filepath, pool)
     return True
 
 
@@ -213,12 +213,9 @@ def create_bound_xml(obj: bpy.types.Object, is_root: bool = False) -> Optional[B
         case SollumType.BOUND_GEOMETRY:
             bound_xml = create_bound_geometry_xml(obj)
 
-            if bound_xml.vertices and bound_xml.polygons:
-                mesh_vertices = np.array([(v + bound_xml.geometry_center) for v in bound_xml.vertices])
-                mesh_faces = []
-                for poly in bound_xml.polygons:
-                    mesh_faces.append([poly.v1, poly.v2, poly.v3])
-                mesh_faces = np.array(mesh_faces)
+            if len(bound_xml.vertices) > 0 and bound_xml.polygons:
+                mesh_vertices = get_bound_geom_mesh_vertices(bound_xml)
+                mesh_faces = get_bound_geom_mesh_faces(bound_xml)
 
                 centroid, radius_around_centroid = get_centroid_of_mesh(mesh_vertices)
                 volume, cg, inertia = get_mass_properties_of_mesh(mesh_vertices, mesh_faces)
@@ -243,25 +240,46 @@ def create_bound_xml(obj: bpy.types.Object, is_root: bool = False) -> Optional[B
 
             bound_xml = create_bvh_xml(obj)
 
-            primitives = []
-            if bound_xml.vertices and bound_xml.polygons:
-                mesh_vertices = np.array([(v + bound_xml.geometry_center) for v in bound_xml.vertices])
-                mesh_faces = []
-                for poly in bound_xml.polygons:
-                    if not isinstance(poly, PolyTriangle):
-                        primitives.append(poly)
-                        continue
-                    mesh_faces.append([poly.v1, poly.v2, poly.v3])
+            if len(bound_xml.vertices) > 0 and bound_xml.polygons:
+                mesh_vertices = get_bound_geom_mesh_vertices(bound_xml)
+                mesh_faces = get_bound_geom_mesh_faces(bound_xml)
 
                 centroid, radius_around_centroid = get_centroid_of_mesh(mesh_vertices)
                 if len(mesh_faces) > 0:
                     # If we have a mesh, calculate the center of gravity from the mesh
-                    mesh_faces = np.array(mesh_faces)
                     _, cg, _ = get_mass_properties_of_mesh(mesh_vertices, mesh_faces)
                 else:
                     # Otherwise, approximate with the centroid
                     cg = centroid
 
+                # Grow radius_around_centroid to fit all primitives
+                polygons = bound_xml.polygons
+                for box in polygons.boxes:
+                    # Calculate the opposite corners of the box. The corners stored in the vertices array are
+                    # already inside the bounding sphere, but the opposite corners may not be.
+                    v = mesh_vertices[[box["v1"], box["v2"], box["v3"], box["v4"]]]
+                    v0b = Vector((v[1] + v[2] + v[3] - v[0]) * 0.5)
+                    v1b = Vector((v[0] + v[2] + v[3] - v[1]) * 0.5)
+                    v2b = Vector((v[0] + v[1] + v[3] - v[2]) * 0.5)
+                    v3b = Vector((v[0] + v[1] + v[2] - v[3]) * 0.5)
+                    radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v0b, 0.0)
+                    radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v1b, 0.0)
+                    radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v2b, 0.0)
+                    radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v3b, 0.0)
+
+                for sphere in polygons.spheres:
+                    # The sphere center vertex is inside the bounding sphere but the whole sphere may not be.
+                    radius_around_centroid = grow_sphere(
+                        centroid, radius_around_centroid, Vector(mesh_vertices[sphere["v"]]), float(sphere["radius"]))
+
+                for prim in itertools.chain(polygons.capsules, polygons.cylinders):
+                    # Capsules and cylinders are approximated by two spheres on their ends.
+                    radius = float(prim["radius"])
+                    radius_around_centroid = grow_sphere(
+                        centroid, radius_around_centroid, Vector(mesh_vertices[prim["v1"]]), radius)
+                    radius_around_centroid = grow_sphere(
+                        centroid, radius_around_centroid, Vector(mesh_vertices[prim["v2"]]), radius)
+
             # BVHs don't need to calculate the volume or inertia
             volume = 1.0
             inertia = Vector((1.0, 1.0, 1.0))
@@ -270,34 +288,6 @@ def create_bound_xml(obj: bpy.types.Object, is_root: bool = False) -> Optional[B
             bound_xml.box_min -= Vector((margin, margin, margin))
             bound_xml.box_max += Vector((margin, margin, margin))
 
-            # Grow radius_around_centroid to fit all primitives
-            for prim in primitives:
-                match prim:
-                    case PolyBox():
-                        # Calculate the opposite corners of the box. The corners stored in the vertices array are
-                        # already inside the bounding sphere, but the opposite corners may not be.
-                        v = mesh_vertices[[prim.v1, prim.v2, prim.v3, prim.v4]]
-                        v0b = Vector((v[1] + v[2] + v[3] - v[0]) * 0.5)
-                        v1b = Vector((v[0] + v[2] + v[3] - v[1]) * 0.5)
-                        v2b = Vector((v[0] + v[1] + v[3] - v[2]) * 0.5)
-                        v3b = Vector((v[0] + v[1] + v[2] - v[3]) * 0.5)
-                        radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v0b, 0.0)
-                        radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v1b, 0.0)
-                        radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v2b, 0.0)
-                        radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v3b, 0.0)
-                    case PolySphere():
-                        # The sphere center vertex is inside the bounding sphere but the whole sphere may not be.
-                        radius_around_centroid = grow_sphere(
-                            centroid, radius_around_centroid, Vector(mesh_vertices[prim.v]), prim.radius)
-                    case PolyCapsule() | PolyCylinder():
-                        # Capsules and cylinders are approximated by two spheres on their ends.
-                        radius_around_centroid = grow_sphere(
-                            centroid, radius_around_centroid, Vector(mesh_vertices[prim.v1]), prim.radius)
-                        radius_around_centroid = grow_sphere(
-                            centroid, radius_around_centroid, Vector(mesh_vertices[prim.v2]), prim.radius)
-                    case _:
-                        assert False, f"Unknown primitive type '{type(prim)}'"
-
         case _:
             assert False, f"Unknown bound type '{obj.sollum_type}'"
 
@@ -443,26 +433,41 @@ def center_verts_to_geometry(geom_xml: BoundGeometry | BoundGeometryBVH):
     """Position verts such that the origin is at their center of geometry. Returns the center of geometry."""
     # the center is really just the bounding-box center
     geom_center = get_bound_center_from_bounds(geom_xml.box_min, geom_xml.box_max)
-    geom_xml.vertices = [Vector(vert) - geom_center for vert in geom_xml.vertices]
+    geom_xml.vertices = geom_xml.vertices - np.array(geom_center, dtype=np.float32)
     return Vector(geom_center)
 
 
+def get_bound_geom_mesh_vertices(geom_xml: BoundGeometry | BoundGeometryBVH) -> NDArray[np.float64]:
+    """Get the vertices of ``geom_xml`` before they were centered by ``center_verts_to_geometry``."""
+    geom_center = np.array(geom_xml.geometry_center, dtype=np.float32)
+    return (geom_xml.vertices + geom_center).astype(np.float64)
+
+
+def get_bound_geom_mesh_faces(geom_xml: BoundGeometry | BoundGeometryBVH) -> NDArray[np.uint32]:
+    """Get the vertex indices of the poly triangles of ``geom_xml`` as an ``(N, 3)`` array."""
+    triangles = geom_xml.polygons.triangles
+    return np.column_stack((triangles["v1"], triangles["v2"], triangles["v3"]))
+
+
 def create_bound_xml_polys(geom_xml: BoundGeometry | BoundGeometryBVH, obj: bpy.types.Object):
     # Create mappings of vertices and materials by index to build the new geom_xml vertices
     ind_by_vert: dict[tuple, int] = {}
     ind_by_mat: dict[bpy.types.Material, int] = {}
+    # Collected in lists and converted to arrays at the end
+    vertices: list[Vector] = []
+    vertex_colors: list[tuple[int, int, int, int]] = []
 
     def get_vert_index(vert: Vector, vert_color: Optional[tuple[int, int, int, int]] = None):
         default_vert_color = (255, 255, 255, 255)
 
         # These are safety checks in case the user mixed poly primitives and poly meshes with color attributes
         # This doesn't occur in original .ybns, if they have vertex colors, only poly triangles (meshes) are used.
-        if vert_color is not None and len(geom_xml.vertex_colors) != len(geom_xml.vertices):
+        if vert_color is not None and len(vertex_colors) != len(vertices):
             # This vertex has color but previous ones didn't, assign a default color to all previous vertices
-            for _ in range(len(geom_xml.vertex_colors), len(geom_xml.vertices)):
-                geom_xml.vertex_colors.append(default_vert_color)
+            for _ in range(len(vertex_colors), len(vertices)):
+                vertex_colors.append(default_vert_color)
 
-        if vert_color is None and len(geom_xml.vertex_colors) != 0:
+        if vert_color is None and len(vertex_colors) != 0:
             # There are already vertex colors in this geometry, assign a default color
             vert_color = default_vert_color
 
@@ -475,9 +480,9 @@ def create_bound_xml_polys(geom_xml: BoundGeometry | BoundGeometryBVH, obj: bpy.
 
         vert_ind = len(ind_by_vert)
         ind_by_vert[vertex_id] = vert_ind
-        geom_xml.vertices.append(Vector(vert))
+        vertices.append(vert)
         if vert_color is not None:
-            geom_xml.vertex_colors.append(vert_color)
+            vertex_colors.append(vert_color)
 
         return vert_ind
 
@@ -493,59 +498,81 @@ def create_bound_xml_polys(geom_xml: BoundGeometry | BoundGeometryBVH, obj: bpy.
 
         return mat_ind
 
-    # If the bound object is a mesh, just convert its mesh data into triangles
+    # Runs of polygons of the same type, joined into the polygon tables at the end
+    polygon_runs: list[tuple[PolygonType, NDArray]] = []
+
     if not isinstance(geom_xml, BoundGeometryBVH):
-        create_bound_geom_xml_triangles(obj, geom_xml, get_vert_index, get_mat_index)
-        return
+        # If the bound object is a mesh, just convert its mesh data into triangles
+        polygon_runs.append(create_bound_geom_xml_triangles(obj, geom_xml, get_vert_index, get_mat_index))
+    else:
+        # For empty bound objects with children, create the bound polygons from its children
+        for child in obj.children_recursive:
+            if child.sollum_type not in BOUND_POLYGON_TYPES:
+                logger.warning(
+                    f"'{child.name}' is being exported as bound poly but has no bound poly Sollumz type! Please, use "
+                    f"a bound poly type instead of '{SOLLUMZ_UI_NAMES[child.sollum_type]}'."
+                )
+                continue
 
-    # For empty bound objects with children, create the bound polygons from its children
-    for child in obj.children_recursive:
-        if child.sollum_type not in BOUND_POLYGON_TYPES:
-            logger.warning(
-                f"'{child.name}' is being exported as bound poly but has no bound poly Sollumz type! Please, use a "
-                f"bound poly type instead of '{SOLLUMZ_UI_NAMES[child.sollum_type]}'."
-            )
-            continue
+            polygon_runs.append(create_bound_xml_poly_shape(child, geom_xml, get_vert_index, get_mat_index))
 
-        create_bound_xml_poly_shape(child, geom_xml, get_vert_index, get_mat_index)
+    geom_xml.polygons = BoundPolygons.concatenate(polygon_runs)
+    geom_xml.vertices = np.array(vertices, dtype=np.float32).reshape((-1, 3))
+    # Colors from color attributes are floats in the 0-255 range, truncated like ``int`` would
+    geom_xml.vertex_colors = np.array(vertex_colors, dtype=np.float64).astype(np.uint8).reshape((-1, 4))
 
 
-def create_bound_geom_xml_triangles(obj: bpy.types.Object, geom_xml: BoundGeometry, get_vert_index: Callable[[Vector], int], get_mat_index: Callable[[bpy.types.Material], int]):
+def create_bound_geom_xml_triangles(
+    obj: bpy.types.Object,
+    geom_xml: BoundGeometry,
+    get_vert_index: Callable[[Vector], int],
+    get_mat_index: Callable[[bpy.types.Material], int],
+) -> tuple[PolygonType, NDArray]:
     """Create all bound poly triangles and vertices for a ``BoundGeometry`` object."""
     obj_eval, mesh = create_export_mesh(obj)
 
     transforms = get_bound_poly_transforms_to_apply(obj, geom_xml.composite_transform)
     triangles = create_poly_xml_triangles(mesh, transforms, get_vert_index, get_mat_index)
-    geom_xml.polygons = triangles
 
     obj_eval.to_mesh_clear()
 
+    return PolygonType.TRIANGLE, triangles
 
-def create_bound_xml_poly_shape(obj: bpy.types.Object, geom_xml: BoundGeometryBVH, get_vert_index: Callable[[Vector], int], get_mat_index: Callable[[bpy.types.Material], int]):
+
+def create_bound_xml_poly_shape(
+    obj: bpy.types.Object,
+    geom_xml: BoundGeometryBVH,
+    get_vert_index: Callable[[Vector], int],
+    get_mat_index: Callable[[bpy.types.Material], int],
+) -> tuple[PolygonType, NDArray]:
+    """Create the bound polygons of a bound poly object. Returns their type and table."""
     obj_eval, mesh = create_export_mesh(obj)
 
     transforms = get_bound_poly_transforms_to_apply(obj, geom_xml.composite_transform)
 
     match obj.sollum_type:
         case SollumType.BOUND_POLY_TRIANGLE:
-            triangles = create_poly_xml_triangles(mesh, transforms, get_vert_index, get_mat_index)
-            geom_xml.polygons.extend(triangles)
+            polys = create_poly_xml_triangles(mesh, transforms, get_vert_index, get_mat_index)
+            poly_type = PolygonType.TRIANGLE
         case SollumType.BOUND_POLY_BOX:
-            box_xml = create_poly_box_xml(obj, transforms, get_vert_index, get_mat_index)
-            geom_xml.polygons.append(box_xml)
+            polys = create_poly_box_xml(obj, transforms, get_vert_index, get_mat_index)
+            poly_type = PolygonType.BOX
         case SollumType.BOUND_POLY_SPHERE:
-            sphere_xml = create_poly_sphere_xml(obj, transforms, get_vert_index, get_mat_index)
-            geom_xml.polygons.append(sphere_xml)
+            polys = create_poly_sphere_xml(obj, transforms, get_vert_index, get_mat_index)
+            poly_type = PolygonType.SPHERE
         case SollumType.BOUND_POLY_CYLINDER:
-            cylinder_xml = create_poly_cylinder_capsule_xml(
-                PolyCylinder, obj, transforms, get_vert_index, get_mat_index)
-            geom_xml.polygons.append(cylinder_xml)
+            polys = create_poly_cylinder_capsule_xml(
+                PolygonType.CYLINDER, obj, transforms, get_vert_index, get_mat_index)
+            poly_type = PolygonType.CYLINDER
         case SollumType.BOUND_POLY_CAPSULE:
-            capsule_xml = create_poly_cylinder_capsule_xml(PolyCapsule, obj, transforms, get_vert_index, get_mat_index)
-            geom_xml.polygons.append(capsule_xml)
+            polys = create_poly_cylinder_capsule_xml(
+                PolygonType.CAPSULE, obj, transforms, get_vert_index, get_mat_index)
+            poly_type = PolygonType.CAPSULE
 
     obj_eval.to_mesh_clear()
 
+    return poly_type, polys
+
 
 def get_bound_poly_transforms_to_apply(obj: bpy.types.Object, composite_transform: Matrix):
     """Get the transforms to apply directly to BoundGeometry vertices."""
@@ -578,64 +605,76 @@ def create_export_mesh(obj: bpy.types.Object):
     return obj_eval, mesh
 
 
-def create_poly_xml_triangles(mesh: bpy.types.Mesh, transforms: Matrix, get_vert_index: Callable[[Vector], int], get_mat_index: Callable[[bpy.types.Material], int]):
-    """Create all bound polygon triangle XML objects for this BoundGeometry/BVH."""
-    triangles: list[PolyTriangle] = []
+def create_poly_xml_triangles(
+    mesh: bpy.types.Mesh,
+    transforms: Matrix,
+    get_vert_index: Callable[[Vector], int],
+    get_mat_index: Callable[[bpy.types.Material], int],
+) -> NDArray:
+    """Create the table of bound polygon triangles for this BoundGeometry/BVH."""
+    num_tris = len(mesh.loop_triangles)
+    tri_loops = np.empty(num_tris * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("loops", tri_loops)
+    tri_mat_inds = np.empty(num_tris, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("material_index", tri_mat_inds)
+    loop_vert_inds = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vert_inds)
 
     color_attr_name = get_color_attr_name(0)
     color_attr = mesh.color_attributes.get(color_attr_name, None)
     if color_attr is not None and (color_attr.domain != "CORNER" or color_attr.data_type != "BYTE_COLOR"):
         color_attr = None
 
-    for tri in mesh.loop_triangles:
-        triangle = PolyTriangle()
-        mat = mesh.materials[tri.material_index]
-        triangle.material_index = get_mat_index(mat)
-
-        tri_indices: list[int] = []
-
-        for loop_idx in tri.loops:
-            loop = mesh.loops[loop_idx]
+    triangles = np.zeros(num_tris, dtype=POLYGON_DTYPES[PolygonType.TRIANGLE])
 
-            vert_pos = transforms @ mesh.vertices[loop.vertex_index].co
-            vert_color = color_attr.data[loop_idx].color_srgb if color_attr is not None else None
-            if vert_color is not None:
-                vert_color = (vert_color[0] * 255, vert_color[1] * 255, vert_color[2] * 255, vert_color[3] * 255)
-            vert_ind = get_vert_index(vert_pos, vert_color=vert_color)
+    # Materials are indexed in the order they are first used
+    used_mat_inds, first_tris = np.unique(tri_mat_inds, return_index=True)
+    geom_mat_inds = np.zeros(len(mesh.materials), dtype=np.uint32)
+    for mat_ind in used_mat_inds[np.argsort(first_tris)].tolist():
+        geom_mat_inds[mat_ind] = get_mat_index(mesh.materials[mat_ind])
+    triangles["material_index"] = geom_mat_inds[tri_mat_inds]
 
-            tri_indices.append(vert_ind)
+    # Each mesh vertex is only transformed once, even if shared by many triangles
+    positions = [transforms @ vert.co for vert in mesh.vertices]
 
-        triangle.v1 = tri_indices[0]
-        triangle.v2 = tri_indices[1]
-        triangle.v3 = tri_indices[2]
+    corner_vert_inds = []
+    for loop_idx in tri_loops.tolist():
+        vert_pos = positions[loop_vert_inds[loop_idx]]
+        vert_color = color_attr.data[loop_idx].color_srgb if color_attr is not None else None
+        if vert_color is not None:
+            vert_color = (vert_color[0] * 255, vert_color[1] * 255, vert_color[2] * 255, vert_color[3] * 255)
+        corner_vert_inds.append(get_vert_index(vert_pos, vert_color=vert_color))
 
-        triangles.append(triangle)
+    corner_vert_inds = np.array(corner_vert_inds, dtype=np.uint32).reshape((-1, 3))
+    triangles["v1"] = corner_vert_inds[:, 0]
+    triangles["v2"] = corner_vert_inds[:, 1]
+    triangles["v3"] = corner_vert_inds[:, 2]
 
     return triangles
 
 
 def create_poly_box_xml(obj: bpy.types.Object, transforms: Matrix, get_vert_index: Callable[[Vector], int], get_mat_index: Callable[[bpy.types.Material], int]):
-    box_xml = PolyBox()
-    box_xml.material_index = get_mat_index(obj.active_material)
+    box_xml = np.zeros(1, dtype=POLYGON_DTYPES[PolygonType.BOX])
+    box_xml["material_index"] = get_mat_index(obj.active_material)
     indices = []
     bound_box = [transforms @ Vector(pos) for pos in obj.bound_box]
     corners = [bound_box[0], bound_box[5], bound_box[2], bound_box[7]]
     for vert in corners:
         indices.append(get_vert_index(vert))
 
-    box_xml.v1 = indices[0]
-    box_xml.v2 = indices[1]
-    box_xml.v3 = indices[2]
-    box_xml.v4 = indices[3]
+    box_xml["v1"] = indices[0]
+    box_xml["v2"] = indices[1]
+    box_xml["v3"] = indices[2]
+    box_xml["v4"] = indices[3]
 
     return box_xml
 
 
 def create_poly_sphere_xml(obj: bpy.types.Object, transforms: Matrix, get_vert_index: Callable[[Vector], int], get_mat_index: Callable[[bpy.types.Material], int]):
-    sphere_xml = PolySphere()
-    sphere_xml.material_index = get_mat_index(obj.active_material)
+    sphere_xml = np.zeros(1, dtype=POLYGON_DTYPES[PolygonType.SPHERE])
+    sphere_xml["material_index"] = get_mat_index(obj.active_material)
     vert_ind = get_vert_index(transforms.translation)
-    sphere_xml.v = vert_ind
+    sphere_xml["v"] = vert_ind
 
     # Assuming bounding box forms a cube. Get the sphere enclosed by the cube
     # scale = transforms.to_scale()
@@ -644,17 +683,23 @@ def create_poly_sphere_xml(obj: bpy.types.Object, transforms: Matrix, get_vert_i
 
     radius = (bbmax.x - bbmin.x) / 2
 
-    sphere_xml.radius = radius
+    sphere_xml["radius"] = radius
 
     return sphere_xml
 
 
-def create_poly_cylinder_capsule_xml(poly_type: Type[T_PolyCylCap], obj: bpy.types.Object, transforms: Matrix, get_vert_index: Callable[[Vector], int], get_mat_index: Callable[[bpy.types.Material], int]):
-    poly_xml = poly_type()
+def create_poly_cylinder_capsule_xml(
+    poly_type: PolygonType,
+    obj: bpy.types.Object,
+    transforms: Matrix,
+    get_vert_index: Callable[[Vector], int],
+    get_mat_index: Callable[[bpy.types.Material], int],
+):
+    poly_xml = np.zeros(1, dtype=POLYGON_DTYPES[poly_type])
 
     position = transforms.translation
 
-    poly_xml.material_index = get_mat_index(obj.active_material)
+    poly_xml["material_index"] = get_mat_index(obj.active_material)
 
     # Only apply scale so we can get the oriented bounding box
     # scale = transforms.to_scale()
@@ -665,7 +710,7 @@ def create_poly_cylinder_capsule_xml(poly_type: Type[T_PolyCylCap], obj: bpy.typ
     # Assumes X and Y scale are uniform
     radius = (bbmax.x - bbmin.x) / 2
 
-    if poly_type is PolyCapsule:
+    if poly_type == PolygonType.CAPSULE:
         height = height - (radius * 2)
 
     vertical = Vector((0, 0, height / 2))
@@ -674,10 +719,10 @@ def create_poly_cylinder_capsule_xml(poly_type: Type[T_PolyCylCap], obj: bpy.typ
     v1 = position - vertical
     v2 = position + vertical
 
-    poly_xml.v1 = get_vert_index(v1)
-    poly_xml.v2 = get_vert_index(v2)
+    poly_xml["v1"] = get_vert_index(v1)
+    poly_xml["v2"] = get_vert_index(v2)
 
-    poly_xml.radius = radius
+    poly_xml["radius"] = radius
 
     return poly_xml
 
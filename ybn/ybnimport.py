@@ -11,13 +11,8 @@ from ..cwxml.bound import (
     BoundChild,
     BoundGeometryBVH,
     BoundGeometry,
-    PolyBox,
-    PolySphere,
-    PolyCapsule,
-    PolyCylinder,
-    PolyTriangle,
+    PolygonType,
     YBN,
-    Polygon,
     Material as ColMaterial
 )
 from ..sollumz_properties import SollumType, SOLLUMZ_UI_NAMES
@@ -153,7 +148,7 @@ def create_bound_disc(bound_xml: BoundChild):
 
 def create_bound_geometry(geom_xml: BoundGeometry):
     materials = create_geometry_materials(geom_xml)
-    triangles = get_poly_triangles(geom_xml.polygons)
+    triangles = geom_xml.polygons.triangles
 
     mesh = create_bound_mesh_data(geom_xml.vertices, triangles, geom_xml.vertex_colors, materials)
     mesh.transform(Matrix.Translation(geom_xml.geometry_center))
@@ -171,9 +166,9 @@ def create_bvh_obj(bvh_xml: BoundGeometryBVH):
 
     create_bvh_polys(bvh_xml, materials, bvh_obj)
 
-    triangles = get_poly_triangles(bvh_xml.polygons)
+    triangles = bvh_xml.polygons.triangles
 
-    if triangles:
+    if len(triangles) > 0:
         mesh = create_bound_mesh_data(bvh_xml.vertices, triangles, bvh_xml.vertex_colors, materials)
         bound_geom_obj = create_blender_object(SollumType.BOUND_POLY_TRIANGLE, object_data=mesh)
         bound_geom_obj.location = bvh_xml.geometry_center
@@ -216,20 +211,23 @@ def set_bound_col_material_properties(bound_xml: Bound, mat: bpy.types.Material)
 
 
 def create_bvh_polys(bvh: BoundGeometryBVH, materials: list[bpy.types.Material], bvh_obj: bpy.types.Object):
-    for poly in bvh.polygons:
-        if type(poly) is PolyTriangle:
+    # Created in file order, interleaved with the triangles
+    for poly_type, polys in bvh.polygons.iter_runs():
+        if poly_type == PolygonType.TRIANGLE:
             continue
 
-        poly_obj = poly_to_obj(poly, materials, bvh.vertices)
-        poly_obj.location += bvh.geometry_center
-        poly_obj.parent = bvh_obj
+        for poly in polys:
+            poly_obj = poly_to_obj(poly_type, poly, materials, bvh.vertices)
+            poly_obj.location += bvh.geometry_center
+            poly_obj.parent = bvh_obj
 
 
 def init_poly_obj(poly, sollum_type, materials):
     name = SOLLUMZ_UI_NAMES[sollum_type]
     mesh = bpy.data.meshes.new(name)
-    if poly.material_index < len(materials):
-        mesh.materials.append(materials[poly.material_index])
+    material_index = int(poly["material_index"])
+    if material_index < len(materials):
+        mesh.materials.append(materials[material_index])
 
     obj = create_blender_object(sollum_type, name, mesh)
     return obj
@@ -238,10 +236,10 @@ def init_poly_obj(poly, sollum_type, materials):
 def create_poly_box(poly, materials, vertices):
     obj = init_poly_obj(poly, SollumType.BOUND_POLY_BOX, materials)
 
-    v1 = vertices[poly.v1]
-    v2 = vertices[poly.v2]
-    v3 = vertices[poly.v3]
-    v4 = vertices[poly.v4]
+    v1 = Vector(vertices[poly["v1"]])
+    v2 = Vector(vertices[poly["v2"]])
+    v3 = Vector(vertices[poly["v3"]])
+    v4 = Vector(vertices[poly["v4"]])
     center = (v1 + v2 + v3 + v4) * 0.25
 
     # Get edges from the 4 opposing corners of the box
@@ -310,17 +308,17 @@ def create_poly_box(poly, materials, vertices):
 
 def create_poly_sphere(poly, materials, vertices):
     sphere = init_poly_obj(poly, SollumType.BOUND_POLY_SPHERE, materials)
-    create_sphere(sphere.data, poly.radius)
-    sphere.location = vertices[poly.v]
+    create_sphere(sphere.data, float(poly["radius"]))
+    sphere.location = Vector(vertices[poly["v"]])
     return sphere
 
 def create_poly_capsule(poly, materials, vertices):
     capsule = init_poly_obj(poly, SollumType.BOUND_POLY_CAPSULE, materials)
-    v1 = vertices[poly.v1]
-    v2 = vertices[poly.v2]
+    v1 = Vector(vertices[poly["v1"]])
+    v2 = Vector(vertices[poly["v2"]])
     rot = get_direction_of_vectors(v1, v2)
     length = (v1 - v2).length
-    create_capsule(capsule.data, radius=poly.radius, length=length, axis="Z")
+    create_capsule(capsule.data, radius=float(poly["radius"]), length=length, axis="Z")
 
     capsule.location = (v1 + v2) / 2
     capsule.rotation_euler = rot
@@ -329,12 +327,12 @@ def create_poly_capsule(poly, materials, vertices):
 
 def create_poly_cylinder(poly, materials, vertices):
     cylinder = init_poly_obj(poly, SollumType.BOUND_POLY_CYLINDER, materials)
-    v1 = vertices[poly.v1]
-    v2 = vertices[poly.v2]
+    v1 = Vector(vertices[poly["v1"]])
+    v2 = Vector(vertices[poly["v2"]])
 
     rot = get_direction_of_vectors(v1, v2)
 
-    radius = poly.radius
+    radius = float(poly["radius"])
     length = get_distance_of_vectors(v1, v2)
     create_cylinder(cylinder.data, radius=radius, length=length, axis="Z")
 
@@ -346,24 +344,20 @@ def create_poly_cylinder(poly, materials, vertices):
     return cylinder
 
 POLY_TO_OBJ_MAP = {
-    PolyBox: create_poly_box,
-    PolySphere: create_poly_sphere,
-    PolyCapsule: create_poly_capsule,
-    PolyCylinder: create_poly_cylinder,
+    PolygonType.BOX: create_poly_box,
+    PolygonType.SPHERE: create_poly_sphere,
+    PolygonType.CAPSULE: create_poly_capsule,
+    PolygonType.CYLINDER: create_poly_cylinder,
 }
 
-def poly_to_obj(poly, materials, vertices) -> bpy.types.Object:
-    return POLY_TO_OBJ_MAP[type(poly)](poly, materials, vertices)
-
-
-def get_poly_triangles(polys: list[Polygon]):
-    return [poly for poly in polys if isinstance(poly, PolyTriangle)]
+def poly_to_obj(poly_type: PolygonType, poly, materials, vertices) -> bpy.types.Object:
+    return POLY_TO_OBJ_MAP[poly_type](poly, materials, vertices)
 
 
 def create_bound_mesh_data(
-    vertices: list[Vector],
-    triangles: list[PolyTriangle],
-    vertex_colors: Optional[list[tuple[int, int, int, int]]],
+    vertices: NDArray[np.float32],
+    triangles: NDArray,
+    vertex_colors: NDArray[np.uint8],
     materials: list[bpy.types.Material]
 ) -> bpy.types.Mesh:
     mesh = bpy.data.meshes.new(SOLLUMZ_UI_NAMES[SollumType.BOUND_GEOMETRY])
@@ -382,41 +376,37 @@ def create_bound_mesh_data(
     return mesh
 
 
-def apply_bound_geom_materials(mesh: bpy.types.Mesh, triangles: list[PolyTriangle], materials: list[bpy.types.Material]):
+def apply_bound_geom_materials(mesh: bpy.types.Mesh, triangles: NDArray, materials: list[bpy.types.Material]):
     for mat in materials:
         mesh.materials.append(mat)
 
-    for i, poly_xml in enumerate(triangles):
-        mesh.polygons[i].material_index = poly_xml.material_index
+    mesh.polygons.foreach_set("material_index", triangles["material_index"].astype(np.int32))
 
 
 def get_bound_geom_mesh_data(
-    vertices: list[Vector],
-    triangles: list[PolyTriangle],
-    vertex_colors: Optional[list[tuple[int, int, int, int]]]
-) -> tuple[list, list, Optional[NDArray]]:
-    def _color_to_float(color_int: tuple[int, int, int, int]):
-        return (color_int[0] / 255, color_int[1] / 255, color_int[2] / 255, color_int[3] / 255)
-
-    verts = []
-    verts_dict = {}
-    faces = []
-    colors = [] if vertex_colors else None
-
-    for poly in triangles:
-        face = []
-        for v in [vertices[poly.v1], vertices[poly.v2], vertices[poly.v3]]:
-            v_tuple = tuple(v)
-            if v_tuple not in verts_dict:
-                verts_dict[v_tuple] = len(verts)
-                verts.append(v)
-            face.append(verts_dict[v_tuple])
-        faces.append(face)
-
-        if colors is not None:
-            colors.extend(_color_to_float(vertex_colors[v]) for v in [poly.v1, poly.v2, poly.v3])
-
-    return verts, faces, np.array(colors, dtype=np.float64) if colors is not None else None
+    vertices: NDArray[np.float32],
+    triangles: NDArray,
+    vertex_colors: NDArray[np.uint8]
+) -> tuple[NDArray[np.float32], NDArray[np.uint32], Optional[NDArray[np.float64]]]:
+    """Get the vertex positions, faces and per-corner colors of the mesh for ``triangles``. Vertices with the same
+    position are merged and numbered in the order they are first used by the triangles."""
+    corner_inds = np.column_stack((triangles["v1"], triangles["v2"], triangles["v3"])).reshape((-1,))
+
+    # Adding zero turns -0.0 into 0.0, so both are merged like when comparing the values
+    corner_verts = vertices[corner_inds] + np.float32(0.0)
+    corner_verts_bytes = corner_verts.view(np.dtype((np.void, corner_verts.itemsize * 3))).reshape((-1,))
+    _, first_corners, corner_unique_inds = np.unique(corner_verts_bytes, return_index=True, return_inverse=True)
+
+    # np.unique sorts the vertices, renumber them by first use
+    first_use_order = np.argsort(first_corners)
+    vert_inds = np.empty(len(first_use_order), dtype=np.uint32)
+    vert_inds[first_use_order] = np.arange(len(first_use_order), dtype=np.uint32)
+
+    verts = corner_verts[first_corners[first_use_order]]
+    faces = vert_inds[corner_unique_inds].reshape((-1, 3))
+    colors = vertex_colors[corner_inds] / 255 if len(vertex_colors) > 0 else None
+
+    return verts, faces, colors
 
 
 def set_bound_child_properties(bound_xml: BoundChild, bound_obj: bpy.types.Object):
@@ -2,16 +2,21 @@ import bpy
 from mathutils import Vector, Quaternion
 import math
 import struct
-from typing import Optional
+from typing import NamedTuple, Optional
+import numpy as np
+from numpy.typing import NDArray
 from ..cwxml import clipdictionary as ycdxml
 from ..sollumz_properties import SollumType
 from ..tools import jenkhash
 from ..tools.blenderhelper import build_name_bone_map, build_bone_map
+from ..tools.exportpool import ExportPool, write_xml
+from ..tools.fcurvesampling import sample_fcurve, sample_fcurves
 from ..tools.animationhelper import (
     Track,
     TrackFormat,
     TrackFormatMap,
     AnimationFlag,
+    QUANTIZE_MAX_STEPS,
     get_quantum_and_min_val,
     get_id_and_track_from_track_data_path,
     calculate_bone_space_transform_matrix,
@@ -43,7 +48,9 @@ def parse_uv_transform_data_path(data_path: str) -> tuple[int, str]:
     return index, prop
 
 
-TrackFramesData = list[Vector] | list[Quaternion] | list[float]
+# Values of a track at each exported frame, ``(frames,)`` for floats, ``(frames, 3)`` for vectors and ``(frames, 4)``
+# for quaternions stored as W, X, Y, Z
+TrackFramesData = NDArray[np.float32]
 SequenceItems = dict[int, dict[Track, TrackFramesData]]
 
 
@@ -53,9 +60,10 @@ def sequence_items_from_action(
 ) -> SequenceItems:
     action_frame_range = action.frame_range
     export_frame_count = get_action_export_frame_count(action)
-    def _export_frame_to_action_frame(frame_index: int) -> float:
-        export_last_frame_index = export_frame_count - 1
-        return action_frame_range[0] + (frame_index / export_last_frame_index) * (action_frame_range[1] - action_frame_range[0])
+    export_last_frame_index = export_frame_count - 1
+    export_frames = action_frame_range[0] + (
+        (np.arange(export_frame_count) / export_last_frame_index) * (action_frame_range[1] - action_frame_range[0])
+    )
 
     target = get_target_from_id(target_id)
     target_is_armature = isinstance(target_id, bpy.types.Armature)
@@ -69,6 +77,10 @@ def sequence_items_from_action(
 
     uv_transforms_fcurves = {}
 
+    # F-curves to sample with the track data and component they go to, sampled all at once later
+    sampled_fcurves = []
+    sampled_fcurves_targets = []
+
     sequence_items: SequenceItems = {}
     for fcurve in action.fcurves:
         data_path = fcurve.data_path
@@ -102,19 +114,25 @@ def sequence_items_from_action(
                     default_vec = (0.0, 1.0, 0.0)
                 else:
                     default_vec = (0.0, 0.0, 0.0)
-                bone_sequences[track] = [Vector(default_vec) for _ in range(export_frame_count)]
+                bone_sequences[track] = np.tile(np.array(default_vec, dtype=np.float32), (export_frame_count, 1))
             elif track_format == TrackFormat.Quaternion:
-                bone_sequences[track] = [Quaternion((1.0, 0.0, 0.0, 0.0)) for _ in range(export_frame_count)]
+                identity_quat = np.array((1.0, 0.0, 0.0, 0.0), dtype=np.float32)
+                bone_sequences[track] = np.tile(identity_quat, (export_frame_count, 1))
             elif track_format == TrackFormat.Float:
-                bone_sequences[track] = [0.0] * export_frame_count
-
-        track_sequence = bone_sequences[track]
-        for frame_id in range(export_frame_count):
-            value = fcurve.evaluate(_export_frame_to_action_frame(frame_id))
-            if track_format == TrackFormat.Float:
-                track_sequence[frame_id] = value
+                bone_sequences[track] = np.zeros(export_frame_count, dtype=np.float32)
+
+        sampled_fcurves.append(fcurve)
+        target_comp_index = None if track_format == TrackFormat.Float else comp_index
+        sampled_fcurves_targets.append((bone_sequences[track], target_comp_index))
+
+    if sampled_fcurves:
+        for values, (track_sequence, comp_index) in zip(
+            sample_fcurves(sampled_fcurves, export_frames), sampled_fcurves_targets
+        ):
+            if comp_index is None:
+                track_sequence[:] = values
             else:
-                track_sequence[frame_id][comp_index] = value
+                track_sequence[:, comp_index] = values
 
     if target_is_armature:
         # transform bones from pose space to local space
@@ -123,24 +141,22 @@ def sequence_items_from_action(
 
             if Track.BonePosition in bone_sequences:
                 vecs = bone_sequences[Track.BonePosition]
-                for i in range(export_frame_count):
-                    vecs[i] = transform_mat @ vecs[i]
+                transform_arr = np.array(transform_mat, dtype=np.float64)
+                vecs[:] = vecs @ transform_arr[:3, :3].T + transform_arr[:3, 3]
 
             if Track.BoneRotation in bone_sequences:
                 quats = bone_sequences[Track.BoneRotation]
-                for i in range(export_frame_count):
-                    quats[i].rotate(transform_mat)
+                quats[:] = rotate_quaternions(quats, np.array(transform_mat.to_quaternion()), local=False)
 
     if target_is_camera:
         # see animationhelper.transform_camera_rotation_quaternion
         angle_delta = math.radians(-90.0)
-        x_axis = Vector((1.0, 0.0, 0.0))
+        x_axis_rotation = np.array(Quaternion((1.0, 0.0, 0.0), angle_delta))
         for bone_id, bone_sequences in sequence_items.items():
             if Track.CameraRotation in bone_sequences:
                 quats = bone_sequences[Track.CameraRotation]
-                for i in range(export_frame_count):
-                    x_axis_local = quats[i] @ x_axis
-                    quats[i].rotate(Quaternion(x_axis_local, angle_delta))
+                # Rotating around the X axis of each quaternion
+                quats[:] = rotate_quaternions(quats, x_axis_rotation, local=True)
 
     if target_id is not None and len(uv_transforms_fcurves) > 0:
         # copy the UV transforms defined by the user to apply f-curves on them without modifying the original ones
@@ -157,31 +173,31 @@ def sequence_items_from_action(
 
             bone_sequences = sequence_items[bone_id]
 
+            fcurves_values = [
+                (*parse_uv_transform_data_path(fcurve.data_path), fcurve.array_index,
+                 sample_fcurve(fcurve, export_frames).tolist())
+                for fcurve in fcurves
+            ]
+
             # compute uv0/uv1 from uv_transform
-            bone_sequences[Track.UV0] = [Vector((0.0, 0.0, 0.0)) for _ in range(export_frame_count)]
-            bone_sequences[Track.UV1] = [Vector((0.0, 0.0, 0.0)) for _ in range(export_frame_count)]
-            uv0_sequence = bone_sequences[Track.UV0]
-            uv1_sequence = bone_sequences[Track.UV1]
+            uv0_sequence = np.zeros((export_frame_count, 3), dtype=np.float32)
+            uv1_sequence = np.zeros((export_frame_count, 3), dtype=np.float32)
+            bone_sequences[Track.UV0] = uv0_sequence
+            bone_sequences[Track.UV1] = uv1_sequence
             for frame_id in range(export_frame_count):
                 # apply f-curves to UV transforms
-                for fcurve in fcurves:
-                    value = fcurve.evaluate(_export_frame_to_action_frame(frame_id))
-                    transform_index, prop_name = parse_uv_transform_data_path(fcurve.data_path)
+                for transform_index, prop_name, comp_index, values in fcurves_values:
+                    value = values[frame_id]
 
                     prop = getattr(uv_transforms[transform_index], prop_name)
                     if isinstance(prop, float):
                         setattr(uv_transforms[transform_index], prop_name, value)
                     else:  # Vector
-                        comp_index = fcurve.array_index
                         prop[comp_index] = value
 
                 mat = calculate_final_uv_transform_matrix(uv_transforms)
-                uv0_sequence[frame_id][0] = mat[0][0]
-                uv0_sequence[frame_id][1] = mat[0][1]
-                uv0_sequence[frame_id][2] = mat[0][2]
-                uv1_sequence[frame_id][0] = mat[1][0]
-                uv1_sequence[frame_id][1] = mat[1][1]
-                uv1_sequence[frame_id][2] = mat[1][2]
+                uv0_sequence[frame_id] = mat[0][0:3]
+                uv1_sequence[frame_id] = mat[1][0:3]
 
         uv_transforms.clear()
 
@@ -214,49 +230,146 @@ def sequence_items_from_action(
             if quats is None:
                 continue
 
-            for i in range(1, export_frame_count):
-                if quats[i - 1].dot(quats[i]) < 0:
-                    quats[i] *= -1
+            make_consecutive_quaternions_same_hemisphere(quats)
     # WARNING: ANY OPERATION WITH ROTATION WILL CAUSE SIGN CHANGE. PROCEED ANYTHING BEFORE FIX.
 
     return sequence_items
 
 
+def multiply_quaternions(a: NDArray, b: NDArray) -> NDArray[np.float64]:
+    """Hamilton product of quaternions stored as W, X, Y, Z in the last axis, broadcasting like NumPy operators."""
+    aw, ax, ay, az = np.moveaxis(np.asarray(a, dtype=np.float64), -1, 0)
+    bw, bx, by, bz = np.moveaxis(np.asarray(b, dtype=np.float64), -1, 0)
+    return np.stack((
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ), axis=-1)
+
+
+def rotate_quaternions(quats: NDArray, rotation: NDArray, local: bool) -> NDArray[np.float64]:
+    """Rotate each of ``quats`` by ``rotation``, in world space or in the local space of each quaternion. Same as
+    ``Quaternion.rotate`` with unit quaternions, including the sign of the result, which always has W >= 0."""
+    rotated = multiply_quaternions(quats, rotation) if local else multiply_quaternions(rotation, quats)
+    rotated[rotated[:, 0] < 0.0] *= -1.0
+    return rotated
+
+
+def make_consecutive_quaternions_same_hemisphere(quats: NDArray):
+    """Negate quaternions in place so the dot product of each quaternion with the previous one is never negative. Each
+    quaternion is negated if its dot product with the previous one, after that one is negated, is negative."""
+    if len(quats) < 2:
+        return
+
+    dots = np.einsum("ij,ij->i", quats[:-1], quats[1:])
+    # A quaternion is negated when the number of negative dot products since the last zero one, where the sign
+    # resets, is odd
+    is_negative = np.concatenate(([False], dots < 0.0))
+    is_reset = np.concatenate(([True], dots == 0.0))
+    num_negative = np.cumsum(is_negative)
+    indices = np.arange(len(quats))
+    last_reset = np.maximum.accumulate(np.where(is_reset, indices, 0))
+    negate = (num_negative - num_negative[last_reset]) % 2 == 1
+    quats[negate] *= -1.0
+
+
+# Largest difference allowed between the values of a channel and the values the game gets from the quantized channel,
+# in the units of the track. Metres for positions, which is also used for other vectors and floats by default.
+CHANNEL_QUANTIZE_MAX_ERROR = 1e-4
+# Quaternion components, about 0.002 degrees of rotation
+QUATERNION_CHANNEL_QUANTIZE_MAX_ERROR = 2e-5
+# Tracks whose units need a different bound than the default of their format
+TRACK_CHANNEL_QUANTIZE_MAX_ERROR = {
+    # UV transform rows, texture coordinates
+    Track.UV0: 1e-5,
+    Track.UV1: 1e-5,
+    # Degrees
+    Track.CameraFOV: 1e-3,
+}
+# Approximate sizes in the game files, in bits, used to pick the smallest channel encoding
+RAW_FLOAT_VALUE_BITS = 32
+QUANTIZE_FLOAT_HEADER_BITS = 2 * 32  # quantum and offset
+
+
+def quantize_values(
+    values: NDArray[np.float64],
+    offset: float,
+    quantum: float
+) -> tuple[NDArray[np.int64], float]:
+    """Quantize ``values`` like the game stores them in quantized channels, with the offset and quantum as float32.
+    Returns the quantized values and the largest error of the values read back from them."""
+    offset = np.float32(offset).astype(np.float64)
+    quantum = np.float32(quantum).astype(np.float64)
+    quantized = np.rint((values - offset) / quantum).astype(np.int64)
+    error = float(np.max(np.abs(offset + quantized * quantum - values)))
+    return quantized, error
+
+
+def get_channel_quantize_max_error(track: Track) -> float:
+    """Get the largest error allowed when quantizing the channels of ``track``."""
+    max_error = TRACK_CHANNEL_QUANTIZE_MAX_ERROR.get(track, None)
+    if max_error is not None:
+        return max_error
+
+    if TrackFormatMap.get(track, None) == TrackFormat.Quaternion:
+        return QUATERNION_CHANNEL_QUANTIZE_MAX_ERROR
+
+    return CHANNEL_QUANTIZE_MAX_ERROR
+
+
 def build_values_channel(
-    values: list[float],
-    uniq_values: list[float],
-    indirect_percentage: float = 0.1
+    values: NDArray[np.float64],
+    max_error: float = CHANNEL_QUANTIZE_MAX_ERROR
 ) -> ycdxml.ChannelsList.Channel:
-    values_len_percentage = len(uniq_values) / len(values)
+    """Build the channel that stores ``values`` in the fewest bits, with an error of at most ``max_error``.
+
+    Quantized channels are tried with the quantum from ``get_quantum_and_min_val``, which is exact for values that
+    change in steps, and with the largest quantum within ``max_error``, as long as the range fits in
+    ``QUANTIZE_MAX_STEPS``. ``RawFloat`` is the fallback when quantizing would lose too much precision or not save any
+    space."""
+    uniq_values, uniq_indices = np.unique(values, return_inverse=True)
 
     if len(uniq_values) == 1:
         channel = ycdxml.ChannelsList.StaticFloat()
 
-        channel.value = uniq_values[0]
-    elif values_len_percentage <= indirect_percentage:
-        channel = ycdxml.ChannelsList.IndirectQuantizeFloat()
+        channel.value = float(uniq_values[0])
+        return channel
+
+    num_values = len(values)
+    # (size in bits, channel type, offset, quantum), in order of preference when the sizes are the same
+    encodings = []
+    frame_index_bits = (len(uniq_values) - 1).bit_length()
+    for channel_type, channel_values, extra_bits in (
+        (ycdxml.ChannelsList.IndirectQuantizeFloat, uniq_values, num_values * frame_index_bits),
+        (ycdxml.ChannelsList.QuantizeFloat, values, 0),
+    ):
+        min_value, quantum = get_quantum_and_min_val(channel_values)
+        candidate_quantums = (quantum,) if quantum <= 2.0 * max_error else (quantum, 2.0 * max_error)
+        for candidate_quantum in candidate_quantums:
+            quantized, error = quantize_values(channel_values, min_value, candidate_quantum)
+            max_quantized = int(quantized.max())
+            if error > max_error or max_quantized > QUANTIZE_MAX_STEPS:
+                continue
 
-        min_value, quantum = get_quantum_and_min_val(uniq_values)
+            value_bits = max_quantized.bit_length()
+            size = QUANTIZE_FLOAT_HEADER_BITS + len(channel_values) * value_bits + extra_bits
+            encodings.append((size, channel_type, min_value, candidate_quantum))
+    encodings.append((num_values * RAW_FLOAT_VALUE_BITS, ycdxml.ChannelsList.RawFloat, None, None))
 
+    _, channel_type, min_value, quantum = min(encodings, key=lambda encoding: encoding[0])
+    channel = channel_type()
+    if channel_type is ycdxml.ChannelsList.RawFloat:
+        channel.values = values
+    elif channel_type is ycdxml.ChannelsList.IndirectQuantizeFloat:
         channel.values = uniq_values
-        channel.offset = min_value
-        channel.quantum = quantum
-
-        for value in values:
-            channel.frames.append(uniq_values.index(value))
+        channel.offset = float(min_value)
+        channel.quantum = float(quantum)
+        channel.frames = uniq_indices.astype(np.uint32)
     else:
-        channel = ycdxml.ChannelsList.QuantizeFloat()
-
-        min_value, quantum = get_quantum_and_min_val(values)
-
         channel.values = values
-        channel.offset = min_value
-        channel.quantum = quantum
-
-    # TODO: decide when RawFloat is needed (quantizefloat may compress values too much)
-    # else:
-    #     channel = ycdxml.ChannelsList.RawFloat()
-    #     channel.values = values
+        channel.offset = float(min_value)
+        channel.quantum = float(quantum)
 
     return channel
 
@@ -269,77 +382,47 @@ def sequence_data_from_frames_data(
 
     track_format = TrackFormatMap[track]
 
-    if track_format == TrackFormat.Vector3:
-        values_x = []
-        values_y = []
-        values_z = []
-
-        for vector in frames_data:
-            values_x.append(vector.x)
-            values_y.append(vector.y)
-            values_z.append(vector.z)
-
-        uniq_x = list(set(values_x))
-        len_uniq_x = len(uniq_x)
+    # One column per component, quaternions are stored as W, X, Y, Z
+    values = np.array(frames_data, dtype=np.float64).reshape((len(frames_data), -1))
+    is_static = bool(np.all(values == values[0]))
+    max_error = get_channel_quantize_max_error(track)
 
-        uniq_y = list(set(values_y))
-        len_uniq_y = len(uniq_y)
-
-        uniq_z = list(set(values_z))
-        len_uniq_z = len(uniq_z)
-
-        if len_uniq_x == 1 and len_uniq_y == 1 and len_uniq_z == 1:
+    if track_format == TrackFormat.Vector3:
+        if is_static:
             channel = ycdxml.ChannelsList.StaticVector3()
-            channel.value = frames_data[0]
+            channel.value = Vector(values[0])
 
             sequence_data.channels.append(channel)
         else:
-            sequence_data.channels.append(build_values_channel(values_x, uniq_x))
-            sequence_data.channels.append(build_values_channel(values_y, uniq_y))
-            sequence_data.channels.append(build_values_channel(values_z, uniq_z))
+            sequence_data.channels.append(build_values_channel(values[:, 0], max_error))
+            sequence_data.channels.append(build_values_channel(values[:, 1], max_error))
+            sequence_data.channels.append(build_values_channel(values[:, 2], max_error))
     elif track_format == TrackFormat.Quaternion:
-        values_x = []
-        values_y = []
-        values_z = []
-        values_w = []
-
-        for quat in frames_data:
-            values_x.append(quat.x)
-            values_y.append(quat.y)
-            values_z.append(quat.z)
-            values_w.append(quat.w)
-
-        uniq_x = list(set(values_x))
-        len_uniq_x = len(uniq_x)
-
-        uniq_y = list(set(values_y))
-        len_uniq_y = len(uniq_y)
-
-        uniq_z = list(set(values_z))
-        len_uniq_z = len(uniq_z)
-
-        uniq_w = list(set(values_w))
-        len_uniq_w = len(uniq_w)
-
-        if len_uniq_x == 1 and len_uniq_y == 1 and len_uniq_z == 1 and len_uniq_w == 1:
+        if is_static:
             channel = ycdxml.ChannelsList.StaticQuaternion()
-            channel.value = frames_data[0]
+            channel.value = Quaternion(values[0])
 
             sequence_data.channels.append(channel)
         else:
-            sequence_data.channels.append(build_values_channel(values_x, uniq_x))
-            sequence_data.channels.append(build_values_channel(values_y, uniq_y))
-            sequence_data.channels.append(build_values_channel(values_z, uniq_z))
-            sequence_data.channels.append(build_values_channel(values_w, uniq_w))
+            sequence_data.channels.append(build_values_channel(values[:, 1], max_error))
+            sequence_data.channels.append(build_values_channel(values[:, 2], max_error))
+            sequence_data.channels.append(build_values_channel(values[:, 3], max_error))
+            sequence_data.channels.append(build_values_channel(values[:, 0], max_error))
     elif track_format == TrackFormat.Float:
-        values = frames_data
-        uniq = list(set(values))
-        sequence_data.channels.append(build_values_channel(values, uniq))
+        sequence_data.channels.append(build_values_channel(values[:, 0], max_error))
 
     return sequence_data
 
 
-def animation_from_object(animation_obj: bpy.types.Object) -> Optional[ycdxml.Animation]:
+class SampledAnimation(NamedTuple):
+    """Data of an animation read from Blender, everything needed to build its XML without accessing ``bpy``."""
+    hash: str
+    frame_count: int
+    duration: float
+    sequence_items: SequenceItems
+
+
+def sample_animation(animation_obj: bpy.types.Object) -> Optional[SampledAnimation]:
     animation_properties = animation_obj.animation_properties
     action = animation_properties.action
     export_frame_count = get_action_export_frame_count(action)
@@ -347,19 +430,31 @@ def animation_from_object(animation_obj: bpy.types.Object) -> Optional[ycdxml.An
         logger.error(f"Action '{action.name}' has no keyframes. Used by animation '{animation_obj.name}'. Cannot export empty action.")
         return None
 
+    target_id = animation_properties.target_id
+    sequence_items = sequence_items_from_action(action, target_id)
+
+    return SampledAnimation(
+        animation_properties.hash, export_frame_count, get_action_duration_secs(action), sequence_items
+    )
+
+
+def animation_from_sampled(sampled_animation: SampledAnimation) -> ycdxml.Animation:
+    """Compress the sampled tracks into the animation channels. Doesn't access ``bpy``, so it can run in worker
+    threads."""
+    export_frame_count = sampled_animation.frame_count
+
     animation = ycdxml.Animation()
-    animation.hash = animation_properties.hash
+    animation.hash = sampled_animation.hash
     animation.frame_count = export_frame_count
     animation.sequence_frame_limit = export_frame_count + 30
-    animation.duration = get_action_duration_secs(action)
+    animation.duration = sampled_animation.duration
     animation.unknown10 = AnimationFlag.Default
 
     # signature: this value must be unique (used internally for animation caching)
     # TODO: CW should calculate this on import with the proper hash function
-    animation.unknown1C = f"hash_{jenkhash.Generate(animation_properties.hash) + 1:08X}"
+    animation.unknown1C = f"hash_{jenkhash.Generate(sampled_animation.hash) + 1:08X}"
 
-    target_id = animation_properties.target_id
-    sequence_items = sequence_items_from_action(action, target_id)
+    sequence_items = sampled_animation.sequence_items
 
     sequence = ycdxml.Animation.SequenceList.Sequence()
     sequence.frame_count = export_frame_count
@@ -391,6 +486,14 @@ def animation_from_object(animation_obj: bpy.types.Object) -> Optional[ycdxml.An
     return animation
 
 
+def animation_from_object(animation_obj: bpy.types.Object) -> Optional[ycdxml.Animation]:
+    sampled_animation = sample_animation(animation_obj)
+    if sampled_animation is None:
+        return None
+
+    return animation_from_sampled(sampled_animation)
+
+
 def clip_attribute_to_xml(attr: ClipAttribute) -> ycdxml.AttributesList.Attribute:
     if attr.type == "Float":
         xml_attr = ycdxml.AttributesList.FloatAttribute()
@@ -532,7 +635,12 @@ def clip_from_object(clip_obj: bpy.types.Object) -> ycdxml.Clip:
     return xml_clip
 
 
-def clip_dictionary_from_object(obj: bpy.types.Object) -> Optional[ycdxml.ClipDictionary]:
+def clip_dictionary_from_object(
+    obj: bpy.types.Object,
+    pool: Optional[ExportPool] = None
+) -> Optional[ycdxml.ClipDictionary]:
+    """Build the clip dictionary XML. The actions are sampled here, the animations are compressed in ``pool`` if
+    specified, while the clips are built, and added in the same order as without it."""
     clip_dictionary = ycdxml.ClipDictionary()
 
     animations_obj = None
@@ -544,31 +652,43 @@ def clip_dictionary_from_object(obj: bpy.types.Object) -> Optional[ycdxml.ClipDi
         elif child_obj.sollum_type == SollumType.CLIPS:
             clips_obj = child_obj
 
+    sampled_animations = []
     any_animation_export_failed = False
     for animation_obj in animations_obj.children:
-        animation = animation_from_object(animation_obj)
-        if animation is None:
+        sampled_animation = sample_animation(animation_obj)
+        if sampled_animation is None:
             any_animation_export_failed = True
             continue
 
-        clip_dictionary.animations.append(animation)
+        sampled_animations.append(sampled_animation)
 
     if any_animation_export_failed:
         # If any animation had some error, it's not safe to continue exporting the clips
         return None
 
+    if pool is not None:
+        animation_futures = [pool.submit(animation_from_sampled, sampled) for sampled in sampled_animations]
+
     for clip_obj in clips_obj.children:
         clip = clip_from_object(clip_obj)
 
         clip_dictionary.clips.append(clip)
 
+    if pool is None:
+        animations = [animation_from_sampled(sampled) for sampled in sampled_animations]
+    else:
+        animations = [future.result() for future in animation_futures]
+
+    for animation in animations:
+        clip_dictionary.animations.append(animation)
+
     return clip_dictionary
 
 
-def export_ycd(obj: bpy.types.Object, filepath: str) -> bool:
-    clip_dict = clip_dictionary_from_object(obj)
+def export_ycd(obj: bpy.types.Object, filepath: str, pool: Optional[ExportPool] = None) -> bool:
+    clip_dict = clip_dictionary_from_object(obj, pool)
     if clip_dict is None:
         return False
 
-    clip_dict.write_xml(filepath)
+    write_xml(clip_dict, filepath, pool)
     return True
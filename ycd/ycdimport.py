@@ -1,7 +1,10 @@
 import os
 import bpy
-from mathutils import Vector, Quaternion
+import numpy as np
+from numpy.typing import NDArray
+from typing import Optional
 from ..cwxml import clipdictionary as ycdxml
+from ..sollumz_preferences import get_import_settings
 from ..sollumz_properties import SOLLUMZ_UI_NAMES, SollumType
 from ..tools.animationhelper import (
     Track,
@@ -11,7 +14,9 @@ from ..tools.animationhelper import (
     get_action_duration_frames,
     get_scene_fps
 )
+from ..tools.fcurvesampling import INTERPOLATION_LINEAR
 from ..tools.utils import color_hash
+from .. import logger
 
 
 def create_anim_obj(sollum_type: SollumType) -> bpy.types.Object:
@@ -22,221 +27,245 @@ def create_anim_obj(sollum_type: SollumType) -> bpy.types.Object:
     return anim_obj
 
 
-ActionData = dict[int, dict[Track, list]]
+# Values of a track at each frame, ``(frames,)`` for floats, ``(frames, 3)`` for vectors and ``(frames, 4)`` for
+# quaternions stored as W, X, Y, Z
+ActionData = dict[int, dict[Track, NDArray[np.float64]]]
 
 
-def insert_action_data(action_data: ActionData, bone_id: int, track: Track, data):
+def insert_action_data(
+    action_data: ActionData,
+    bone_id: int,
+    track: Track,
+    frame_count: int,
+    frames: slice,
+    data: NDArray
+):
     if bone_id not in action_data:
         action_data[bone_id] = {}
 
     if track not in action_data[bone_id]:
-        action_data[bone_id][track] = []
+        action_data[bone_id][track] = np.zeros((frame_count, *data.shape[1:]), dtype=np.float64)
 
-    action_data[bone_id][track].append(data)
+    action_data[bone_id][track][frames] = data
 
 
-def get_values_from_sequence_data(sequence_data: ycdxml.Animation.SequenceDataList.SequenceData, frame_id: int) -> list:
+def get_values_from_sequence_data(
+    sequence_data: ycdxml.Animation.SequenceDataList.SequenceData,
+    frame_ids: NDArray[np.intp]
+) -> list[NDArray]:
     channel_values = []
 
-    for i in range(len(sequence_data.channels)):
-        while len(channel_values) <= i:
-            channel_values.append(None)
-
-        channel = sequence_data.channels[i]
-
-        if channel is not None:
-            channel_values[i] = channel.get_value(frame_id, channel_values)
+    for channel in sequence_data.channels:
+        channel_values.append(channel.get_values(frame_ids, channel_values) if channel is not None else None)
 
     return channel_values
 
 
 def get_vector3_from_sequence_data(
     sequence_data: ycdxml.Animation.SequenceDataList.SequenceData,
-    frame_id: int
-) -> Vector:
-    channel_values = get_values_from_sequence_data(sequence_data, frame_id)
+    frame_ids: NDArray[np.intp]
+) -> NDArray[np.float64]:
+    channel_values = get_values_from_sequence_data(sequence_data, frame_ids)
 
     if len(channel_values) == 1:
         location = channel_values[0]
     else:
-        location = Vector([
-            channel_values[0],
-            channel_values[1],
-            channel_values[2],
-        ])
+        location = np.column_stack(channel_values[:3])
 
     return location
 
 
 def get_quaternion_from_sequence_data(
     sequence_data: ycdxml.Animation.SequenceDataList.SequenceData,
-    frame_id: int
-) -> Quaternion:
-    channel_values = get_values_from_sequence_data(sequence_data, frame_id)
+    frame_ids: NDArray[np.intp]
+) -> NDArray[np.float64]:
+    """Get the rotations of the sequence data at each of ``frame_ids``, as W, X, Y, Z."""
+    channel_values = get_values_from_sequence_data(sequence_data, frame_ids)
 
     if len(channel_values) == 1:
-        rotation = channel_values[0]
-    else:
-        if len(sequence_data.channels) <= 4:
-            for channel in sequence_data.channels:
-                if channel.type == "CachedQuaternion1" or channel.type == "CachedQuaternion2":
-                    cached_value = channel.get_value(frame_id, channel_values)
-
-                    if channel.quat_index == 0:
-                        channel_values = [
-                            cached_value, channel_values[0], channel_values[1], channel_values[2]]
-                    elif channel.quat_index == 1:
-                        channel_values = [
-                            channel_values[0], cached_value, channel_values[1], channel_values[2]]
-                    elif channel.quat_index == 2:
-                        channel_values = [
-                            channel_values[0], channel_values[1], cached_value, channel_values[2]]
-                    elif channel.quat_index == 3:
-                        channel_values = [
-                            channel_values[0], channel_values[1], channel_values[2], cached_value]
-
-            if channel.type == "CachedQuaternion2":
-                rotation = Quaternion(
-                    (channel_values[0], channel_values[1], channel_values[2], channel_values[3]))
-            else:
-                rotation = Quaternion(
-                    (channel_values[3], channel_values[0], channel_values[1], channel_values[2]))
-        else:
-            rotation = Quaternion(
-                (channel_values[3], channel_values[0], channel_values[1], channel_values[2]))
+        return channel_values[0]
 
-    return rotation
+    channels = sequence_data.channels
+    if len(channels) <= 4:
+        for channel in channels:
+            if channel.type == "CachedQuaternion1" or channel.type == "CachedQuaternion2":
+                cached_values = channel.get_values(frame_ids, channel_values)
+                channel_values = channel_values[:3]
+                channel_values.insert(channel.quat_index, cached_values)
+
+        if channels[-1].type == "CachedQuaternion2":
+            return np.column_stack(channel_values[:4])
+
+    return np.column_stack((channel_values[3], channel_values[0], channel_values[1], channel_values[2]))
 
 
 def combine_sequences_and_build_action_data(animation: ycdxml.Animation) -> ActionData:
+    """Decode the tracks of all the sequences of the animation. Each sequence covers ``sequence_frame_limit`` frames,
+    except the last one which covers the remaining frames."""
     sequence_frame_limit = animation.sequence_frame_limit
+    frame_count = animation.frame_count
+    num_sequences = len(animation.sequences)
 
-    if len(animation.sequences) <= 1:
-        sequence_frame_limit = animation.frame_count + 30
+    if num_sequences <= 1:
+        sequence_frame_limit = frame_count + 30
 
     action_data = {}
 
-    for frame_id in range(0, animation.frame_count):
-        sequence_index = int(frame_id / (sequence_frame_limit))
-        sequence_frame = frame_id % (sequence_frame_limit)
-
-        if sequence_index >= len(animation.sequences):
-            sequence_index = len(animation.sequences) - 1
+    for sequence_index, sequence in enumerate(animation.sequences):
+        frames_start = sequence_index * sequence_frame_limit
+        # Sequences past the frame count are ignored, and a sequence can cover fewer frames than its limit
+        if sequence_index == num_sequences - 1:
+            frames_end = frame_count
+        else:
+            frames_end = min(frames_start + sequence_frame_limit, frame_count)
+        if frames_start >= frames_end:
+            continue
 
-        sequence = animation.sequences[sequence_index]
+        frames = slice(frames_start, frames_end)
+        sequence_frame_ids = np.arange(frames_start, frames_end) % sequence_frame_limit
 
         for sequence_data_index, sequence_data in enumerate(sequence.sequence_data):
             bone_data = animation.bone_ids[sequence_data_index]
             bone_id = bone_data.bone_id
-
-            if bone_data is None:
-                continue
-
             track = bone_data.track
             format = bone_data.format
             assert TrackFormatMap[track] == format, f"Track format mismatch: {TrackFormatMap[track]} != {format}"
 
             if format == TrackFormat.Vector3:
-                vec = get_vector3_from_sequence_data(sequence_data, sequence_frame)
-                insert_action_data(action_data, bone_id, track, vec)
+                values = get_vector3_from_sequence_data(sequence_data, sequence_frame_ids)
             elif format == TrackFormat.Quaternion:
-                quat = get_quaternion_from_sequence_data(sequence_data, sequence_frame)
-                insert_action_data(action_data, bone_id, track, quat)
+                values = get_quaternion_from_sequence_data(sequence_data, sequence_frame_ids)
             elif format == TrackFormat.Float:
-                value = get_values_from_sequence_data(sequence_data, sequence_frame)[0]
-                insert_action_data(action_data, bone_id, track, value)
+                values = get_values_from_sequence_data(sequence_data, sequence_frame_ids)[0]
+            else:
+                continue
+
+            insert_action_data(action_data, bone_id, track, frame_count, frames, values)
 
     return action_data
 
 
-def apply_action_data_to_action(action_data: ActionData, action: bpy.types.Action, frame_count: int, duration_secs: float):
+def reduce_keyframes(values: NDArray[np.float64], tolerance: float) -> NDArray[np.bool_]:
+    """Get which keyframes to keep of each of the ``(curves, frames)`` sampled ``values``, one keyframe per frame.
+
+    Static curves keep only their first keyframe. The rest are simplified with the Douglas-Peucker algorithm, so
+    linear interpolation between the kept keyframes stays within ``tolerance`` of the values. All the curves are
+    simplified at once, splitting every segment over the tolerance at its farthest keyframe on each pass."""
+    num_curves, num_frames = values.shape
+    is_static = np.all(values == values[:, :1], axis=1)
+    keep = np.zeros((num_curves, num_frames), dtype=bool)
+    keep[:, 0] = True
+    keep[~is_static, -1] = True
+    if num_frames < 3 or np.all(is_static):
+        return keep
+
+    # Curves one after the other, segments never cross curves because their first and last keyframes are kept
+    curves_values = values[~is_static].reshape(-1)
+    curves_keep = keep[~is_static].reshape(-1)
+    # Keyframes in segments that may still need splitting, with the kept keyframes their segment goes between
+    active_inds = np.flatnonzero(~curves_keep)
+    curve_starts = active_inds - active_inds % num_frames
+    segment_starts = curve_starts
+    segment_ends = curve_starts + (num_frames - 1)
+    while len(active_inds) > 0:
+        fac = (active_inds - segment_starts) / (segment_ends - segment_starts)
+        start_values = curves_values[segment_starts]
+        errors = np.abs(start_values + (curves_values[segment_ends] - start_values) * fac - curves_values[active_inds])
+
+        # Active keyframes are sorted, so the keyframes of each segment are consecutive
+        is_group_start = np.empty(len(active_inds), dtype=bool)
+        is_group_start[0] = True
+        np.not_equal(segment_starts[1:], segment_starts[:-1], out=is_group_start[1:])
+        groups = np.cumsum(is_group_start) - 1
+        max_errors = np.maximum.reduceat(errors, np.flatnonzero(is_group_start))[groups]
+        is_split = max_errors > tolerance
+
+        # Keep the first keyframe with the largest error of each segment over the tolerance
+        farthest_inds = np.flatnonzero(is_split & (errors == max_errors))
+        farthest_groups = groups[farthest_inds]
+        is_first = np.empty(len(farthest_inds), dtype=bool)
+        is_first[:1] = True
+        np.not_equal(farthest_groups[1:], farthest_groups[:-1], out=is_first[1:])
+        new_key_inds = farthest_inds[is_first]
+        curves_keep[active_inds[new_key_inds]] = True
+
+        # Split the segments at their new keyframes
+        group_split_inds = np.zeros(len(is_group_start), dtype=active_inds.dtype)
+        group_split_inds[farthest_groups[is_first]] = active_inds[new_key_inds]
+        split_inds = group_split_inds[groups]
+        is_split[new_key_inds] = False
+        active_inds = active_inds[is_split]
+        split_inds = split_inds[is_split]
+        is_after_split = active_inds > split_inds
+        segment_starts = np.where(is_after_split, split_inds, segment_starts[is_split])
+        segment_ends = np.where(is_after_split, segment_ends[is_split], split_inds)
+
+    keep[~is_static] = curves_keep.reshape((-1, num_frames))
+    return keep
+
+
+def apply_action_data_to_action(
+    action_data: ActionData,
+    action: bpy.types.Action,
+    frame_count: int,
+    duration_secs: float,
+    keyframe_tolerance: Optional[float] = None
+):
+    """Create the F-curves of the action data, with one keyframe per frame. With ``keyframe_tolerance``, only the
+    keyframes kept by ``reduce_keyframes`` are created, with linear interpolation."""
     # Scale frame IDs to match the animation duration specified in the XML in Blender
     # -1 because the anim finishes when it reaches the last frame
     unscaled_duration_secs = (frame_count - 1) / get_scene_fps()
     scale_factor = duration_secs / unscaled_duration_secs
-    scaled_frame_ids = [frame_id * scale_factor for frame_id in range(frame_count)]
 
-    def _interleave_frame_ids(track_data: list[float]) -> list[float]:
-        """Converts [data0, data1, ..., dataN] to [frameId0, data0, frameId1, data1, ..., frameIdN, dataN]"""
-        assert len(track_data) == len(scaled_frame_ids)
-        return [value for co in zip(scaled_frame_ids, track_data) for value in co]
+    # Keyframes as [frameId0, data0, frameId1, data1, ..., frameIdN, dataN], filling the data of each F-curve
+    co = np.empty((frame_count, 2), dtype=np.float32)
+    co[:, 0] = np.arange(frame_count) * scale_factor
 
     for bone_id, bones_data in action_data.items():
         group_item = action.groups.new(f"#{bone_id}")
         for track, frames_data in bones_data.items():
-            track_format = TrackFormatMap[track]
             data_path = get_canonical_track_data_path(track, bone_id)
-            if track_format == TrackFormat.Vector3:
-                vec_tracks_x = list(map(lambda vec: vec.x, frames_data))
-                vec_tracks_y = list(map(lambda vec: vec.y, frames_data))
-                vec_tracks_z = list(map(lambda vec: vec.z, frames_data))
-
-                vec_curve_x = action.fcurves.new(data_path=data_path, index=0)
-                vec_curve_y = action.fcurves.new(data_path=data_path, index=1)
-                vec_curve_z = action.fcurves.new(data_path=data_path, index=2)
-
-                vec_curve_x.group = group_item
-                vec_curve_y.group = group_item
-                vec_curve_z.group = group_item
-
-                vec_curve_x.keyframe_points.add(len(frames_data))
-                vec_curve_y.keyframe_points.add(len(frames_data))
-                vec_curve_z.keyframe_points.add(len(frames_data))
-
-                vec_curve_x.keyframe_points.foreach_set("co", _interleave_frame_ids(vec_tracks_x))
-                vec_curve_y.keyframe_points.foreach_set("co", _interleave_frame_ids(vec_tracks_y))
-                vec_curve_z.keyframe_points.foreach_set("co", _interleave_frame_ids(vec_tracks_z))
-
-                vec_curve_x.update()
-                vec_curve_y.update()
-                vec_curve_z.update()
-            elif track_format == TrackFormat.Quaternion:
-                quat_tracks_x = list(map(lambda rotation: rotation.x, frames_data))
-                quat_tracks_y = list(map(lambda rotation: rotation.y, frames_data))
-                quat_tracks_z = list(map(lambda rotation: rotation.z, frames_data))
-                quat_tracks_w = list(map(lambda rotation: rotation.w, frames_data))
-
-                quat_curve_w = action.fcurves.new(data_path=data_path, index=0)
-                quat_curve_x = action.fcurves.new(data_path=data_path, index=1)
-                quat_curve_y = action.fcurves.new(data_path=data_path, index=2)
-                quat_curve_z = action.fcurves.new(data_path=data_path, index=3)
-
-                quat_curve_w.group = group_item
-                quat_curve_x.group = group_item
-                quat_curve_y.group = group_item
-                quat_curve_z.group = group_item
-
-                quat_curve_w.keyframe_points.add(len(frames_data))
-                quat_curve_x.keyframe_points.add(len(frames_data))
-                quat_curve_y.keyframe_points.add(len(frames_data))
-                quat_curve_z.keyframe_points.add(len(frames_data))
-
-                quat_curve_w.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_w))
-                quat_curve_x.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_x))
-                quat_curve_y.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_y))
-                quat_curve_z.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_z))
-
-                quat_curve_w.update()
-                quat_curve_x.update()
-                quat_curve_y.update()
-                quat_curve_z.update()
-            elif track_format == TrackFormat.Float:
-                value_curve = action.fcurves.new(data_path=data_path)
-                value_curve.group = group_item
-
-                value_curve.keyframe_points.add(len(frames_data))
-                value_curve.keyframe_points.foreach_set("co", _interleave_frame_ids(frames_data))
-
-                value_curve.update()
-
-
-def action_data_to_action(action_name: str, action_data, frame_count: int, duration_secs: float) -> bpy.types.Action:
+            # One F-curve per component, quaternions are already stored as W, X, Y, Z like the F-curve indices
+            components = frames_data[:, np.newaxis] if frames_data.ndim == 1 else frames_data
+            keep = reduce_keyframes(components.T, keyframe_tolerance) if keyframe_tolerance is not None else None
+            for comp_index in range(components.shape[1]):
+                fcurve = action.fcurves.new(data_path=data_path, index=comp_index)
+                fcurve.group = group_item
+
+                co[:, 1] = components[:, comp_index]
+                if keep is None:
+                    fcurve.keyframe_points.add(frame_count)
+                    fcurve.keyframe_points.foreach_set("co", co.ravel())
+                else:
+                    comp_co = co[keep[comp_index]]
+                    fcurve.keyframe_points.add(len(comp_co))
+                    fcurve.keyframe_points.foreach_set("co", comp_co.ravel())
+                    fcurve.keyframe_points.foreach_set(
+                        "interpolation", np.full(len(comp_co), INTERPOLATION_LINEAR, dtype=np.int32)
+                    )
+                fcurve.update()
+
+    if keyframe_tolerance is not None:
+        # Static F-curves end at their first keyframe, keep the duration of the animation
+        action.use_frame_range = True
+        action.frame_start = co[0, 0]
+        action.frame_end = co[-1, 0]
+
+
+def action_data_to_action(
+    action_name: str,
+    action_data,
+    frame_count: int,
+    duration_secs: float,
+    keyframe_tolerance: Optional[float] = None
+) -> bpy.types.Action:
     action = bpy.data.actions.new(f"{action_name}_action")
-    apply_action_data_to_action(action_data, action, frame_count, duration_secs)
+    apply_action_data_to_action(action_data, action, frame_count, duration_secs, keyframe_tolerance)
     return action
 
 
-def animation_to_obj(animation: ycdxml.Animation) -> bpy.types.Object:
+def animation_to_obj(animation: ycdxml.Animation, keyframe_tolerance: Optional[float] = None) -> bpy.types.Object:
     animation_obj = create_anim_obj(SollumType.ANIMATION)
 
     animation_obj.name = animation.hash
@@ -244,7 +273,8 @@ def animation_to_obj(animation: ycdxml.Animation) -> bpy.types.Object:
 
     action_data = combine_sequences_and_build_action_data(animation)
     animation_obj.animation_properties.action = action_data_to_action(animation.hash, action_data,
-                                                                      animation.frame_count, animation.duration)
+                                                                      animation.frame_count, animation.duration,
+                                                                      keyframe_tolerance)
 
     return animation_obj
 
@@ -348,10 +378,13 @@ def clip_dictionary_to_obj(clip_dictionary: ycdxml.ClipDictionary, name: str) ->
     animations_map = {}
     animations_obj_map = {}
 
+    import_settings = get_import_settings()
+    keyframe_tolerance = import_settings.ycd_keyframe_tolerance if import_settings.ycd_reduce_keyframes else None
+
     for animation in clip_dictionary.animations:
         animations_map[animation.hash] = animation
 
-        animation_obj = animation_to_obj(animation)
+        animation_obj = animation_to_obj(animation, keyframe_tolerance)
         animation_obj.parent = animations_obj
 
         animations_obj_map[animation.hash] = animation_obj
@@ -361,9 +394,31 @@ def clip_dictionary_to_obj(clip_dictionary: ycdxml.ClipDictionary, name: str) ->
         clip_obj = clip_to_obj(clip, animations_map, animations_obj_map)
         clip_obj.parent = clips_obj
 
+        if keyframe_tolerance is not None:
+            log_keyframe_reduction(clip_obj, animations_map)
+
     return clip_dict_obj
 
 
+def log_keyframe_reduction(clip_obj: bpy.types.Object, animations_map: dict[str, ycdxml.Animation]):
+    """Log how many keyframes were created for the animations of the clip, compared to one per frame."""
+    num_full_keyframes = 0
+    num_keyframes = 0
+    for clip_animation in clip_obj.clip_properties.animations:
+        animation_properties = clip_animation.animation.animation_properties
+        fcurves = animation_properties.action.fcurves
+        num_full_keyframes += animations_map[animation_properties.hash].frame_count * len(fcurves)
+        num_keyframes += sum(len(fcurve.keyframe_points) for fcurve in fcurves)
+
+    if num_keyframes == 0:
+        return
+
+    logger.info(
+        f"Clip '{clip_obj.clip_properties.name}': reduced {num_full_keyframes} keyframes to {num_keyframes} "
+        f"({num_full_keyframes / num_keyframes:.1f}x)"
+    )
+
+
 def import_ycd(filepath: str) -> bpy.types.Object:
     ycd_xml = ycdxml.YCD.from_xml_file(filepath)
 
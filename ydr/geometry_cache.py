@@ -0,0 +1,182 @@
+"""On-disk cache of the geometries exported from each mesh, so re-exporting unchanged meshes skips welding and vertex
+cache optimization."""
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Iterable, NamedTuple, Optional
+import numpy as np
+from numpy.lib.recfunctions import repack_fields
+from numpy.typing import NDArray
+from ..sollumz_preferences import get_config_directory_path
+from .. import logger
+
+# Bump when the exported geometries change for the same input, so old entries are not used
+GEOMETRY_CACHE_VERSION = 1
+# Least recently used entries are removed when the cache grows larger than this
+GEOMETRY_CACHE_MAX_SIZE = 512 * 1024 * 1024
+GEOMETRY_CACHE_FILE_EXTENSION = ".npz"
+
+# Geometries created inside the outermost ``share_geometries`` block, by cache key
+_shared_geometries: Optional[dict[str, list["CachedGeometry"]]] = None
+
+
+def get_geometry_cache() -> "GeometryCache":
+    return GeometryCache(os.path.join(get_config_directory_path(), "geometry_cache"))
+
+
+@contextmanager
+def share_geometries():
+    """Reuse the geometries created for identical meshes inside the block, such as LODs decimated from the same base
+    mesh or the same model in multiple drawables of a .ydd. Can be nested, the geometries are shared until the
+    outermost block exits."""
+    global _shared_geometries
+    if _shared_geometries is not None:
+        yield
+        return
+
+    _shared_geometries = {}
+    try:
+        yield
+    finally:
+        _shared_geometries = None
+
+
+def get_shared_geometries(key: str) -> Optional[list["CachedGeometry"]]:
+    """Get the geometries already created for ``key`` in the current ``share_geometries`` block."""
+    return _shared_geometries.get(key, None) if _shared_geometries is not None else None
+
+
+def add_shared_geometries(key: str, geometries: list["CachedGeometry"]):
+    """Share ``geometries`` with the following meshes with the same ``key``, if inside a ``share_geometries`` block."""
+    if _shared_geometries is not None:
+        _shared_geometries[key] = geometries
+
+
+class CachedGeometry(NamedTuple):
+    shader_index: int
+    vertices: NDArray
+    indices: NDArray[np.uint32]
+    bounding_box_min: NDArray[np.float32]
+    bounding_box_max: NDArray[np.float32]
+
+
+class GeometryCache:
+    """Geometries of a mesh stored by content hash in ``directory``, one file per mesh. Files are touched when used,
+    and ``evict`` removes the least recently used once the total size exceeds ``max_size`` bytes. Failing to read or
+    write the cache is never an error, the geometries are just created again."""
+
+    def __init__(self, directory: str, max_size: int = GEOMETRY_CACHE_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+
+    @staticmethod
+    def make_key(vertices: NDArray, *params) -> str:
+        """Hash the contents of ``vertices`` and the ``params`` that change the geometries created from them.
+        ``params`` must have a stable ``repr``."""
+        hasher = hashlib.blake2b(digest_size=20)
+        hasher.update(repr((GEOMETRY_CACHE_VERSION, vertices.dtype.descr, len(vertices), params)).encode())
+        hasher.update(np.ascontiguousarray(vertices).data)
+        return hasher.hexdigest()
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + GEOMETRY_CACHE_FILE_EXTENSION)
+
+    def load(self, key: str) -> Optional[list[CachedGeometry]]:
+        """Get the geometries stored for ``key``, or ``None`` if there are none."""
+        path = self._get_path(key)
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                geometries = [
+                    CachedGeometry(
+                        int(shader_index), entry[f"vertices_{i}"], entry[f"indices_{i}"],
+                        entry["bounding_box_min"][i], entry["bounding_box_max"][i]
+                    )
+                    for i, shader_index in enumerate(entry["shader_indices"])
+                ]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError):
+            # Corrupted or incomplete entry, forget about it
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            # Removed by another Blender instance or read-only, only the eviction order is affected
+            pass
+
+        return geometries
+
+    def store(self, key: str, geometries: list[CachedGeometry]):
+        """Store ``geometries`` for ``key``. Logs a warning if the entry cannot be written."""
+        arrays = {
+            "shader_indices": np.array([geom.shader_index for geom in geometries], dtype=np.uint32),
+            "bounding_box_min": np.array(
+                [geom.bounding_box_min for geom in geometries], dtype=np.float32).reshape((-1, 3)),
+            "bounding_box_max": np.array(
+                [geom.bounding_box_max for geom in geometries], dtype=np.float32).reshape((-1, 3)),
+        }
+        for i, geom in enumerate(geometries):
+            # Field views of the loop buffer keep its padding, store only the fields
+            arrays[f"vertices_{i}"] = repack_fields(geom.vertices)
+            arrays[f"indices_{i}"] = geom.indices
+
+        # Write to a temporary file first so other Blender instances and export threads never see a partial entry
+        tmp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix=".tmp", prefix=f"{key}.", dir=self.directory)
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self._get_path(key))
+        except OSError as e:
+            logger.warning(f"Failed to store geometries in the geometry cache '{self.directory}': {e}")
+            if tmp_path is not None:
+                self._remove(tmp_path)
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits in ``max_size``. Scans the whole directory, so
+        call it once per export instead of after each ``store``."""
+        entries = list(self._iter_entries())
+        total_size = sum(size for _, size, _ in entries)
+        if total_size <= self.max_size:
+            return
+
+        entries.sort(key=lambda entry: entry[2])
+        for path, size, _ in entries:
+            if total_size <= self.max_size:
+                break
+
+            self._remove(path)
+            total_size -= size
+
+    def clear(self):
+        """Remove all entries."""
+        for path, _, _ in self._iter_entries():
+            self._remove(path)
+
+    def _iter_entries(self) -> Iterable[tuple[str, int, float]]:
+        """Path, size and last use time of each entry."""
+        try:
+            with os.scandir(self.directory) as it:
+                for dir_entry in it:
+                    if not dir_entry.name.endswith(GEOMETRY_CACHE_FILE_EXTENSION):
+                        continue
+
+                    try:
+                        stat = dir_entry.stat()
+                    except OSError:
+                        continue
+
+                    yield dir_entry.path, stat.st_size, stat.st_mtime
+        except OSError:
+            return
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
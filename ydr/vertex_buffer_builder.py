@@ -11,6 +11,7 @@ from ..tools.meshhelper import (
     get_uv_map_name,
 )
 from ..cwxml.drawable import VertexBuffer
+from .vertex_cache import renumber_by_first_use
 
 from .. import logger
 
@@ -50,29 +51,59 @@ def remove_unused_uvs(vertex_arr: NDArray, used_texcoords: set[str]) -> NDArray:
     return vertex_arr[new_names]
 
 
-def dedupe_and_get_indices(vertex_arr: NDArray) -> Tuple[NDArray, NDArray[np.uint32]]:
-    """Remove duplicate vertices from the buffer and get the new vertex indices in triangle order (used for IndexBuffer). Returns vertices, indices."""
+def dedupe_and_get_indices(vertex_arr: NDArray, decimals: int = 6) -> Tuple[NDArray, NDArray[np.uint32]]:
+    """Remove duplicate vertices from the buffer and get the new vertex indices in triangle order (used for
+    IndexBuffer). Returns vertices, indices.
+    Vertices are compared after rounding their values to ``decimals`` and are kept in order of first occurrence.
+    Each vertex is reduced to a 64-bit key, but the keys are still sorted by ``np.unique``, so this is an
+    O(n log n) sort of one key per vertex rather than a single hash pass."""
 
     # Cannot use np.unique directly on the vertex array because it doesn't have a tolerance parameter, only checks exact
     # equality, so floating-point values that are only different due to rounding errors would not be deduplicated.
     # For example, normals calculated by Blender for the same vertex in different loops end up slightly different from
     # rounding errors, causing this vertex to appear multiple times on export.
-    # So we first round the values in the vertex array and then pass it to np.unique.
-
-    # Convert vertex array to a 2D unstructured array of float64 to be able to use np.round, it doesn't work on the
-    # structured array.
-    # Each vertex is converted to a float64 array by concatenating the struct fields: [x, y, z, nx, ny, nz, r, g, b, a, ...]
-    vertex_arr_flatten = np.concatenate([vertex_arr[name] for name in vertex_arr.dtype.names], axis=1, dtype=np.float64)
-    np.round(vertex_arr_flatten, out=vertex_arr_flatten, decimals=6)
-
-    _, unique_indices, inverse_indices = np.unique(vertex_arr_flatten, axis=0, return_index=True, return_inverse=True)
+    # So we first quantize the values in the vertex array and then compare those.
+
+    # Convert vertex array to a 2D unstructured array of float64, by concatenating the struct fields:
+    # [x, y, z, nx, ny, nz, r, g, b, a, ...], and quantize it in place. Same rounding as ``np.round``.
+    vertex_arr_quantized = np.concatenate(
+        [vertex_arr[name] for name in vertex_arr.dtype.names], axis=1, dtype=np.float64)
+    vertex_arr_quantized *= 10.0 ** decimals
+    np.rint(vertex_arr_quantized, out=vertex_arr_quantized)
+    vertex_arr_quantized += 0.0  # -0.0 to 0.0, so both have the same bits
+
+    # Sort a single 64-bit key per vertex instead of sorting the whole rows lexicographically
+    keys = _rows_to_keys(vertex_arr_quantized)
+    _, unique_indices, inverse_indices = np.unique(keys, return_index=True, return_inverse=True)
+    if not np.array_equal(vertex_arr_quantized[unique_indices[inverse_indices]], vertex_arr_quantized):
+        # Two different rows got the same key, extremely unlikely. Compare the whole rows instead.
+        _, unique_indices, inverse_indices = np.unique(
+            vertex_arr_quantized, axis=0, return_index=True, return_inverse=True)
+
+    # Renumber the vertices in order of first occurrence, vertices used by consecutive triangles stay close together
+    order, index_arr = renumber_by_first_use(unique_indices, inverse_indices)
 
     # Lookup the vertices in the original structured and un-rounded array
-    vertex_arr = vertex_arr[unique_indices]
-    index_arr = np.asarray(inverse_indices, dtype=np.uint32)
+    vertex_arr = vertex_arr[unique_indices[order]]
     return vertex_arr, index_arr
 
 
+def _rows_to_keys(arr: NDArray[np.float64]) -> NDArray[np.uint64]:
+    """Mix the bits of each row of ``arr`` into a single 64-bit key, so rows can be sorted as one integer each.
+    Equal rows get equal keys, but different rows are not guaranteed to get different keys."""
+    keys = np.zeros(len(arr), dtype=np.uint64)
+    for column in np.ascontiguousarray(arr.T).view(np.uint64):
+        keys ^= column
+        keys *= np.uint64(0x9E3779B97F4A7C15)
+        keys ^= keys >> np.uint64(29)
+
+    return keys
+
+
+# Rows gathered at a time into the vertex buffer fields
+GATHER_CHUNK_SIZE = 1 << 18
+
+
 class VertexBufferBuilder:
     """Builds Geometry vertex buffers from a mesh."""
 
@@ -87,7 +118,15 @@ class VertexBufferBuilder:
 
         self._vert_inds = vert_inds
 
-    def build(self):
+    def build(
+        self,
+        loop_inds: Optional[NDArray[np.uint32]] = None,
+        include_normals: bool = True,
+        include_tangents: bool = True
+    ) -> NDArray:
+        """Build the vertex buffer of the loops in ``loop_inds``, in that order, or of all the loops. The buffer is
+        allocated once, with only the included attributes, and each attribute is read into a scratch buffer shared by
+        all of them before being gathered into its field in chunks."""
         if not self.mesh.loop_triangles:
             self.mesh.calc_loop_triangles()
 
@@ -95,60 +134,90 @@ class VertexBufferBuilder:
             # needed to fill mesh loops normals with custom split normals pre-4.1
             self.mesh.calc_normals_split()
 
-        mesh_attrs = self._collect_attrs()
-        return self._structured_array_from_attrs(mesh_attrs)
-
-    def _collect_attrs(self):
-        """Returns a dict mapping arrays of all GTAV vertex attributes in ``self.mesh`` stored on the loop domain."""
-        mesh_attrs = {}
+        num_loops = len(self.mesh.loops)
+        self._loop_inds = np.arange(num_loops, dtype=np.uint32) if loop_inds is None else loop_inds
+        # Large enough for any float attribute on the loop domain
+        self._scratch = np.empty(num_loops * 4, dtype=np.float32)
 
-        mesh_attrs["Position"] = self._get_positions()
+        color_attrs = self._get_color_attrs()
+        uv_layers = self._get_uv_layers()
 
+        attr_names = ["Position"]
         if self._has_weights:
-            blend_weights, blend_indices = self._get_weights_indices()
+            attr_names += ["BlendWeights", "BlendIndices"]
+        if include_normals:
+            attr_names.append("Normal")
+        attr_names += color_attrs.keys()
+        attr_names += uv_layers.keys()
+        if include_tangents:
+            attr_names.append("Tangent")
 
-            mesh_attrs["BlendWeights"] = blend_weights
-            mesh_attrs["BlendIndices"] = blend_indices
+        vertex_arr = np.empty(len(self._loop_inds), dtype=[VertexBuffer.VERT_ATTR_DTYPES[name] for name in attr_names])
 
-        mesh_attrs["Normal"] = self._get_normals()
+        self._gather_vert_attr(vertex_arr["Position"], self._get_positions())
 
-        colors = self._get_colors()
-        mesh_attrs.update(colors)
-
-        uvs = self._get_uvs()
-        mesh_attrs.update(uvs)
+        if self._has_weights:
+            blend_weights, blend_indices = self._get_weights_indices()
 
-        mesh_attrs["Tangent"] = self._get_tangents()
+            self._gather_vert_attr(vertex_arr["BlendWeights"], blend_weights)
+            self._gather_vert_attr(vertex_arr["BlendIndices"], blend_indices)
 
-        return mesh_attrs
+        if include_normals:
+            self._gather_loop_attr(vertex_arr["Normal"], self._read_loop_floats(self.mesh.loops, "normal", 3))
 
-    def _structured_array_from_attrs(self, mesh_attrs: dict[str, NDArray]):
-        """Combine ``mesh_attrs`` into single structured array."""
-        # Data type for vertex data structured array
-        struct_dtype = [VertexBuffer.VERT_ATTR_DTYPES[attr_name]
-                        for attr_name in mesh_attrs]
+        for name, color_attr in color_attrs.items():
+            colors = self._read_loop_floats(color_attr.data, "color_srgb", 4)
+            colors *= 255
+            np.rint(colors, out=colors)
+            self._gather_loop_attr(vertex_arr[name], colors)
 
-        vertex_arr = np.empty(len(self._vert_inds), dtype=struct_dtype)
+        for name, uv_layer in uv_layers.items():
+            uvs = self._read_loop_floats(uv_layer.uv, "vector", 2)
+            flip_uvs(uvs)
+            self._gather_loop_attr(vertex_arr[name], uvs)
 
-        for attr_name, arr in mesh_attrs.items():
-            vertex_arr[attr_name] = arr
+        if include_tangents:
+            self._fill_tangents(vertex_arr["Tangent"])
 
+        self._scratch = None
         return vertex_arr
 
-    def _get_positions(self):
+    def _read_loop_floats(
+        self,
+        collection: bpy.types.bpy_prop_collection,
+        prop_name: str,
+        num_components: int,
+    ) -> NDArray[np.float32]:
+        """Read a float property of each loop into the scratch buffer. The returned view is only valid until the next
+        read."""
+        values = self._scratch[:len(self.mesh.loops) * num_components]
+        collection.foreach_get(prop_name, values)
+        return values.reshape((-1, num_components))
+
+    def _gather_loop_attr(self, field: NDArray, values: NDArray):
+        """Copy the ``values`` of each loop into ``field``, in vertex buffer order."""
+        loop_inds = self._loop_inds
+        # In chunks, so the gathered values are never a whole copy of the field
+        for start in range(0, len(loop_inds), GATHER_CHUNK_SIZE):
+            end = start + GATHER_CHUNK_SIZE
+            field[start:end] = values[loop_inds[start:end]]
+
+    def _gather_vert_attr(self, field: NDArray, values: NDArray):
+        """Copy the ``values`` of each vertex into ``field``, in vertex buffer order."""
+        loop_inds = self._loop_inds
+        vert_inds = self._vert_inds
+        for start in range(0, len(loop_inds), GATHER_CHUNK_SIZE):
+            end = start + GATHER_CHUNK_SIZE
+            field[start:end] = values[vert_inds[loop_inds[start:end]]]
+
+    def _get_positions(self) -> NDArray[np.float32]:
+        """Positions of each vertex."""
         positions = np.empty(len(self.mesh.vertices) * 3, dtype=np.float32)
         self.mesh.attributes["position"].data.foreach_get("vector", positions)
-        positions = np.reshape(positions, (len(self.mesh.vertices), 3))
-
-        return positions[self._vert_inds]
-
-    def _get_normals(self):
-        normals = np.empty(len(self.mesh.loops) * 3, dtype=np.float32)
-        self.mesh.loops.foreach_get("normal", normals)
-        return np.reshape(normals, (len(self.mesh.loops), 3))
+        return np.reshape(positions, (len(self.mesh.vertices), 3))
 
     def _get_weights_indices(self) -> Tuple[NDArray[np.uint32], NDArray[np.uint32]]:
-        """Get all BlendWeights and BlendIndices."""
+        """Get the BlendWeights and BlendIndices of each vertex."""
         num_verts = len(self.mesh.vertices)
         bone_by_vgroup = self._bone_by_vgroup
 
@@ -184,8 +253,7 @@ class VertexBufferBuilder:
         weights_arr = self._convert_to_int_range(weights_arr)
         weights_arr = self._renormalize_converted_weights(weights_arr)
 
-        # Return on loop domain
-        return weights_arr[self._vert_inds], ind_arr[self._vert_inds]
+        return weights_arr, ind_arr
 
     def _get_sorted_vertex_group_elements(self, vertex: bpy.types.MeshVertex) -> list[bpy.types.VertexGroupElement]:
         elements = []
@@ -238,9 +306,9 @@ class VertexBufferBuilder:
         np.put_along_axis(result, max_indices, normalized_max_values, axis=1)
         return result
 
-    def _get_colors(self) -> dict[str, NDArray[np.uint32]]:
-        num_loops = len(self.mesh.loops)
-        color_layers = {}
+    def _get_color_attrs(self) -> dict[str, bpy.types.Attribute]:
+        """Get the color attributes used by the mesh materials, by vertex buffer field name."""
+        color_attrs = {}
         for color_idx in get_mesh_used_colors_indices(self.mesh):
             color_attr_name = get_color_attr_name(color_idx)
             color_attr = self.mesh.color_attributes.get(color_attr_name, None)
@@ -251,18 +319,12 @@ class VertexBufferBuilder:
                 # Not in the correct format, ignore it
                 continue
 
-            colors = np.empty(num_loops * 4, dtype=np.float32)
-            color_attr.data.foreach_get("color_srgb", colors)
+            color_attrs[f"Colour{color_idx}"] = color_attr
 
-            colors = self._convert_to_int_range(colors)
-            colors = np.reshape(colors, (num_loops, 4))
+        return color_attrs
 
-            color_layers[f"Colour{color_idx}"] = colors
-
-        return color_layers
-
-    def _get_uvs(self) -> dict[str, NDArray[np.float32]]:
-        num_loops = len(self.mesh.loops)
+    def _get_uv_layers(self) -> dict[str, bpy.types.MeshUVLoopLayer]:
+        """Get the UV maps used by the mesh materials, by vertex buffer field name."""
         uv_layers = {}
         for uvmap_idx in get_mesh_used_texcoords_indices(self.mesh):
             uvmap_attr_name = get_uv_map_name(uvmap_idx)
@@ -270,32 +332,18 @@ class VertexBufferBuilder:
             if uvmap_attr is None:
                 continue
 
-            uvs = np.empty(num_loops * 2, dtype=np.float32)
-            uvmap_attr.uv.foreach_get("vector", uvs)
-            uvs = np.reshape(uvs, (num_loops, 2))
-
-            flip_uvs(uvs)
-
-            uv_layers[f"TexCoord{uvmap_idx}"] = uvs
+            uv_layers[f"TexCoord{uvmap_idx}"] = uvmap_attr
 
         return uv_layers
 
-    def _get_tangents(self):
+    def _fill_tangents(self, tangent_field: NDArray[np.float32]):
         mesh = self.mesh
-        num_loops = len(mesh.loops)
 
         if not mesh.uv_layers:
-            return np.zeros((num_loops, 4), dtype=np.float32)
+            tangent_field[:] = 0.0
+            return
 
         mesh.calc_tangents()
 
-        tangents = np.empty(num_loops * 3, dtype=np.float32)
-        bitangent_signs = np.empty(num_loops, dtype=np.float32)
-
-        mesh.loops.foreach_get("tangent", tangents)
-        mesh.loops.foreach_get("bitangent_sign", bitangent_signs)
-
-        tangents = np.reshape(tangents, (num_loops, 3))
-        bitangent_signs = np.reshape(bitangent_signs, (-1, 1))
-
-        return np.concatenate((tangents, bitangent_signs), axis=1)
+        self._gather_loop_attr(tangent_field[:, :3], self._read_loop_floats(mesh.loops, "tangent", 3))
+        self._gather_loop_attr(tangent_field[:, 3:], self._read_loop_floats(mesh.loops, "bitangent_sign", 1))
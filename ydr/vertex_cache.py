@@ -0,0 +1,142 @@
+"""Reordering of geometry triangles and vertices for GPU vertex cache efficiency."""
+import numpy as np
+from numpy.typing import NDArray
+from typing import Tuple
+
+# Post-transform vertex cache size assumed when reordering triangles and measuring cache misses
+CACHE_SIZE = 16
+
+
+def count_cache_misses(ind_arr: NDArray[np.uint32], cache_size: int = CACHE_SIZE) -> int:
+    """Count the vertices transformed when drawing the triangles in ``ind_arr`` with a FIFO post-transform cache of
+    ``cache_size`` vertices."""
+    num_verts = int(ind_arr.max()) + 1 if len(ind_arr) else 0
+    # Number of misses when each vertex entered the cache, it is evicted after ``cache_size`` more misses
+    miss_time = [-cache_size] * num_verts
+    misses = 0
+    for vert in ind_arr.tolist():
+        if misses - miss_time[vert] >= cache_size:
+            miss_time[vert] = misses
+            misses += 1
+
+    return misses
+
+
+def calc_acmr(ind_arr: NDArray[np.uint32], cache_size: int = CACHE_SIZE) -> float:
+    """Average cache miss ratio, vertices transformed per triangle. From 0.5 (best) to 3.0 (worst)."""
+    num_tris = len(ind_arr) // 3
+    return count_cache_misses(ind_arr, cache_size) / num_tris if num_tris else 0.0
+
+
+def optimize_vertex_cache(
+    vertex_arr: NDArray,
+    ind_arr: NDArray[np.uint32],
+    cache_size: int = CACHE_SIZE,
+) -> Tuple[NDArray, NDArray[np.uint32]]:
+    """Reorder the triangles for post-transform vertex cache efficiency, then renumber the vertices in order of first
+    use for pre-transform fetch locality. Returns vertices, indices."""
+    ind_arr = reorder_triangles_tipsify(ind_arr, len(vertex_arr), cache_size)
+    return reorder_vertices_by_first_use(vertex_arr, ind_arr)
+
+
+def reorder_triangles_tipsify(
+    ind_arr: NDArray[np.uint32],
+    num_verts: int,
+    cache_size: int = CACHE_SIZE,
+) -> NDArray[np.uint32]:
+    """Reorder the triangles with Tipsify (Sander et al., "Fast Triangle Reordering for Vertex Locality and Reduced
+    Overdraw", 2007). Triangles are emitted as fans around vertices, choosing as next fanning vertex the one that will
+    still be in the cache after its remaining triangles are emitted."""
+    tris = ind_arr.reshape((-1, 3))
+    num_tris = len(tris)
+    if num_tris == 0:
+        return ind_arr
+
+    # Triangles of each vertex
+    tri_verts = tris.ravel()
+    adjacency_order = np.argsort(tri_verts, kind="stable")
+    adjacency_tris = (adjacency_order // 3).tolist()
+    adjacency_offsets = np.zeros(num_verts + 1, dtype=np.int64)
+    np.cumsum(np.bincount(tri_verts, minlength=num_verts), out=adjacency_offsets[1:])
+    adjacency_offsets = adjacency_offsets.tolist()
+
+    tris_list = tris.tolist()
+    live_tris = np.diff(adjacency_offsets).tolist()
+    cache_time = [-cache_size - 1] * num_verts
+    time_stamp = 0
+    emitted = [False] * num_tris
+    dead_ends = []
+    output_tris = []
+
+    fan_vert = int(tri_verts[0])
+    cursor = 0
+    while fan_vert >= 0:
+        candidates = []
+        for tri in adjacency_tris[adjacency_offsets[fan_vert]:adjacency_offsets[fan_vert + 1]]:
+            if emitted[tri]:
+                continue
+
+            emitted[tri] = True
+            output_tris.append(tri)
+            for vert in tris_list[tri]:
+                dead_ends.append(vert)
+                candidates.append(vert)
+                live_tris[vert] -= 1
+                if time_stamp - cache_time[vert] > cache_size:
+                    cache_time[vert] = time_stamp
+                    time_stamp += 1
+
+        # Next fanning vertex, the candidate that entered the cache earliest among those that will still be in the
+        # cache after emitting their remaining triangles
+        fan_vert = -1
+        best_priority = -1
+        for vert in candidates:
+            if live_tris[vert] <= 0:
+                continue
+
+            priority = 0
+            age = time_stamp - cache_time[vert]
+            if age + 2 * live_tris[vert] <= cache_size:
+                priority = age
+            if priority > best_priority:
+                best_priority = priority
+                fan_vert = vert
+
+        if fan_vert == -1:
+            # Dead end, continue from a recently used vertex or from the next one with triangles left
+            while dead_ends:
+                vert = dead_ends.pop()
+                if live_tris[vert] > 0:
+                    fan_vert = vert
+                    break
+            else:
+                while cursor < num_verts and live_tris[cursor] <= 0:
+                    cursor += 1
+                if cursor < num_verts:
+                    fan_vert = cursor
+
+    return tris[output_tris].ravel()
+
+
+def reorder_vertices_by_first_use(
+    vertex_arr: NDArray,
+    ind_arr: NDArray[np.uint32],
+) -> Tuple[NDArray, NDArray[np.uint32]]:
+    """Renumber the vertices in the order they are first used by ``ind_arr``. Returns vertices, indices."""
+    unique_inds, first_uses, inverse_inds = np.unique(ind_arr, return_index=True, return_inverse=True)
+    order, new_ind_arr = renumber_by_first_use(first_uses, inverse_inds)
+
+    return vertex_arr[unique_inds[order]], new_ind_arr
+
+
+def renumber_by_first_use(
+    first_uses: NDArray[np.intp],
+    inverse_inds: NDArray[np.intp],
+) -> Tuple[NDArray[np.intp], NDArray[np.uint32]]:
+    """Renumber the vertices found by ``np.unique(..., return_index=True, return_inverse=True)`` in order of first
+    use. Returns the order of the unique vertices and the new indices of ``inverse_inds``."""
+    order = np.argsort(first_uses)
+    new_inds = np.empty(len(order), dtype=np.uint32)
+    new_inds[order] = np.arange(len(order), dtype=np.uint32)
+
+    return order, new_inds[inverse_inds.ravel()]
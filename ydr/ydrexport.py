@@ -44,6 +44,8 @@ from ..tools.meshhelper import (
     get_tangent_required,
 )
 from ..tools.utils import get_filename, get_max_vector_list, get_min_vector_list
+from ..tools.exportpool import ExportPool, write_xml
+from ..tools.npformat import FloatFormat
 from ..shared.shader_nodes import SzShaderNodeParameter
 from ..tools.blenderhelper import get_child_of_constraint, get_pose_inverse, remove_number_suffix, get_evaluated_obj
 from ..sollumz_helper import get_export_transforms_to_apply, get_sollumz_materials
@@ -58,6 +60,15 @@ from ..ybn.ybnexport import create_composite_xml, create_bound_xml
 from .properties import get_model_properties
 from .render_bucket import RenderBucket
 from .vertex_buffer_builder import VertexBufferBuilder, dedupe_and_get_indices, remove_arr_field, remove_unused_colors, get_bone_by_vgroup, remove_unused_uvs
+from .vertex_cache import count_cache_misses, optimize_vertex_cache, reorder_vertices_by_first_use
+from .geometry_cache import (
+    CachedGeometry,
+    GeometryCache,
+    add_shared_geometries,
+    get_geometry_cache,
+    get_shared_geometries,
+    share_geometries,
+)
 from .cable_vertex_buffer_builder import CableVertexBufferBuilder
 from .cable import is_cable_mesh
 from .lights import create_xml_lights
@@ -66,11 +77,11 @@ from ..cwxml.shader import ShaderManager, ShaderDef, ShaderParameterFloatVectorD
 from .. import logger
 
 
-def export_ydr(drawable_obj: bpy.types.Object, filepath: str) -> bool:
+def export_ydr(drawable_obj: bpy.types.Object, filepath: str, pool: Optional[ExportPool] = None) -> bool:
     export_settings = get_export_settings()
 
     drawable_xml = create_drawable_xml(drawable_obj, apply_transforms=export_settings.apply_transforms)
-    drawable_xml.write_xml(filepath)
+    write_xml(drawable_xml, filepath, pool)
 
     write_embedded_textures(drawable_obj, filepath)
     return True
@@ -110,7 +121,8 @@ def create_drawable_xml(drawable_obj: bpy.types.Object, armature_obj: Optional[b
         bones = None
         original_pose = "POSE"
 
-    create_model_xmls(drawable_xml, drawable_obj, materials, bones)
+    with share_geometries():
+        create_model_xmls(drawable_xml, drawable_obj, materials, bones)
 
     drawable_xml.lights = create_xml_lights(drawable_obj)
 
@@ -254,12 +266,16 @@ def create_geometries_xml(mesh_eval: bpy.types.Mesh, materials: list[bpy.types.M
             f"Could not create geometries for Drawable Model '{mesh_eval.original.name}': Mesh has no Sollumz materials!")
         return []
 
+    export_settings = get_export_settings()
+    weld_decimals = export_settings.vertex_weld_decimals
+    float_format = FloatFormat.SHORTEST if export_settings.compact_vertex_floats else FloatFormat.FIXED
+
     if is_cable:
         cable_total_vert_buffer, cable_vert_materials = CableVertexBufferBuilder(mesh_eval).build()
         cable_geometries = []
         for cable_material_index in range(len(mesh_eval.materials)):
             cable_vert_buffer = cable_total_vert_buffer[cable_vert_materials == cable_material_index]
-            cable_vert_buffer, cable_ind_buffer = dedupe_and_get_indices(cable_vert_buffer)
+            cable_vert_buffer, cable_ind_buffer = dedupe_and_get_indices(cable_vert_buffer, weld_decimals)
 
             cable_material = mesh_eval.materials[cable_material_index].original
             cable_material_index_in_drawable = materials.index(cable_material)
@@ -268,6 +284,7 @@ def create_geometries_xml(mesh_eval: bpy.types.Mesh, materials: list[bpy.types.M
             geom_xml.bounding_box_max, geom_xml.bounding_box_min = get_geom_extents(cable_vert_buffer["Position"])
             geom_xml.shader_index = cable_material_index_in_drawable
             geom_xml.vertex_buffer.data = cable_vert_buffer
+            geom_xml.vertex_buffer.float_format = float_format
             geom_xml.index_buffer.data = cable_ind_buffer
             cable_geometries.append(geom_xml)
 
@@ -311,20 +328,92 @@ def create_geometries_xml(mesh_eval: bpy.types.Mesh, materials: list[bpy.types.M
     del colors_incorrect_format
 
 
-    loop_inds_by_mat = get_loop_inds_by_material(mesh_eval, materials)
+    loop_inds, loop_slices_by_mat = get_loop_inds_by_material(mesh_eval, materials)
 
     geometries: list[Geometry] = []
 
     bone_by_vgroup = get_bone_by_vgroup(vertex_groups, bones) if bones and vertex_groups else None
 
-    total_vert_buffer = VertexBufferBuilder(mesh_eval, bone_by_vgroup).build()
+    optimize_cache = export_settings.optimize_vertex_cache
+    geometry_cache = get_geometry_cache() if export_settings.use_geometry_cache else None
+
+    # Everything the geometries depend on besides the vertices
+    material_params = []
+    for mat_index, loop_slice in loop_slices_by_mat.items():
+        material = materials[mat_index]
+        material_params.append((
+            mat_index, loop_slice.start, loop_slice.stop,
+            sorted(get_used_texcoords(material)), sorted(get_used_colors(material)),
+            get_tangent_required(material), get_normal_required(material),
+        ))
+
+    # Build the loops grouped by material, so each material's vertices are a contiguous slice. Normals and tangents
+    # are skipped if no shader uses them.
+    include_tangents = any(tangent_required for *_, tangent_required, _ in material_params)
+    include_normals = any(normal_required for *_, normal_required in material_params)
+    vert_buffer_builder = VertexBufferBuilder(mesh_eval, bone_by_vgroup)
+    total_vert_buffer = vert_buffer_builder.build(loop_inds, include_normals, include_tangents)
+
+    cache_key = GeometryCache.make_key(total_vert_buffer, material_params, weld_decimals, optimize_cache)
+
+    # Identical meshes already exported in this drawable or .ydd share their buffers, even with a full export or
+    # without the geometry cache
+    cached_geometries = get_shared_geometries(cache_key)
+    if cached_geometries is None:
+        if geometry_cache is not None and not export_settings.force_full_export:
+            cached_geometries = geometry_cache.load(cache_key)
+        if cached_geometries is None:
+            cached_geometries = create_geometries_data(
+                mesh_eval, total_vert_buffer, loop_slices_by_mat, materials, weld_decimals, optimize_cache)
+            if geometry_cache is not None:
+                geometry_cache.store(cache_key, cached_geometries)
+
+        add_shared_geometries(cache_key, cached_geometries)
+
+    for cached_geom in cached_geometries:
+        vert_buffer = cached_geom.vertices
+
+        geom_xml = Geometry()
+
+        geom_xml.bounding_box_max = Vector(cached_geom.bounding_box_max)
+        geom_xml.bounding_box_min = Vector(cached_geom.bounding_box_min)
+        geom_xml.shader_index = cached_geom.shader_index
+
+        if bones and "BlendWeights" in vert_buffer.dtype.names:
+            geom_xml.bone_ids = get_bone_ids(bones)
+
+        geom_xml.vertex_buffer.data = vert_buffer
+        geom_xml.vertex_buffer.float_format = float_format
+        geom_xml.index_buffer.data = cached_geom.indices
+
+        geometries.append(geom_xml)
+
+    geometries = sort_geoms_by_shader(geometries)
+
+    return geometries
+
 
-    for mat_index, loop_inds in loop_inds_by_mat.items():
+def create_geometries_data(
+    mesh_eval: bpy.types.Mesh,
+    total_vert_buffer: NDArray,
+    loop_slices_by_mat: dict[int, slice],
+    materials: list[bpy.types.Material],
+    weld_decimals: int,
+    optimize_cache: bool,
+) -> list[CachedGeometry]:
+    """Create the vertex and index buffers of each material from the loops in ``total_vert_buffer``."""
+    geometries = []
+    cache_misses_before = 0
+    cache_misses_after = 0
+    num_tris = 0
+
+    for mat_index, loop_slice in loop_slices_by_mat.items():
         material = materials[mat_index]
         tangent_required = get_tangent_required(material)
         normal_required = get_normal_required(material)
 
-        vert_buffer = total_vert_buffer[loop_inds]
+        # Views into ``total_vert_buffer``, nothing is copied until the vertices are deduplicated
+        vert_buffer = total_vert_buffer[loop_slice]
         used_texcoords = get_used_texcoords(material)
         used_colors = get_used_colors(material)
 
@@ -337,23 +426,24 @@ def create_geometries_xml(mesh_eval: bpy.types.Mesh, materials: list[bpy.types.M
         if not normal_required:
             vert_buffer = remove_arr_field("Normal", vert_buffer)
 
-        vert_buffer, ind_buffer = dedupe_and_get_indices(vert_buffer)
-
-        geom_xml = Geometry()
-
-        geom_xml.bounding_box_max, geom_xml.bounding_box_min = get_geom_extents(
-            vert_buffer["Position"])
-        geom_xml.shader_index = mat_index
-
-        if bones and "BlendWeights" in vert_buffer.dtype.names:
-            geom_xml.bone_ids = get_bone_ids(bones)
+        vert_buffer, ind_buffer = dedupe_and_get_indices(vert_buffer, weld_decimals)
 
-        geom_xml.vertex_buffer.data = vert_buffer
-        geom_xml.index_buffer.data = ind_buffer
+        if optimize_cache:
+            cache_misses_before += count_cache_misses(ind_buffer)
+            vert_buffer, ind_buffer = optimize_vertex_cache(vert_buffer, ind_buffer)
+            cache_misses_after += count_cache_misses(ind_buffer)
+            num_tris += len(ind_buffer) // 3
 
-        geometries.append(geom_xml)
+        positions = vert_buffer["Position"]
+        geometries.append(
+            CachedGeometry(mat_index, vert_buffer, ind_buffer, np.min(positions, axis=0), np.max(positions, axis=0))
+        )
 
-    geometries = sort_geoms_by_shader(geometries)
+    if num_tris > 0:
+        logger.info(
+            f"Mesh '{mesh_eval.original.name}' vertex cache ACMR: {cache_misses_before / num_tris:.3f} before, "
+            f"{cache_misses_after / num_tris:.3f} after optimization"
+        )
 
     return geometries
 
@@ -362,8 +452,13 @@ def sort_geoms_by_shader(geometries: list[Geometry]):
     return sorted(geometries, key=lambda g: g.shader_index)
 
 
-def get_loop_inds_by_material(mesh: bpy.types.Mesh, drawable_mats: list[bpy.types.Material]):
-    loop_inds_by_mat: dict[int, NDArray[np.uint32]] = {}
+def get_loop_inds_by_material(
+    mesh: bpy.types.Mesh,
+    drawable_mats: list[bpy.types.Material],
+) -> tuple[NDArray[np.uint32], dict[int, slice]]:
+    """Get the triangle loop indices of ``mesh`` grouped by material, in a single pass. Returns the loop indices and a
+    mapping of the shader index in the drawable to the slice of the loop indices that belong to that material."""
+    loop_slices_by_mat: dict[int, slice] = {}
 
     if not mesh.loop_triangles:
         mesh.calc_loop_triangles()
@@ -372,12 +467,19 @@ def get_loop_inds_by_material(mesh: bpy.types.Mesh, drawable_mats: list[bpy.type
     tri_mat_indices = np.empty(len(mesh.loop_triangles), dtype=np.uint32)
     mesh.loop_triangles.foreach_get("material_index", tri_mat_indices)
 
-    # Material indices for each loop triangle
-    loop_mat_inds = np.repeat(tri_mat_indices, 3)
-
     all_loop_inds = np.empty(len(mesh.loop_triangles) * 3, dtype=np.uint32)
     mesh.loop_triangles.foreach_get("loops", all_loop_inds)
 
+    # Partition the triangles by material, stable so each material keeps its triangles in the original order
+    tri_order = np.argsort(tri_mat_indices, kind="stable")
+    all_loop_inds = all_loop_inds.reshape((-1, 3))[tri_order].ravel()
+
+    # Start and end of each material's loops in ``all_loop_inds``
+    loop_offsets = np.zeros(len(mesh.materials) + 1, dtype=np.int64)
+    tris_per_material = np.bincount(tri_mat_indices, minlength=len(mesh.materials))[:len(mesh.materials)]
+    np.cumsum(tris_per_material * 3, out=loop_offsets[1:])
+    loop_offsets = loop_offsets.tolist()
+
     mat_inds: dict[str, int] = {mat: i for i, mat in enumerate(drawable_mats)}
 
     for i, mat in enumerate(mesh.materials):
@@ -388,18 +490,16 @@ def get_loop_inds_by_material(mesh: bpy.types.Mesh, drawable_mats: list[bpy.type
 
         # Get index of material on drawable (different from mesh material index)
         shader_index = mat_inds[original_mat]
-        tri_loop_inds = np.where(loop_mat_inds == i)[0]
+        start, end = loop_offsets[i], loop_offsets[i + 1]
 
-        if tri_loop_inds.size == 0:
+        if start == end:
             continue
 
-        loop_indices = all_loop_inds[tri_loop_inds]
-
-        if shader_index in loop_inds_by_mat:
+        if shader_index in loop_slices_by_mat:
             logger.warning(f"Shader_index already in list, some geometry will be lost! This is most likely caused by a duplicate material for {mat.name} in {mesh.name}")
-        loop_inds_by_mat[shader_index] = loop_indices
+        loop_slices_by_mat[shader_index] = slice(start, end)
 
-    return loop_inds_by_mat
+    return all_loop_inds, loop_slices_by_mat
 
 
 def get_geom_extents(positions: NDArray[np.float32]):
@@ -472,6 +572,7 @@ def join_geometries(geometry_xmls: list[Geometry], shader_index: int):
     vert_counts = [len(vert_arr) for vert_arr in vert_arrs]
 
     new_geom.vertex_buffer.data = join_vert_arrs(vert_arrs)
+    new_geom.vertex_buffer.float_format = geometry_xmls[0].vertex_buffer.float_format
     new_geom.index_buffer.data = join_ind_arrs(ind_arrs, vert_counts)
 
     new_geom.bounding_box_max = get_max_vector_list(
@@ -493,27 +594,38 @@ def get_valid_ind_arrs(geometry_xmls: list[Geometry]):
 
 
 def join_vert_arrs(vert_arrs: list[NDArray]):
-    """Join vertex buffer structured arrays. Works with arrays that have different layouts."""
-    num_verts = sum(len(vert_arr) for vert_arr in vert_arrs)
-    struct_dtype = get_joined_vert_arr_dtype(vert_arrs)
-    joined_arr = np.zeros(num_verts, dtype=struct_dtype)
+    """Join vertex buffer structured arrays. Works with arrays that have different layouts, attributes missing from an
+    array are left as zeros."""
+    vert_offsets = get_vert_offsets([len(vert_arr) for vert_arr in vert_arrs])
+    struct_dtype = np.dtype(get_joined_vert_arr_dtype(vert_arrs))
+    joined_arr = np.zeros(vert_offsets[-1], dtype=struct_dtype)
 
-    for attr_name in joined_arr.dtype.names:
-        row_start = 0
+    for vert_arr, row_start, row_end in zip(vert_arrs, vert_offsets[:-1], vert_offsets[1:]):
+        copy_vert_attrs(joined_arr[row_start:row_end], vert_arr)
 
-        for vert_arr in vert_arrs:
-            if attr_name not in vert_arr.dtype.names:
-                continue
+    return joined_arr
 
-            attr = vert_arr[attr_name]
-            num_attr_verts = len(attr)
-            row_end = row_start + num_attr_verts
 
-            joined_arr[attr_name][row_start:row_end] = attr
+def copy_vert_attrs(dst_arr: NDArray, src_arr: NDArray):
+    """Copy the attributes of ``src_arr`` to the same attributes of ``dst_arr``, which must be contiguous and have the
+    same number of vertices. Attributes next to each other in both arrays are copied as a single run of bytes, much
+    faster than assigning structured arrays, which copies each attribute of each vertex separately."""
+    dst_bytes = dst_arr.view(np.uint8).reshape((len(dst_arr), dst_arr.dtype.itemsize))
+    src_bytes = np.ascontiguousarray(src_arr).view(np.uint8).reshape((len(src_arr), src_arr.dtype.itemsize))
 
-            row_start = row_end
+    # [src_offset, dst_offset, size]
+    runs: list[list[int]] = []
+    for attr_name in src_arr.dtype.names:
+        attr_dtype, src_offset = src_arr.dtype.fields[attr_name][:2]
+        dst_offset = dst_arr.dtype.fields[attr_name][1]
 
-    return joined_arr
+        if runs and runs[-1][0] + runs[-1][2] == src_offset and runs[-1][1] + runs[-1][2] == dst_offset:
+            runs[-1][2] += attr_dtype.itemsize
+        else:
+            runs.append([src_offset, dst_offset, attr_dtype.itemsize])
+
+    for src_offset, dst_offset, size in runs:
+        dst_bytes[:, dst_offset:dst_offset + size] = src_bytes[:, src_offset:src_offset + size]
 
 
 def get_joined_vert_arr_dtype(vert_arrs: list[NDArray]):
@@ -527,18 +639,22 @@ def get_joined_vert_arr_dtype(vert_arrs: list[NDArray]):
     return [VertexBuffer.VERT_ATTR_DTYPES[name] for name in attr_names]
 
 
-def join_ind_arrs(ind_arrs: list[NDArray[np.uint32]], vert_counts: list[int]) -> NDArray[np.uint32]:
-    """Join vertex index arrays by simply concatenating and offsetting indices based on vertex counts"""
-    def get_vert_ind_offset(arr_ind: int) -> int:
-        if arr_ind == 0:
-            return 0
+def get_vert_offsets(vert_counts: list[int]) -> NDArray[np.int64]:
+    """Get the row where each vertex array starts in the joined array, followed by the total number of vertices."""
+    vert_offsets = np.zeros(len(vert_counts) + 1, dtype=np.int64)
+    np.cumsum(vert_counts, out=vert_offsets[1:])
+    return vert_offsets
 
-        return sum(num_verts for num_verts in vert_counts[:arr_ind])
 
-    offset_ind_arrs = [
-        ind_arr + get_vert_ind_offset(i) for i, ind_arr in enumerate(ind_arrs)]
+def join_ind_arrs(ind_arrs: list[NDArray[np.uint32]], vert_counts: list[int]) -> NDArray[np.uint32]:
+    """Join vertex index arrays by concatenating them and offsetting the indices of each array by the number of
+    vertices before it."""
+    vert_offsets = get_vert_offsets(vert_counts)[:-1].astype(np.uint32)
+
+    joined_arr = np.concatenate(ind_arrs, dtype=np.uint32)
+    joined_arr += np.repeat(vert_offsets, [len(ind_arr) for ind_arr in ind_arrs])
 
-    return np.concatenate(offset_ind_arrs)
+    return joined_arr
 
 
 def split_drawable_by_vert_count(drawable_xml: Drawable):
@@ -572,6 +688,7 @@ def split_geom_by_vert_count(geom_xml: Geometry):
             vert_buffer["Position"])
 
         new_geom.vertex_buffer.data = vert_buffer
+        new_geom.vertex_buffer.float_format = geom_xml.vertex_buffer.float_format
         new_geom.index_buffer.data = ind_buffer
 
         geoms.append(new_geom)
@@ -585,37 +702,19 @@ def split_vert_buffers(
 ) -> tuple[tuple[NDArray], tuple[NDArray[np.uint32]]]:
     """Splits vertex and index buffers on chunks that fit in 16-bit indices.
     Returns tuple of split vertex buffers and tuple of index buffers"""
+    # Multiple of 3, so chunks never split a triangle
     MAX_INDEX = 65535
 
-    total_index = 0
-    idx_count = len(ind_buffer)
-
     split_vert_arrs = []
     split_ind_arrs = []
-    while total_index < idx_count:
-        old_index_to_new_index = {}
-        chunk_vertices_indices = []
-        chunk_indices = []
-        chunk_index = 0
-        while total_index < idx_count and len(chunk_indices) < MAX_INDEX:
-            old_index = ind_buffer[total_index]
-            existing_index = old_index_to_new_index.get(old_index, None)
-            if existing_index is not None:
-                # we already have this index vertex addedm simply remap it to new index
-                chunk_indices.append(existing_index)
-            else:
-                # We got new index unseen before, we have to add both vertex and index
-                chunk_indices.append(chunk_index)
-                chunk_vertices_indices.append(old_index)
-                old_index_to_new_index[old_index] = chunk_index
-                chunk_index += 1
-
-            total_index += 1
-
-        chunk_vertices_arr = vert_buffer[chunk_vertices_indices]
-        chunk_indices_arr = np.array(chunk_indices, dtype=np.uint32)
-        split_vert_arrs.append(chunk_vertices_arr)
-        split_ind_arrs.append(chunk_indices_arr)
+    for chunk_start in range(0, len(ind_buffer), MAX_INDEX):
+        chunk = ind_buffer[chunk_start:chunk_start + MAX_INDEX]
+
+        # Vertices are added to the chunk in order of first use
+        chunk_vert_arr, chunk_ind_arr = reorder_vertices_by_first_use(vert_buffer, chunk)
+
+        split_vert_arrs.append(chunk_vert_arr)
+        split_ind_arrs.append(chunk_ind_arr)
 
     return (tuple(split_vert_arrs), tuple(split_ind_arrs))
 
@@ -18,6 +18,7 @@ from ..cwxml.fragment import (
 )
 from ..cwxml.drawable import Bone, Drawable, VertexLayoutList
 from ..tools.blenderhelper import get_evaluated_obj, remove_number_suffix, delete_hierarchy, get_child_of_bone
+from ..tools.exportpool import ExportPool, write_xml
 from ..tools.fragmenthelper import image_to_shattermap
 from ..tools.meshhelper import flip_uvs
 from ..tools.utils import prop_array_to_vector, reshape_mat_4x3, vector_inv, reshape_mat_3x4
@@ -26,6 +27,7 @@ from ..sollumz_properties import BOUND_TYPES, SollumType, MaterialType, LODLevel
 from ..sollumz_preferences import get_export_settings
 from ..ybn.ybnexport import has_col_mats, bound_geom_has_mats
 from ..ydr.ydrexport import create_drawable_xml, write_embedded_textures, get_bone_index, create_model_xml, append_model_xml, set_drawable_xml_extents
+from ..ydr.geometry_cache import share_geometries
 from ..ydr.lights import create_xml_lights
 from .. import logger
 from .properties import (
@@ -35,7 +37,7 @@ from .properties import (
 )
 
 
-def export_yft(frag_obj: Object, filepath: str) -> bool:
+def export_yft(frag_obj: Object, filepath: str, pool: Optional[ExportPool] = None) -> bool:
     export_settings = get_export_settings()
 
     frag = locate_fragment_objects(frag_obj)
@@ -46,15 +48,17 @@ def export_yft(frag_obj: Object, filepath: str) -> bool:
     if frag_xml is None:
         return False
 
+    export_hi = export_settings.export_hi and has_hi_lods(frag_obj)
     if export_settings.export_non_hi:
-        frag_xml.write_xml(filepath)
+        # ``create_hi_frag_xml`` modifies the physics children of ``frag_xml``, write it right away if needed
+        write_xml(frag_xml, filepath, None if export_hi else pool)
         write_embedded_textures(frag_obj, filepath)
 
-    if export_settings.export_hi and has_hi_lods(frag_obj):
+    if export_hi:
         hi_filepath = filepath.replace(".yft.xml", "_hi.yft.xml")
 
         hi_frag_xml = create_hi_frag_xml(frag, frag_xml, export_settings.apply_transforms)
-        hi_frag_xml.write_xml(hi_filepath)
+        write_xml(hi_frag_xml, hi_filepath, pool)
 
         write_embedded_textures(frag_obj, hi_filepath)
         logger.info(f"Exported Very High LODs to '{hi_filepath}'")
@@ -869,21 +873,22 @@ def create_phys_child_drawable(child_xml: PhysicsChild, materials: list[bpy.type
     if not mesh_objs:
         return drawable_xml
 
-    for obj in mesh_objs:
-        scale = get_scale_to_apply_to_bound(obj)
-        transforms_to_apply = Matrix.Diagonal(scale).to_4x4()
-
-        lods = obj.sz_lods
-        for lod_level in LODLevel:
-            if lod_level == LODLevel.VERYHIGH:
-                continue
-            lod_mesh = lods.get_lod(lod_level).mesh
-            if lod_mesh is None:
-                continue
-
-            model_xml = create_model_xml(obj, lod_level, materials, transforms_to_apply=transforms_to_apply)
-            model_xml.bone_index = 0
-            append_model_xml(drawable_xml, model_xml, lod_level)
+    with share_geometries():
+        for obj in mesh_objs:
+            scale = get_scale_to_apply_to_bound(obj)
+            transforms_to_apply = Matrix.Diagonal(scale).to_4x4()
+
+            lods = obj.sz_lods
+            for lod_level in LODLevel:
+                if lod_level == LODLevel.VERYHIGH:
+                    continue
+                lod_mesh = lods.get_lod(lod_level).mesh
+                if lod_mesh is None:
+                    continue
+
+                model_xml = create_model_xml(obj, lod_level, materials, transforms_to_apply=transforms_to_apply)
+                model_xml.bone_index = 0
+                append_model_xml(drawable_xml, model_xml, lod_level)
 
     set_drawable_xml_extents(drawable_xml)
 
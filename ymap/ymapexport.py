@@ -4,9 +4,11 @@ import math
 import numpy as np
 from mathutils import Vector
 from struct import pack
+from typing import Optional
 from ..cwxml.ymap import *
 from binascii import hexlify
 from ..tools.blenderhelper import remove_number_suffix
+from ..tools.exportpool import ExportPool, write_xml
 from ..tools.meshhelper import get_bound_center_from_bounds, get_extents
 from ..sollumz_properties import SOLLUMZ_UI_NAMES, SollumType
 from ..sollumz_preferences import get_export_settings
@@ -221,7 +223,7 @@ def ymap_from_object(obj):
     return ymap
 
 
-def export_ymap(obj: bpy.types.Object, filepath: str) -> bool:
+def export_ymap(obj: bpy.types.Object, filepath: str, pool: Optional[ExportPool] = None) -> bool:
     ymap = ymap_from_object(obj)
-    ymap.write_xml(filepath)
+    write_xml(ymap, filepath, pool)
     return True
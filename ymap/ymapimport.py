@@ -91,8 +91,9 @@ def instanced_entity_to_obj(ymap_obj: bpy.types.Object, ymap: CMapData):
     if ymap.entities:
         entities_amount = len(ymap.entities)
         count = 0
+        found_entity_indices = set()
 
-        for entity in ymap.entities:
+        for entity_index, entity in enumerate(ymap.entities):
             obj = bpy.data.objects.get(entity.archetype_name, None)
             if obj is None:
                 # No object with the given archetype name found
@@ -105,7 +106,7 @@ def instanced_entity_to_obj(ymap_obj: bpy.types.Object, ymap: CMapData):
                 apply_entity_properties(new_obj, entity)
                 new_obj.parent = group_obj
                 count += 1
-                entity.found = True
+                found_entity_indices.add(entity_index)
             else:
                 logger.error(
                     f"Cannot use your '{obj.name}' object because it is not a 'Drawable' type!")
@@ -114,8 +115,8 @@ def instanced_entity_to_obj(ymap_obj: bpy.types.Object, ymap: CMapData):
         import_settings = get_import_settings()
 
         if not import_settings.ymap_skip_missing_entities:
-            for entity in ymap.entities:
-                if entity.found is None:
+            for entity_index, entity in enumerate(ymap.entities):
+                if entity_index not in found_entity_indices:
                     empty_obj = bpy.data.objects.new(
                         entity.archetype_name + " (not found)", None)
                     empty_obj.parent = group_obj
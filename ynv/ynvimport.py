@@ -1,5 +1,6 @@
+import numpy as np
 from ..tools.meshhelper import create_box
-from ..cwxml.navmesh import YNV
+from ..cwxml.navmesh import YNV, NavPolygons
 from ..sollumz_properties import SOLLUMZ_UI_NAMES, SollumType
 import os
 import bpy
@@ -105,44 +106,38 @@ def get_material(flags, material_cache):
     return mat
 
 
-def polygons_to_obj(polygons):
-    material_cache = {}
-    mats = []
-    vertices = {}
-    verts = []
-    indices = []
-    face = []
-    for poly in polygons:
-        mats.append(get_material(poly.flags, material_cache))
-        maxtcount = len(poly.vertices)
-        for vert in poly.vertices:
-            vertex = id(vert)
-            if vertex in vertices:
-                idx = vertices[vertex]
-            else:
-                idx = len(vertices)
-                vertices[vertex] = idx
-                verts.append(vert)
-            face.append(idx)
-            if len(face) == maxtcount:
-                indices.append(face)
-                face = []
-
+def polygons_to_obj(polygons: NavPolygons):
     mesh = bpy.data.meshes.new(SOLLUMZ_UI_NAMES[SollumType.NAVMESH_POLY_MESH])
-    mesh.from_pydata(verts, [], indices)
+
+    # Polygons don't share vertices, so each vertex is used by a single loop and the loops are in the same order
+    num_vertices = len(polygons.vertices)
+    mesh.vertices.add(num_vertices)
+    mesh.loops.add(num_vertices)
+    mesh.polygons.add(len(polygons))
+    mesh.vertices.foreach_set("co", polygons.vertices.ravel())
+    mesh.loops.foreach_set("vertex_index", np.arange(num_vertices, dtype=np.int32))
+    mesh.polygons.foreach_set("loop_start", polygons.offsets.astype(np.int32))
+    mesh.polygons.foreach_set("loop_total", polygons.lengths.astype(np.int32))
+    mesh.shade_flat()
+    mesh.update(calc_edges=True)
+
     obj = bpy.data.objects.new(
         SOLLUMZ_UI_NAMES[SollumType.NAVMESH_POLY_MESH], mesh)
     obj.sollum_type = SollumType.NAVMESH_POLY_MESH
 
-    # Ensure materials are unique in the mesh
-    used_materials = []
-    for mat in mats:
-        if mat not in used_materials:
-            mesh.materials.append(mat)
-            used_materials.append(mat)
+    if len(polygons) == 0:
+        return obj
+
+    # One material per unique flags, in order of first use
+    unique_flags, first_uses, mat_inds = np.unique(polygons.flags, return_index=True, return_inverse=True)
+    order = np.argsort(first_uses)
+    material_cache = {}
+    for flags in unique_flags[order].tolist():
+        mesh.materials.append(get_material(flags, material_cache))
 
-    for idx, poly in enumerate(mesh.polygons):
-        poly.material_index = used_materials.index(mats[idx])
+    material_remap = np.empty(len(order), dtype=np.int32)
+    material_remap[order] = np.arange(len(order), dtype=np.int32)
+    mesh.polygons.foreach_set("material_index", material_remap[mat_inds])
 
     return obj
 